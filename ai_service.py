@@ -1,16 +1,21 @@
 # workers/services/ai_service.py
-import os
-from openai import AzureOpenAI
+from workers.services.llm_client import LLMResponseError, complete_json
 
 def analyze_with_ai(text):
     # Burada gerçek Azure OpenAI çağrısı olur
     return f"AI analizi sonucu: {text}"
 
-client = AzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version="2024-05-01-preview",
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-)
+ANALYZE_TASK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["create_epic", "add_comment", "close_task"]},
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "task_key": {"type": "string"},
+    },
+    "required": ["action", "title", "description", "task_key"],
+    "additionalProperties": False,
+}
 
 def analyze_task(form_text: str) -> dict:
     """
@@ -25,26 +30,16 @@ def analyze_task(form_text: str) -> dict:
     1. Jira'ya yeni bir epic mi oluşturulmalı?
     2. Var olan bir epic'e yorum mu eklenmeli?
     3. Task kapatılmalı mı?
-    Bana JSON formatında dön:
-    {{
-      "action": "create_epic" | "add_comment" | "close_task",
-      "title": "...",
-      "description": "...",
-      "task_key": "NSDT-123"
-    }}
+    İlgili task yoksa task_key boş olsun.
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "Sen bir Jira asistanısın."},
-                  {"role": "user", "content": prompt}],
-        temperature=0.2
-    )
-
-    content = response.choices[0].message.content.strip()
-
-    import json
     try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        return {"action": "error", "message": content}
+        return complete_json(
+            "analyze_task",
+            [{"role": "system", "content": "Sen bir Jira asistanısın."},
+             {"role": "user", "content": prompt}],
+            ANALYZE_TASK_SCHEMA,
+            provider="azure",
+        )
+    except LLMResponseError as e:
+        return {"action": "error", "message": str(e)}
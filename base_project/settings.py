@@ -17,18 +17,104 @@ from dotenv import load_dotenv
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(BASE_DIR, ".env"))
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
 
 from pathlib import Path
 
 
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+# Boş bırakılabilir (test, benchmark); istemciler ilk çağrıda hata verir
+JIRA_EMAIL = config("JIRA_EMAIL", default="")
+JIRA_API_TOKEN = config("JIRA_API_TOKEN", default="")
+JIRA_URL = config("JIRA_URL", default="")
+MY_JIRA_PROJECTS = [p.strip() for p in config("MY_JIRA_PROJECTS", default="").split(",") if p.strip()]
+
+# Jira yerel kopyası (JiraIssue) — view başına tazelik süresi (saniye)
+JIRA_MIRROR_MAX_AGE = {
+    "default": config("JIRA_MIRROR_MAX_AGE", default=300, cast=int),
+    "jira_profile": config("JIRA_MIRROR_MAX_AGE_JIRA_PROFILE", default=120, cast=int),
+    "view_progress": config("JIRA_MIRROR_MAX_AGE_VIEW_PROGRESS", default=300, cast=int),
+    "report_pipeline": config("JIRA_MIRROR_MAX_AGE_REPORT_PIPELINE", default=60, cast=int),
+}
+JIRA_FULL_SYNC_INTERVAL = config("JIRA_FULL_SYNC_INTERVAL", default=6 * 3600, cast=int)  # silinenleri bulmak için tam tarama
+JIRA_SYNC_OVERLAP = config("JIRA_SYNC_OVERLAP", default=120, cast=int)  # watermark'tan geriye pay (saniye)
+
+# Jira istemcisi: bağlantı havuzu, retry ve devre kesici
+JIRA_POOL_MAXSIZE = config("JIRA_POOL_MAXSIZE", default=20, cast=int)  # host başına açık bağlantı
+JIRA_TIMEOUT = config("JIRA_TIMEOUT", default=30, cast=float)  # istek başına saniye
+JIRA_MAX_RETRIES = config("JIRA_MAX_RETRIES", default=4, cast=int)  # 429 / 5xx / bağlantı hatalarında
+JIRA_BACKOFF_BASE = config("JIRA_BACKOFF_BASE", default=0.5, cast=float)  # saniye, her denemede iki katı
+JIRA_BACKOFF_MAX = config("JIRA_BACKOFF_MAX", default=30, cast=float)  # Retry-After dahil üst sınır
+JIRA_BREAKER_THRESHOLD = config("JIRA_BREAKER_THRESHOLD", default=5, cast=int)  # art arda hata sayısı
+JIRA_BREAKER_RESET = config("JIRA_BREAKER_RESET", default=60, cast=int)  # açık devrenin bekleme süresi (saniye)
+JIRA_TRANSITION_CACHE_TTL = config("JIRA_TRANSITION_CACHE_TTL", default=3600, cast=int)  # workflow durumu başına (saniye)
+
+# Dosya kataloğu (python manage.py refresh_file_catalog)
+FILE_CATALOG_BASE_DIR = config("FILE_CATALOG_BASE_DIR", default="P:/Performance")
+FILE_MATCH_TOP_K = config("FILE_MATCH_TOP_K", default=5, cast=int)  # task başına en fazla ek
+FILE_MATCH_MIN_SCORE = config("FILE_MATCH_MIN_SCORE", default=0.3, cast=float)  # normalize BM25 eşiği
+FILE_MATCH_EXPERTISE_BOOST = config("FILE_MATCH_EXPERTISE_BOOST", default=1.5, cast=float)
+ATTACHMENT_UPLOAD_CONCURRENCY = config("ATTACHMENT_UPLOAD_CONCURRENCY", default=4, cast=int)
+ATTACHMENT_UPLOAD_TIMEOUT = config("ATTACHMENT_UPLOAD_TIMEOUT", default=300, cast=float)  # dosya başına hash süresi (saniye); yüklemeler JIRA_TIMEOUT ile sınırlı
+
+# Rapor işleme kuyruğu (python manage.py run_report_worker)
+REPORT_JOB_POLL_INTERVAL = config("REPORT_JOB_POLL_INTERVAL", default=2.0, cast=float)
+REPORT_JOB_STALE_AFTER = config("REPORT_JOB_STALE_AFTER", default=1800, cast=int)  # saniye
+REPORT_JOB_MAX_ATTEMPTS = config("REPORT_JOB_MAX_ATTEMPTS", default=3, cast=int)
+REPORT_STREAM_POLL_INTERVAL = config("REPORT_STREAM_POLL_INTERVAL", default=0.5, cast=float)  # SSE, saniye
+REPORT_STREAM_TIMEOUT = config("REPORT_STREAM_TIMEOUT", default=300, cast=int)  # sonra istemci yeniden bağlanır
+
+# Task başına AI çağrılarının paralel çalıştırılması
+AI_MAX_CONCURRENCY = config("AI_MAX_CONCURRENCY", default=8, cast=int)  # aynı anda en fazla istek
+AI_CALL_TIMEOUT = config("AI_CALL_TIMEOUT", default=30, cast=float)     # çağrı başına saniye
+AI_BATCH_TOKEN_BUDGET = config("AI_BATCH_TOKEN_BUDGET", default=6000, cast=int)  # toplu durum çağrısı başına prompt token
+
+# Raporla ilgili task seçimi (task_selection): açıkça anılanlar + en iyi N aday
+REPORT_TASK_MAX_CANDIDATES = config("REPORT_TASK_MAX_CANDIDATES", default=3, cast=int)
+REPORT_TASK_MIN_SCORE = config("REPORT_TASK_MIN_SCORE", default=1.0, cast=float)  # ≈ en az bir özet kelimesi
+
+# Alt-görev durumlarının yerel eşleştirmesi (local_matcher, NumPy gerekir).
+# Benzerlik >= HIGH ve açık durum ifadesi varsa LLM'e gidilmez; LOW altı "raporda yok".
+LOCAL_MATCHER_ENABLED = config("LOCAL_MATCHER_ENABLED", default=True, cast=bool)
+LOCAL_MATCH_HIGH = config("LOCAL_MATCH_HIGH", default=0.6, cast=float)
+LOCAL_MATCH_LOW = config("LOCAL_MATCH_LOW", default=0.3, cast=float)
+
+# LLM istemcisi (workers/services/llm_client.py)
+LLM_PROVIDER = config("LLM_PROVIDER", default="openai")  # openai | azure
+AZURE_OPENAI_API_KEY = config("AZURE_OPENAI_API_KEY", default="")
+AZURE_OPENAI_ENDPOINT = config("AZURE_OPENAI_ENDPOINT", default="")
+AZURE_OPENAI_API_VERSION = config("AZURE_OPENAI_API_VERSION", default="2024-08-01-preview")  # json_schema desteği
+LLM_MAX_TOKENS = {  # çağrı tipine göre çıktı token sınırı
+    "default": 500,
+    "subtasks": config("LLM_MAX_TOKENS_SUBTASKS", default=300, cast=int),
+    "status": config("LLM_MAX_TOKENS_STATUS", default=200, cast=int),
+    "batch_status": config("LLM_MAX_TOKENS_BATCH_STATUS", default=4000, cast=int),
+    "analyze_task": config("LLM_MAX_TOKENS_ANALYZE_TASK", default=400, cast=int),
+}
+LLM_PRICES = {  # USD / 1M token (prompt, completion); LLMCallLog.cost_usd için
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# Django cache: view_progress sonuçları (progress_cache). Dosya tabanlı varsayılan,
+# böylece run_report_worker'ın yaptığı silmeler web süreçlerinde de görülür.
+CACHE_BACKEND = config("CACHE_BACKEND", default="file")  # file | locmem
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config("CACHE_DIR", default=os.path.join(BASE_DIR, ".django_cache")),
+    } if CACHE_BACKEND == "file" else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+PROGRESS_CACHE_TTL = config("PROGRESS_CACHE_TTL", default=600, cast=int)  # saniye, silinmezse üst sınır
 
-JIRA_EMAIL = config("JIRA_EMAIL")
-JIRA_API_TOKEN = config("JIRA_API_TOKEN")
-JIRA_URL = config("JIRA_URL")
-MY_JIRA_PROJECTS = config("MY_JIRA_PROJECTS").split(",")
+# Alt-görev çıkarım cache'i (SubtaskExtractionCache)
+SUBTASK_CACHE_TTL = config("SUBTASK_CACHE_TTL", default=30 * 24 * 3600, cast=int)  # saniye
+SUBTASK_CACHE_MAX_ENTRIES = config("SUBTASK_CACHE_MAX_ENTRIES", default=10000, cast=int)
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -74,6 +160,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# İstek profilleme: DB / Jira / LLM / dosya süreleri, Server-Timing header'ı ve
+# staff için en yavaş istekler (workers/request-profiles/). Kapalıyken zincirde yok.
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+PROFILING_SLOW_MS = config("PROFILING_SLOW_MS", default=500, cast=int)      # bundan yavaşlar saklanır
+PROFILING_BUFFER_SIZE = config("PROFILING_BUFFER_SIZE", default=50, cast=int)
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'workers.middleware.ProfilingMiddleware')
+
 ROOT_URLCONF = 'base_project.urls'
 
 TEMPLATES = [
@@ -96,13 +190,47 @@ WSGI_APPLICATION = 'base_project.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql ile PostgreSQL (psycopg 3), varsayılan SQLite.
+
+DB_ENGINE = config("DB_ENGINE", default="sqlite")
+
+if DB_ENGINE == "postgresql":
+    DB_POOL = config("DB_POOL", default=True, cast=bool)  # psycopg_pool gerektirir
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config("DB_NAME", default="jira_ai"),
+            'USER': config("DB_USER", default="postgres"),
+            'PASSWORD': config("DB_PASSWORD", default=""),
+            'HOST': config("DB_HOST", default="localhost"),
+            'PORT': config("DB_PORT", default="5432"),
+            # Havuz açıkken bağlantılar havuza döner; Django kalıcı bağlantıyla birlikte izin vermez
+            'CONN_MAX_AGE': 0 if DB_POOL else config("DB_CONN_MAX_AGE", default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config("DB_POOL_MIN_SIZE", default=2, cast=int),
+                    'max_size': config("DB_POOL_MAX_SIZE", default=20, cast=int),
+                    'timeout': config("DB_POOL_TIMEOUT", default=10, cast=float),  # boş bağlantı bekleme (saniye)
+                },
+            } if DB_POOL else {},
+        }
     }
-}
+elif DB_ENGINE == "sqlite":
+    # Küçük kurulumlar için: WAL ile okuyanlar yazanı beklemez, kilitte hemen hata yerine beklenir
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config("DB_NAME", default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                'timeout': config("SQLITE_BUSY_TIMEOUT", default=20, cast=float),  # saniye
+                'transaction_mode': 'IMMEDIATE',  # yazma kilidi transaction başında alınır
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Desteklenmeyen DB_ENGINE: {DB_ENGINE} (sqlite veya postgresql)")
 
 
 # Password validation
@@ -1,11 +1,19 @@
 # workers/services/jira_service.py
-from jira import JIRA
 import os
 
-jira = JIRA(
-    server=os.getenv("JIRA_SERVER"),
-    basic_auth=(os.getenv("JIRA_USER"), os.getenv("JIRA_TOKEN"))
-)
+from workers.services import clients
+
+
+def _build_jira():
+    from jira import JIRA
+
+    return JIRA(
+        server=os.getenv("JIRA_SERVER"),
+        basic_auth=(os.getenv("JIRA_USER"), os.getenv("JIRA_TOKEN"))
+    )
+
+
+clients.register("legacy_jira", _build_jira)
 
 def update_jira(task_key, analysis_result):
     # Burada gerçek Jira API çağrısı olur
@@ -13,6 +21,7 @@ def update_jira(task_key, analysis_result):
 
 
 def create_epic(title: str, description: str, project="NSDT"):
+    jira = clients.get("legacy_jira")
     issue = jira.create_issue(
         project=project,
         summary=title,
@@ -22,10 +31,11 @@ def create_epic(title: str, description: str, project="NSDT"):
     return issue.key
 
 def add_comment(task_key: str, comment: str):
-    jira.add_comment(task_key, comment)
+    clients.get("legacy_jira").add_comment(task_key, comment)
     return True
 
 def close_task(task_key: str):
+    jira = clients.get("legacy_jira")
     transitions = jira.transitions(task_key)
     close_transition = next((t for t in transitions if "Done" in t["name"]), None)
     if close_transition:
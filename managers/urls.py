@@ -2,8 +2,10 @@ from django.urls import path
 
 from .views import dashboard
 from .views import reports
+from .views import llm_usage
 
 urlpatterns = [
     path('', dashboard, name='manager-dashboard'),
     path('reports/', reports, name='manager-reports'),
+    path('llm-usage/', llm_usage, name='manager-llm-usage'),
 ]
@@ -1,7 +1,53 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.models import User
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from workers.services.llm_usage import usage_by_user_day
+from workers.services.progress_rollup import daily_rollups, team_progress
+
+
+def _team(request):
+    """Aktif kullanıcılar; ?department= ile tek departman."""
+    department = request.GET.get("department", "").strip()
+    users = User.objects.filter(is_active=True)
+    if department:
+        users = users.filter(workerprofile__department=department)
+    return department, users
+
+
+@staff_member_required
 def dashboard(request):
-    return render(request, "managers/dashboard.html")
+    """Ekip × proje ilerlemesi ve bugünkü raporlar (TaskProgressSnapshot / TeamDailyRollup)."""
+    department, users = _team(request)
+    return render(request, "managers_module/dashboard.html", {
+        "department": department,
+        **team_progress(users),
+    })
 
+
+@staff_member_required
 def reports(request):
-    return render(request, "managers/reports.html")
+    """Kullanıcı × gün rapor sayısı ve ilerleme. ?days=14"""
+    try:
+        days = int(request.GET.get("days", 14))
+    except ValueError:
+        days = 14
+    days = min(max(days, 1), 90)
+    department, users = _team(request)
+    return render(request, "managers_module/reports.html", {
+        "department": department,
+        "days": days,
+        **daily_rollups(users, days),
+    })
+
+
+@staff_member_required
+def llm_usage(request):
+    """Kullanıcı × gün LLM kullanımı: çağrı, token, maliyet, p50/p95 gecikme. ?days=7"""
+    try:
+        days = int(request.GET.get("days", 7))
+    except ValueError:
+        days = 7
+    days = min(max(days, 1), 90)
+    return JsonResponse({"days": days, "rows": usage_by_user_day(days)})
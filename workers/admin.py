@@ -1,8 +1,79 @@
 from django.contrib import admin
-from .models import TodayReport  # modelini import et
+from .models import (  # modelini import et
+    TodayReport, ReportJob, ReportJobTaskResult, SubtaskExtractionCache, JiraIssue, JiraSyncState, CatalogFile,
+    JiraAttachmentRecord, LLMCallLog, TaskProgressSnapshot, TeamDailyRollup,
+)
 
 @admin.register(TodayReport)
 class TodayReportAdmin(admin.ModelAdmin):
     list_display = ("user", "report_text", "created_at")  # tablo görünümü için alanlar
     search_fields = ("user__username", "report_text")
     list_filter = ("created_at",)
+
+
+class ReportJobTaskResultInline(admin.TabularInline):
+    model = ReportJobTaskResult
+    extra = 0
+    readonly_fields = ("task_key", "progress", "action", "subtasks", "error", "created_at")
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("user__username",)
+    inlines = [ReportJobTaskResultInline]
+
+
+@admin.register(SubtaskExtractionCache)
+class SubtaskExtractionCacheAdmin(admin.ModelAdmin):
+    list_display = ("task_key", "model", "hit_count", "created_at", "last_used_at")
+    search_fields = ("task_key",)
+    readonly_fields = ("cache_key", "created_at", "last_used_at")
+
+
+@admin.register(JiraIssue)
+class JiraIssueAdmin(admin.ModelAdmin):
+    list_display = ("key", "summary", "status", "assignee_name", "jira_updated", "is_deleted")
+    list_filter = ("project_key", "status", "is_deleted")
+    search_fields = ("key", "summary", "assignee_email")
+
+
+@admin.register(JiraSyncState)
+class JiraSyncStateAdmin(admin.ModelAdmin):
+    list_display = ("name", "watermark", "last_sync_at", "last_full_sync_at")
+
+
+@admin.register(CatalogFile)
+class CatalogFileAdmin(admin.ModelAdmin):
+    list_display = ("name", "expertise", "size", "indexed_at")
+    list_filter = ("root", "expertise")
+    search_fields = ("name", "path")
+
+
+@admin.register(JiraAttachmentRecord)
+class JiraAttachmentRecordAdmin(admin.ModelAdmin):
+    list_display = ("issue_key", "file_path", "size", "attached_at")
+    search_fields = ("issue_key", "file_path", "sha256")
+
+
+@admin.register(LLMCallLog)
+class LLMCallLogAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "user", "source", "call_type", "model", "latency_ms",
+                    "prompt_tokens", "completion_tokens", "cost_usd", "cache_hit")
+    list_filter = ("call_type", "model", "cache_hit", "created_at")
+    search_fields = ("user__username", "task_key", "source")
+
+
+@admin.register(TaskProgressSnapshot)
+class TaskProgressSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("user", "project_key", "tasks_done", "tasks_total", "subtasks_done", "subtasks_total", "updated_at")
+    list_filter = ("project_key",)
+    search_fields = ("user__username",)
+
+
+@admin.register(TeamDailyRollup)
+class TeamDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "user", "report_count", "subtasks_done", "subtasks_total")
+    list_filter = ("day",)
+    search_fields = ("user__username",)
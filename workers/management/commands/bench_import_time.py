@@ -0,0 +1,63 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+IMPORT_SNIPPET = "import django; django.setup(); import {module}"
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Uygulamanın açılışında import süresini ölçer (python -X importtime). "
+        "Her tekrar temiz bir alt süreçte çalışır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="workers.urls", help="Ölçülecek modül.")
+        parser.add_argument("--runs", type=int, default=5, help="Tekrar sayısı.")
+        parser.add_argument("--top", type=int, default=10, help="Listelenecek en yavaş modül sayısı.")
+
+    def _run_once(self, module):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET.format(module=module)],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            match = LINE_RE.match(line)
+            if match:
+                cumulative[match.group(4)] = int(match.group(2))
+        return cumulative
+
+    def handle(self, *args, **options):
+        module = options["module"]
+        runs = [self._run_once(module) for _ in range(options["runs"])]
+
+        totals = [run.get(module, 0) / 1000 for run in runs]
+        self.stdout.write(
+            f"{module}: medyan {statistics.median(totals):.1f} ms "
+            f"(min {min(totals):.1f}, max {max(totals):.1f}, {len(runs)} tekrar)"
+        )
+
+        # Son tekrarda kümülatif süreye göre en yavaş üst seviye paketler
+        top_level = {}
+        for name, micros in runs[-1].items():
+            root = name.split(".")[0]
+            if name == root:
+                top_level[root] = micros
+        slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+        for name, micros in slowest[: options["top"]]:
+            self.stdout.write(f"  {micros / 1000:8.1f} ms  {name}")
+
+        for heavy in ("openai", "jira"):
+            loaded = any(name.split(".")[0] == heavy for name in runs[-1])
+            self.stdout.write(f"{heavy} açılışta yükleniyor mu: {'evet' if loaded else 'hayır'}")
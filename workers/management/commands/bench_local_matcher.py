@@ -0,0 +1,92 @@
+import statistics
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workers.models import ReportJobTaskResult
+from workers.services import local_matcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Yerel alt-görev eşleştiricisini (local_matcher) kayıtlı LLM kararlarıyla "
+        "(ReportJobTaskResult) karşılaştırır: kapsam, doğruluk ve gecikme."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=500, help="En fazla kaç job.")
+        parser.add_argument("--high", type=float, default=None, help="LOCAL_MATCH_HIGH yerine.")
+        parser.add_argument("--low", type=float, default=None, help="LOCAL_MATCH_LOW yerine.")
+        parser.add_argument(
+            "--include-legacy",
+            action="store_true",
+            help="decided_by boş (alanın eklenmesinden önceki) sonuçları da LLM kararı say.",
+        )
+
+    def _load_jobs(self, limit, include_legacy):
+        sources = ["llm", ""] if include_legacy else ["llm"]
+        results = (
+            ReportJobTaskResult.objects.filter(error="", decided_by__in=sources)
+            .exclude(subtasks=[])
+            .select_related("job__report")
+            .order_by("-job_id")
+        )
+        jobs = defaultdict(lambda: {"report_text": "", "tasks": [], "truth": {}})
+        for result in results.iterator():
+            if result.job_id not in jobs and len(jobs) >= limit:
+                break
+            job = jobs[result.job_id]
+            job["report_text"] = result.job.report.report_text
+            job["tasks"].append({
+                "task_key": result.task_key,
+                "subtasks": [{"content": s["content"]} for s in result.subtasks],
+            })
+            job["truth"][result.task_key] = [bool(s.get("is_done")) for s in result.subtasks]
+        return list(jobs.values())
+
+    def handle(self, *args, **options):
+        if not local_matcher.is_available():
+            raise CommandError("Yerel eşleştirici kapalı (LOCAL_MATCHER_ENABLED) ya da NumPy kurulu değil.")
+
+        jobs = self._load_jobs(options["limit"], options["include_legacy"])
+        if not jobs:
+            raise CommandError("Karşılaştırılacak kayıtlı LLM kararı yok.")
+
+        latencies = []
+        tasks_total = tasks_local = 0
+        counts = {"tp": 0, "fp": 0, "tn": 0, "fn": 0}
+        for job in jobs:
+            started = time.perf_counter()
+            statuses, _ = local_matcher.match_statuses(
+                job["report_text"], job["tasks"], high=options["high"], low=options["low"]
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            tasks_total += len(job["tasks"])
+            for task_key, status in statuses.items():
+                tasks_local += 1
+                for predicted, expected in zip((s["is_done"] for s in status["subtasks"]), job["truth"][task_key]):
+                    key = ("t" if predicted == expected else "f") + ("p" if predicted else "n")
+                    counts[key] += 1
+
+        decided = sum(counts.values())
+        correct = counts["tp"] + counts["tn"]
+        precision = counts["tp"] / (counts["tp"] + counts["fp"]) if counts["tp"] + counts["fp"] else 0
+        recall = counts["tp"] / (counts["tp"] + counts["fn"]) if counts["tp"] + counts["fn"] else 0
+        latencies.sort()
+
+        self.stdout.write(f"Job: {len(jobs)}, task: {tasks_total}")
+        self.stdout.write(
+            f"Yerelde karar verilen task: {tasks_local} ({tasks_local / tasks_total:.1%}); "
+            f"LLM'e giden: {tasks_total - tasks_local}"
+        )
+        self.stdout.write(
+            f"Alt-görev doğruluğu (yerel kararlar): {correct}/{decided} "
+            f"({correct / decided:.1%})" if decided else "Yerel karar yok."
+        )
+        self.stdout.write(f"done kesinlik: {precision:.1%}, duyarlılık: {recall:.1%}")
+        self.stdout.write(
+            f"Rapor başına gecikme: medyan {statistics.median(latencies):.2f} ms, "
+            f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.2f} ms"
+        )
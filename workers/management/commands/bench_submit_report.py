@@ -0,0 +1,109 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import RequestFactory
+
+from workers.models import ReportJob, TodayReport
+from workers.views import submit_report
+
+BENCH_USERNAME = "bench_submit_report"
+
+
+class Command(BaseCommand):
+    help = (
+        "submit_report'u aktif veritabanında eşzamanlı çağırıp throughput ölçer. "
+        "Backend'leri karşılaştırmak için DB_ENGINE ile ayrı ayrı çalıştırın. "
+        "--asgi ile istekler tek bir event loop'ta (tek ASGI worker gibi) çalışır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Eşzamanlı istek sayısı.")
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Thread yerine tek event loop'ta --threads kadar eşzamanlı coroutine.",
+        )
+        parser.add_argument("--requests", type=int, default=400, help="Toplam istek sayısı.")
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Oluşturulan rapor ve job'ları silme.",
+        )
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        factory = RequestFactory()
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        async def auser():
+            return user
+
+        async def submit(i):
+            request = factory.post("/workers/submit-report/", {"report_text": f"Benchmark raporu #{i}"})
+            request.user = user
+            request.auser = auser
+            started = time.perf_counter()
+            try:
+                response = await submit_report(request)
+                ok = response.status_code == 202
+                error = None if ok else f"HTTP {response.status_code}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - started
+            with lock:
+                if error:
+                    errors.append(error)
+                else:
+                    latencies.append(elapsed)
+
+        def run(i):
+            try:
+                async_to_sync(submit)(i)
+            finally:
+                # Thread'e ait bağlantıyı kapat (havuz varsa havuza döner)
+                connections.close_all()
+
+        async def run_asgi():
+            semaphore = asyncio.Semaphore(options["threads"])
+
+            async def limited(i):
+                async with semaphore:
+                    await submit(i)
+
+            await asyncio.gather(*(limited(i) for i in range(total)))
+            await sync_to_async(connections.close_all)()
+
+        started = time.perf_counter()
+        if options["asgi"]:
+            asyncio.run(run_asgi())
+        else:
+            with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+                list(pool.map(run, range(total)))
+        wall = time.perf_counter() - started
+
+        mode = "eşzamanlı coroutine (tek event loop)" if options["asgi"] else "thread"
+        self.stdout.write(f"Backend: {connection.vendor} ({connection.settings_dict['NAME']})")
+        self.stdout.write(f"{options['threads']} {mode}, {total} istek, {wall:.2f}s")
+        self.stdout.write(f"Başarılı: {len(latencies)}, hatalı: {len(errors)}, throughput: {len(latencies) / wall:.1f} istek/s")
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"Gecikme: p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+            )
+        for error in sorted(set(errors))[:5]:
+            self.stdout.write(f"  {errors.count(error)} x {error}")
+
+        if not options["keep"]:
+            ReportJob.objects.filter(user=user).delete()
+            TodayReport.objects.filter(user=user).delete()
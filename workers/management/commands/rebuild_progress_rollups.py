@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from workers.services.progress_rollup import rebuild_progress_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Takım ilerleme özetlerini (TaskProgressSnapshot, TeamDailyRollup) alt-görevlerden "
+        "ve raporlardan yeniden hesaplar. İlk kurulumda ya da veri elle değiştirildiğinde çalıştırılır."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_progress_rollups()
+        self.stdout.write(f"{count} kullanıcının ilerleme özeti yeniden hesaplandı.")
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workers.services.file_catalog import refresh_catalog
+
+
+class Command(BaseCommand):
+    help = "Paylaşımlı klasör için dosya kataloğunu ve token indeksini günceller."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-dir",
+            default=None,
+            help="Taranacak klasör (varsayılan: FILE_CATALOG_BASE_DIR).",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Kataloğu silip baştan kur.",
+        )
+
+    def handle(self, *args, **options):
+        base_dir = options["base_dir"] or settings.FILE_CATALOG_BASE_DIR
+        stats = refresh_catalog(base_dir, rebuild=options["rebuild"])
+        self.stdout.write(
+            f"{base_dir}: {stats['added']} eklendi, {stats['updated']} güncellendi, "
+            f"{stats['removed']} silindi, {stats['unchanged']} değişmedi."
+        )
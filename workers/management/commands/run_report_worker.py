@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workers.services.report_pipeline import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Kuyruktaki günlük rapor job'larını (ReportJob) işler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Kuyruktaki job'ları bitirip çık (cron için).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "REPORT_JOB_POLL_INTERVAL", 2.0),
+            help="Kuyruk boşken bekleme süresi (saniye).",
+        )
+
+    def handle(self, *args, **options):
+        once = options["once"]
+        poll_interval = options["poll_interval"]
+        self.stdout.write("Report worker başladı.")
+
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                self.stdout.write(f"Job #{job.pk} işleniyor (report #{job.report_id})...")
+                job = run_job(job)
+                self.stdout.write(f"Job #{job.pk} → {job.status}")
+        except KeyboardInterrupt:
+            self.stdout.write("Report worker durduruldu.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from workers.services.jira_sync import sync_issues
+
+
+class Command(BaseCommand):
+    help = "Jira issue'larını yerel JiraIssue tablosuna senkronlar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Watermark'ı yok sayıp tüm issue'ları çek ve silinenleri işaretle.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = sync_issues(full=options["full"])
+        except Exception as e:
+            raise CommandError(f"Jira senkronu başarısız: {e}")
+        self.stdout.write(
+            f"{result['fetched']} issue güncellendi, {result['tombstoned']} issue silindi olarak işaretlendi."
+        )
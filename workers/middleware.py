@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from workers.services.profiling import RequestProfile, activate, deactivate, record_request
+
+
+class ProfilingMiddleware:
+    """
+    İstek süresini DB / Jira / LLM / dosya alt sistemlerine böler, Server-Timing
+    header'ı ekler ve yavaş istekleri staff için saklar (request-profiles/).
+    Sadece PROFILING_ENABLED=True iken MIDDLEWARE'e eklenir; kapalıyken
+    span'ler tek bir contextvar okumasından ibarettir.
+    Async view'lar (ASGI) thread'e düşürülmeden sarılır.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self._profiling(request) as profile:
+            response = self.get_response(request)
+        return self._finish(profile, response)
+
+    async def __acall__(self, request):
+        with self._profiling(request) as profile:
+            response = await self.get_response(request)
+        return self._finish(profile, response)
+
+    @contextmanager
+    def _profiling(self, request):
+        profile = RequestProfile(request.method, request.path)
+        # DB süresi profiling.db_wrapper ile (her bağlantıda kurulu) contextvar'dan okunur
+        token = activate(profile)
+        try:
+            yield profile
+        finally:
+            deactivate(token)
+
+    def _finish(self, profile, response):
+        profile.finish(response.status_code)
+        response["Server-Timing"] = profile.server_timing()
+        record_request(profile)
+        return response
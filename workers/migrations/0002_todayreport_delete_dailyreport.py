@@ -1,28 +1,15 @@
 # Generated by Django 5.2.4 on 2025-08-26 12:24
 
-import django.db.models.deletion
-from django.conf import settings
-from django.db import migrations, models
+from django.db import migrations
 
 
 class Migration(migrations.Migration):
 
     dependencies = [
         ('workers', '0001_initial'),
-        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
     ]
 
-    operations = [
-        migrations.CreateModel(
-            name='TodayReport',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('report_text', models.TextField()),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
-            ],
-        ),
-        migrations.DeleteModel(
-            name='DailyReport',
-        ),
-    ]
+    # 0001_initial güncel şemayla yeniden üretildiği için bu dalın işlemleri taze
+    # veritabanında çakışıyordu: TodayReport 0001_initial'da oluşturuluyor, DailyReport orada hiç yok.
+    # Uygulanmış geçmiş bozulmasın diye migration boş olarak tutulur.
+    operations = []
@@ -1,6 +1,6 @@
 # Generated by Django 5.2.4 on 2025-09-01 11:40
 
-from django.db import migrations, models
+from django.db import migrations
 
 
 class Migration(migrations.Migration):
@@ -9,15 +9,7 @@ class Migration(migrations.Migration):
         ('workers', '0002_todayreport_delete_dailyreport'),
     ]
 
-    operations = [
-        migrations.AddField(
-            model_name='todayreport',
-            name='jira_task_key',
-            field=models.CharField(blank=True, max_length=50, null=True),
-        ),
-        migrations.AddField(
-            model_name='todayreport',
-            name='progress_made',
-            field=models.BooleanField(default=False),
-        ),
-    ]
+    # 0001_initial güncel şemayla yeniden üretildiği için bu dalın işlemleri taze
+    # veritabanında çakışıyordu: jira_task_key ve progress_made 0001_initial'da zaten var.
+    # Uygulanmış geçmiş bozulmasın diye migration boş olarak tutulur.
+    operations = []
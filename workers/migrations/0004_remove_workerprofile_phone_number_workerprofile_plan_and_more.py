@@ -1,6 +1,6 @@
 # Generated by Django 5.2.4 on 2025-09-02 05:53
 
-from django.db import migrations, models
+from django.db import migrations
 
 
 class Migration(migrations.Migration):
@@ -9,19 +9,7 @@ class Migration(migrations.Migration):
         ('workers', '0003_todayreport_jira_task_key_todayreport_progress_made'),
     ]
 
-    operations = [
-        migrations.RemoveField(
-            model_name='workerprofile',
-            name='phone_number',
-        ),
-        migrations.AddField(
-            model_name='workerprofile',
-            name='plan',
-            field=models.CharField(choices=[('basic', 'Basic'), ('pro', 'Pro')], default='basic', max_length=50),
-        ),
-        migrations.AddField(
-            model_name='workerprofile',
-            name='role',
-            field=models.CharField(choices=[('manager', 'Manager'), ('worker', 'Worker')], default='worker', max_length=50),
-        ),
-    ]
+    # 0001_initial güncel şemayla yeniden üretildiği için bu dalın işlemleri taze
+    # veritabanında çakışıyordu: plan ve role 0001_initial'da zaten var; phone_number modelde duruyor.
+    # Uygulanmış geçmiş bozulmasın diye migration boş olarak tutulur.
+    operations = []
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0005_reportjob_reportjobtaskresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubtaskExtractionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('task_key', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('subtasks', models.JSONField(default=list)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0006_subtaskextractioncache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JiraIssue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('jira_id', models.CharField(max_length=50, unique=True)),
+                ('project_key', models.CharField(max_length=50)),
+                ('project_name', models.CharField(blank=True, default='', max_length=255)),
+                ('issue_type', models.CharField(blank=True, default='', max_length=100)),
+                ('summary', models.CharField(blank=True, default='', max_length=500)),
+                ('description', models.TextField(blank=True, default='')),
+                ('status', models.CharField(blank=True, default='', max_length=100)),
+                ('assignee_email', models.CharField(blank=True, default='', max_length=254)),
+                ('assignee_account_id', models.CharField(blank=True, default='', max_length=100)),
+                ('assignee_name', models.CharField(blank=True, default='', max_length=200)),
+                ('reporter_email', models.CharField(blank=True, default='', max_length=254)),
+                ('jira_created', models.DateTimeField(blank=True, null=True)),
+                ('jira_updated', models.DateTimeField(blank=True, null=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignee_email'], name='workers_jira_assignee_idx'), models.Index(fields=['reporter_email'], name='workers_jira_reporter_idx'), models.Index(fields=['project_key', '-jira_created'], name='workers_jira_project_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JiraSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('last_sync_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0007_jiraissue_jirasyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('root', models.CharField(db_index=True, max_length=255)),
+                ('path', models.CharField(max_length=1024, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('expertise', models.CharField(blank=True, db_index=True, default='', max_length=100)),
+                ('size', models.BigIntegerField(default=0)),
+                ('mtime', models.FloatField(default=0)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CatalogToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='workers.catalogfile')),
+            ],
+            options={
+                'unique_together': {('token', 'file')},
+            },
+        ),
+    ]
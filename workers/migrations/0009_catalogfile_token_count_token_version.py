@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0008_catalogfile_catalogtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogfile',
+            name='token_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='catalogfile',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
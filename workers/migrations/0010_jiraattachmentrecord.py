@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0009_catalogfile_token_count_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JiraAttachmentRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_key', models.CharField(max_length=50)),
+                ('sha256', models.CharField(max_length=64)),
+                ('file_path', models.CharField(max_length=1024)),
+                ('size', models.BigIntegerField(default=0)),
+                ('attached_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('issue_key', 'sha256')},
+            },
+        ),
+    ]
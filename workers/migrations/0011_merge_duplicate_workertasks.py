@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tasks(apps, schema_editor):
+    """
+    Aynı (assignee, jira_key) için birden fazla WorkerTask varsa en eskisi tutulur;
+    diğerlerinin alt-görevleri ona taşınır (aynı içerikte olanlar is_done'ları
+    birleştirilerek tekilleştirilir) ve kopyalar silinir.
+    """
+    WorkerTask = apps.get_model("workers", "WorkerTask")
+    TaskSubItem = apps.get_model("workers", "TaskSubItem")
+
+    duplicates = (
+        WorkerTask.objects.values("assignee_id", "jira_key")
+        .annotate(count=Count("id"), keep_id=Min("id"))
+        .filter(count__gt=1)
+    )
+    for dup in duplicates.iterator():
+        extra_ids = list(
+            WorkerTask.objects.filter(assignee_id=dup["assignee_id"], jira_key=dup["jira_key"])
+            .exclude(pk=dup["keep_id"])
+            .values_list("pk", flat=True)
+        )
+        kept = {s.content: s for s in TaskSubItem.objects.filter(task_id=dup["keep_id"])}
+        for sub in TaskSubItem.objects.filter(task_id__in=extra_ids).order_by("pk"):
+            existing = kept.get(sub.content)
+            if existing is None:
+                sub.task_id = dup["keep_id"]
+                sub.save(update_fields=["task"])
+                kept[sub.content] = sub
+            else:
+                if sub.is_done and not existing.is_done:
+                    existing.is_done = True
+                    existing.save(update_fields=["is_done"])
+                sub.delete()
+        WorkerTask.objects.filter(pk__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL'de veri değişikliği ile ALTER TABLE aynı transaction'da olamaz
+    # ("pending trigger events"); birleştirme kendi transaction'ında commit edilir,
+    # şema değişiklikleri ondan sonra çalışır.
+    atomic = False
+
+    dependencies = [
+        ('workers', '0010_jiraattachmentrecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tasks, migrations.RunPython.noop, atomic=True),
+        migrations.AlterUniqueTogether(
+            name='workertask',
+            unique_together={('assignee', 'jira_key')},
+        ),
+        migrations.AddIndex(
+            model_name='todayreport',
+            index=models.Index(fields=['user', '-created_at'], name='workers_report_user_idx'),
+        ),
+    ]
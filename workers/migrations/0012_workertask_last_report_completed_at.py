@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0011_merge_duplicate_workertasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workertask',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='workertask',
+            name='last_report',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workers.todayreport'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0013_llmcalllog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjobtaskresult',
+            name='decided_by',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+    ]
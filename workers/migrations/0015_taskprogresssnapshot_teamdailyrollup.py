@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0014_reportjobtaskresult_decided_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskProgressSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_key', models.CharField(max_length=50)),
+                ('tasks_total', models.PositiveIntegerField(default=0)),
+                ('tasks_done', models.PositiveIntegerField(default=0)),
+                ('subtasks_total', models.PositiveIntegerField(default=0)),
+                ('subtasks_done', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'project_key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('tasks_total', models.PositiveIntegerField(default=0)),
+                ('tasks_done', models.PositiveIntegerField(default=0)),
+                ('subtasks_total', models.PositiveIntegerField(default=0)),
+                ('subtasks_done', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'user'], name='workers_rollup_day_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:27
+
+from django.db import migrations, models
+
+
+def reset_sync_watermark(apps, schema_editor):
+    # Mevcut satırlarda reporter_account_id boş; bir sonraki senkron tüm issue'ları çeker
+    apps.get_model("workers", "JiraSyncState").objects.update(watermark=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workers', '0015_taskprogresssnapshot_teamdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jiraissue',
+            name='reporter_account_id',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='jiraissue',
+            index=models.Index(fields=['assignee_account_id'], name='workers_jira_assignee_acc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jiraissue',
+            index=models.Index(fields=['reporter_account_id'], name='workers_jira_reporter_acc_idx'),
+        ),
+        migrations.RunPython(reset_sync_watermark, migrations.RunPython.noop),
+    ]
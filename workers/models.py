@@ -48,6 +48,12 @@ class TodayReport(models.Model):
     progress_made = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Kullanıcının son raporu: filter(user=...).order_by("-created_at")
+            models.Index(fields=["user", "-created_at"], name="workers_report_user_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.created_at.date()}"
 
@@ -57,6 +63,16 @@ class WorkerTask(models.Model):
     assignee = models.ForeignKey(User, on_delete=models.CASCADE)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Reconciler (report_pipeline) durumu: aynı rapor iki kez işlenmez,
+    # tamamlanan task Jira'da bir kez taşınıp yorumlanır
+    last_report = models.ForeignKey(
+        TodayReport, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        # Unique index (assignee, jira_key) aramalarını da karşılar
+        unique_together = ("assignee", "jira_key")
 
 class TaskSubItem(models.Model):
     task = models.ForeignKey(WorkerTask, on_delete=models.CASCADE, related_name='subitems')
@@ -64,4 +80,209 @@ class TaskSubItem(models.Model):
     is_done = models.BooleanField(default=False)
 
     class Meta:
-        unique_together = ("task", "content")
\ No newline at end of file
+        unique_together = ("task", "content")
+
+class ReportJob(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    report = models.ForeignKey(TodayReport, on_delete=models.CASCADE, related_name="jobs")
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="workers_job_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.pk} ({self.status}) - {self.user.username}"
+
+
+class ReportJobTaskResult(models.Model):
+    job = models.ForeignKey(ReportJob, on_delete=models.CASCADE, related_name="task_results")
+    task_key = models.CharField(max_length=50)
+    progress = models.FloatField(default=0)
+    action = models.CharField(max_length=50, blank=True, default="")
+    subtasks = models.JSONField(default=list)
+    error = models.TextField(blank=True, default="")
+    decided_by = models.CharField(max_length=10, blank=True, default="")  # llm | local | "" (değerlendirilmedi)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.task_key} ({self.action})"
+
+
+class SubtaskExtractionCache(models.Model):
+    # sha256(task_key, description, model, max_subtasks, prompt version)
+    cache_key = models.CharField(max_length=64, unique=True)
+    task_key = models.CharField(max_length=50)
+    model = models.CharField(max_length=100)
+    subtasks = models.JSONField(default=list)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.task_key} ({self.model}, {self.hit_count} hit)"
+
+
+class JiraIssue(models.Model):
+    """Jira issue'larının yerel kopyası (jira_sync ile doldurulur)."""
+    key = models.CharField(max_length=50, unique=True)
+    jira_id = models.CharField(max_length=50, unique=True)  # taşınan issue'larda key değişir, id değişmez
+    project_key = models.CharField(max_length=50)
+    project_name = models.CharField(max_length=255, blank=True, default="")
+    issue_type = models.CharField(max_length=100, blank=True, default="")
+    summary = models.CharField(max_length=500, blank=True, default="")
+    description = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=100, blank=True, default="")
+    assignee_email = models.CharField(max_length=254, blank=True, default="")
+    assignee_account_id = models.CharField(max_length=100, blank=True, default="")
+    assignee_name = models.CharField(max_length=200, blank=True, default="")
+    reporter_email = models.CharField(max_length=254, blank=True, default="")
+    reporter_account_id = models.CharField(max_length=100, blank=True, default="")
+    jira_created = models.DateTimeField(blank=True, null=True)
+    jira_updated = models.DateTimeField(blank=True, null=True)
+    is_deleted = models.BooleanField(default=False)  # Jira'da silinen / proje dışına taşınan
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["assignee_email"], name="workers_jira_assignee_idx"),
+            models.Index(fields=["reporter_email"], name="workers_jira_reporter_idx"),
+            # Jira Cloud e-posta gizliliğinde emailAddress boş gelir; eşleşme accountId ile
+            models.Index(fields=["assignee_account_id"], name="workers_jira_assignee_acc_idx"),
+            models.Index(fields=["reporter_account_id"], name="workers_jira_reporter_acc_idx"),
+            models.Index(fields=["project_key", "-jira_created"], name="workers_jira_project_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.summary}"
+
+
+class JiraSyncState(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(blank=True, null=True)  # görülen en son "updated" değeri
+    last_sync_at = models.DateTimeField(blank=True, null=True)
+    last_full_sync_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.watermark})"
+
+
+class CatalogFile(models.Model):
+    """Paylaşımlı klasördeki dosyaların kataloğu (file_catalog ile doldurulur)."""
+    root = models.CharField(max_length=255, db_index=True)  # taranan base_dir
+    path = models.CharField(max_length=1024, unique=True)
+    name = models.CharField(max_length=255)
+    expertise = models.CharField(max_length=100, blank=True, default="", db_index=True)  # base_dir altındaki ilk klasör
+    size = models.BigIntegerField(default=0)
+    mtime = models.FloatField(default=0)
+    token_count = models.PositiveIntegerField(default=0)  # BM25 doküman uzunluğu
+    token_version = models.PositiveIntegerField(default=0)  # tokenizer değişince yeniden indekslemek için
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.path
+
+
+class CatalogToken(models.Model):
+    """Dosya adı token'larının ters indeksi (token → dosya)."""
+    token = models.CharField(max_length=100)
+    file = models.ForeignKey(CatalogFile, on_delete=models.CASCADE, related_name="tokens")
+
+    class Meta:
+        unique_together = ("token", "file")
+
+
+class JiraAttachmentRecord(models.Model):
+    """Hangi dosya içeriğinin (sha256) hangi issue'ya eklendiği; tekrar yüklemeyi önler."""
+    issue_key = models.CharField(max_length=50)
+    sha256 = models.CharField(max_length=64)
+    file_path = models.CharField(max_length=1024)
+    size = models.BigIntegerField(default=0)
+    attached_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("issue_key", "sha256")
+
+    def __str__(self):
+        return f"{self.issue_key} ← {self.file_path}"
+
+
+class LLMCallLog(models.Model):
+    """Tek bir LLM çağrısı (veya alt-görev cache hit'i); llm_usage ile yazılır."""
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    job = models.ForeignKey(ReportJob, on_delete=models.SET_NULL, null=True, blank=True, related_name="llm_calls")
+    source = models.CharField(max_length=100, blank=True, default="")  # çağıran view / job
+    task_key = models.CharField(max_length=255, blank=True, default="")
+    call_type = models.CharField(max_length=50)  # subtasks, status, batch_status ...
+    model = models.CharField(max_length=100)
+    latency_ms = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=10, decimal_places=6, default=0)
+    cache_hit = models.BooleanField(default=False)
+    error = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "user"], name="workers_llmcall_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.call_type} ({self.model}, {self.latency_ms} ms)"
+
+
+class TaskProgressSnapshot(models.Model):
+    """Kullanıcının bir projedeki güncel task / alt-görev sayıları (progress_rollup ile yazılır)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    project_key = models.CharField(max_length=50)  # jira_key'in "-" öncesi
+    tasks_total = models.PositiveIntegerField(default=0)
+    tasks_done = models.PositiveIntegerField(default=0)  # tüm alt-görevleri bitmiş
+    subtasks_total = models.PositiveIntegerField(default=0)
+    subtasks_done = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Unique index takım (user__in=...) sorgularını da karşılar
+        unique_together = ("user", "project_key")
+
+    def __str__(self):
+        return f"{self.user_id} {self.project_key}: {self.subtasks_done}/{self.subtasks_total}"
+
+
+class TeamDailyRollup(models.Model):
+    """Kullanıcı × gün: rapor sayısı ve gün içindeki son task / alt-görev sayıları."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    report_count = models.PositiveIntegerField(default=0)
+    tasks_total = models.PositiveIntegerField(default=0)
+    tasks_done = models.PositiveIntegerField(default=0)
+    subtasks_total = models.PositiveIntegerField(default=0)
+    subtasks_done = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "day")
+        indexes = [
+            models.Index(fields=["day", "user"], name="workers_rollup_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.day}: {self.report_count} rapor"
@@ -1,18 +1,68 @@
 import json
-import re
 import logging
-from openai import OpenAI
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
-client = OpenAI()
 
 from workers.services.file_service import attach_files_to_task
 from workers.services.jira_service import get_jira_client
+from workers.services.executor import run_in_parallel
+from workers.services.llm_client import complete_json
+from workers.services.llm_usage import ensure_llm_call_context
 
-def update_subtasks_with_report(task_key, description, max_subtasks=2, model="gpt-4o-mini"):
+# Alt-görev çıkarım prompt'u değiştiğinde artırılmalı (cache anahtarına girer)
+SUBTASK_PROMPT_VERSION = "2"
+
+SUBTASKS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "subtasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"content": {"type": "string"}},
+                "required": ["content"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["subtasks"],
+    "additionalProperties": False,
+}
+
+DONE_INDEXES_SCHEMA = {
+    "type": "object",
+    "properties": {"done": {"type": "array", "items": {"type": "integer"}}},
+    "required": ["done"],
+    "additionalProperties": False,
+}
+
+BATCH_STATUS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "task_key": {"type": "string"},
+                    "done": {"type": "array", "items": {"type": "integer"}},
+                },
+                "required": ["task_key", "done"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["tasks"],
+    "additionalProperties": False,
+}
+
+
+def update_subtasks_with_report(task_key, description, max_subtasks=2, model="gpt-4o-mini", timeout=None):
     """
     Task description'dan AI ile alt-görev listesi çıkarır.
     NOT: Raporda olmayan görevleri eklemez.
+    Geçerli yanıt alınamazsa LLMResponseError fırlatır (boş sonuç dönmez).
     """
     if not description:
         return {"task_key": task_key, "subtasks": []}
@@ -20,112 +70,203 @@ def update_subtasks_with_report(task_key, description, max_subtasks=2, model="gp
     prompt = f"""
 You are an assistant that extracts clear, actionable subtasks from a task description.
 Rules:
-- Output ONLY valid JSON.
 - Do NOT invent new tasks that are not in the description.
 - Max {max_subtasks} items.
 - Subtasks should be short and actionable.
-- JSON schema:
-{{
-  "task_key": "{task_key}",
-  "subtasks": [
-    {{"content": "...", "is_done": false}}
-  ]
-}}
 
 Description:
 \"\"\"{description}\"\"\"
 """
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a precise subtask generator. Respond with JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=500,
-        )
-
-        content = response.choices[0].message.content.strip()
-        m = re.search(r'(\{.*\})', content, flags=re.DOTALL)
-        json_text = m.group(1) if m else content
-        json_text = re.sub(r",\s*([}\]])", r"\1", json_text)
-
-        data = json.loads(json_text)
-        # sadece content var mı diye filtrele
-        subtasks = [
-            {"content": s.get("content", "").strip(), "is_done": False}
-            for s in data.get("subtasks", [])
-            if s.get("content")
-        ]
-        return {"task_key": task_key, "subtasks": subtasks}
-
-    except Exception as e:
-        logger.warning(f"AI parse failed for {task_key}: {e}")
-        return {"task_key": task_key, "subtasks": []}
+    data = complete_json(
+        "subtasks",
+        [
+            {"role": "system", "content": "You are a precise subtask generator."},
+            {"role": "user", "content": prompt}
+        ],
+        SUBTASKS_SCHEMA,
+        model=model,
+        max_tokens=30 + 40 * max_subtasks,
+        timeout=timeout,
+        task_key=task_key,
+    )
+    subtasks = [
+        {"content": s["content"].strip(), "is_done": False}
+        for s in data["subtasks"][:max_subtasks]
+        if s["content"].strip()
+    ]
+    return {"task_key": task_key, "subtasks": subtasks}
 
 
 
 # --- Subtasks status güncelleme ---
-def update_subtasks_status(task_key, subtasks, report_text, model="gpt-4o-mini"):
+def update_subtasks_status(task_key, subtasks, report_text, model="gpt-4o-mini", timeout=None):
     """
     Günlük rapora göre hangi alt-görevlerin tamamlandığını AI ile işaretler.
     Sadece mevcut alt-görevleri kullanır, yeni görev eklemez.
+    Geçerli yanıt alınamazsa LLMResponseError fırlatır.
     """
     if not subtasks:
         return {"task_key": task_key, "subtasks": []}
 
     prompt = f"""
 You are an assistant that updates task progress.
-Given a list of subtasks and a daily work report, mark which subtasks are DONE.
+Given a list of numbered subtasks and a daily work report, list the indexes of the subtasks that are DONE.
 
 Rules:
-- Output ONLY valid JSON.
-- Do not invent new subtasks, use exactly the given list.
-- If the report clearly indicates a subtask is finished, set is_done = true.
-- Otherwise, keep is_done = false.
-
-JSON schema:
-{{
-  "task_key": "{task_key}",
-  "subtasks": [
-    {{"content": "...", "is_done": true/false}}
-  ]
-}}
+- Use only the given indexes.
+- A subtask is done only if the report clearly indicates it is finished.
 
 Subtasks:
-{json.dumps(subtasks, indent=2)}
+{json.dumps({str(i): s["content"] for i, s in enumerate(subtasks)}, ensure_ascii=False, indent=1)}
 
 Report:
 \"\"\"{report_text}\"\"\"
 """
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a precise subtask status updater. Respond with JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=500,
-        )
-
-        content = response.choices[0].message.content.strip()
-        m = re.search(r'(\{.*\})', content, flags=re.DOTALL)
-        json_text = m.group(1) if m else content
-        json_text = re.sub(r",\s*([}\]])", r"\1", json_text)
-
-        data = json.loads(json_text)
-        # is_done değerlerini boolean olarak zorla
-        for s in data.get("subtasks", []):
-            s["is_done"] = bool(s.get("is_done", False))
-        return {"task_key": task_key, "subtasks": data.get("subtasks", [])}
+    data = complete_json(
+        "status",
+        [
+            {"role": "system", "content": "You are a precise subtask status updater."},
+            {"role": "user", "content": prompt}
+        ],
+        DONE_INDEXES_SCHEMA,
+        model=model,
+        max_tokens=20 + 3 * len(subtasks),
+        timeout=timeout,
+        task_key=task_key,
+    )
+    done = set(data["done"])
+    return {
+        "task_key": task_key,
+        "subtasks": [{"content": s["content"], "is_done": idx in done} for idx, s in enumerate(subtasks)],
+    }
 
-    except Exception as e:
-        logger.warning(f"AI status parse failed for {task_key}: {e}")
-        return {"task_key": task_key, "subtasks": subtasks}
+
+
+# --- Çoklu task için tek çağrıda durum güncelleme ---
+def estimate_tokens(text):
+    """Kaba token tahmini (~4 karakter = 1 token)."""
+    return len(text) // 4 + 1
+
+
+def _chunk_tasks_by_budget(tasks, base_tokens, token_budget):
+    """Task'ları, her parçanın prompt'u token_budget'ı aşmayacak şekilde gruplar."""
+    chunks, current, used = [], [], base_tokens
+    for task in tasks:
+        cost = estimate_tokens(json.dumps(task, ensure_ascii=False))
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current, used = [], base_tokens
+        current.append(task)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def update_subtasks_status_batch(report_text, tasks, model="gpt-4o-mini", token_budget=None, timeout=None):
+    """
+    update_subtasks_status'un toplu sürümü: rapor bir kez gönderilir, birden
+    fazla task'ın alt-görevleri tek çağrıda değerlendirilir.
+    tasks: [{"task_key": "...", "subtasks": [{"content": "..."}, ...]}, ...]
+    Dönüş: {task_key: {"task_key": ..., "subtasks": [...]}}
+    Değerlendirilemeyen task'lar (parça hatası, yanıtta olmayan key) dönüşte
+    yer almaz; çağıran bunları atlar, alt-görev durumları değişmez.
+
+    Prompt token_budget'ı (AI_BATCH_TOKEN_BUDGET) aşacaksa task'lar
+    parçalara bölünür ve parçalar paralel gönderilir.
+    """
+    results = {}
+    pending = []
+    for t in tasks:
+        if t["subtasks"]:
+            pending.append({
+                "task_key": t["task_key"],
+                "subtasks": [s["content"] for s in t["subtasks"]],
+            })
+        else:
+            results[t["task_key"]] = {"task_key": t["task_key"], "subtasks": []}
+    if not pending:
+        return results
+
+    token_budget = token_budget or getattr(settings, "AI_BATCH_TOKEN_BUDGET", 6000)
+    base_tokens = estimate_tokens(_BATCH_STATUS_PROMPT) + estimate_tokens(report_text)
+    chunks = _chunk_tasks_by_budget(pending, base_tokens, token_budget)
+
+    by_key = {t["task_key"]: t for t in tasks}
+    with ensure_llm_call_context():
+        outcomes = run_in_parallel(lambda chunk: _evaluate_status_chunk(report_text, chunk, model, timeout), chunks)
+    for chunk, (data, error) in zip(chunks, outcomes):
+        if error:
+            logger.warning(f"AI batch status failed for {[t['task_key'] for t in chunk]}: {error}")
+            data = {}
+        for t in chunk:
+            original = by_key[t["task_key"]]["subtasks"]
+            done_indexes = data.get(t["task_key"])
+            if done_indexes is None:
+                if not error:
+                    logger.warning(f"AI batch status yanıtında {t['task_key']} yok")
+                continue
+            results[t["task_key"]] = {
+                "task_key": t["task_key"],
+                "subtasks": [
+                    {"content": s["content"], "is_done": idx in done_indexes}
+                    for idx, s in enumerate(original)
+                ],
+            }
+    return results
+
+
+_BATCH_STATUS_PROMPT = """
+You are an assistant that updates task progress.
+Given a daily work report and several tasks with numbered subtasks, decide which subtasks are DONE.
+
+Rules:
+- Do not invent new tasks or subtasks; use exactly the given task keys and subtask indexes.
+- A subtask is done only if the report clearly indicates it is finished.
+- Include every given task key, with an empty list if nothing is done.
+
+Tasks:
+{tasks}
+
+Report:
+\"\"\"{report}\"\"\"
+"""
+
+
+def _evaluate_status_chunk(report_text, chunk, model, timeout):
+    """Tek bir parça için AI'a sorar; {task_key: set(done_index)} döner."""
+    tasks_text = json.dumps(
+        [
+            {"task_key": t["task_key"], "subtasks": {str(i): c for i, c in enumerate(t["subtasks"])}}
+            for t in chunk
+        ],
+        ensure_ascii=False,
+        indent=1,
+    )
+    prompt = _BATCH_STATUS_PROMPT.format(tasks=tasks_text, report=report_text)
+    # Çıktı: task başına anahtar + indeks listesi
+    max_tokens = min(4000, 50 + sum(15 + 3 * len(t["subtasks"]) for t in chunk))
+
+    data = complete_json(
+        "batch_status",
+        [
+            {"role": "system", "content": "You are a precise subtask status updater."},
+            {"role": "user", "content": prompt}
+        ],
+        BATCH_STATUS_SCHEMA,
+        model=model,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        task_key=",".join(t["task_key"] for t in chunk),
+    )
+    valid_keys = {t["task_key"] for t in chunk}
+    parsed = {}
+    for item in data["tasks"]:
+        if item["task_key"] in valid_keys:
+            parsed[item["task_key"]] = set(item["done"])
+    return parsed
 
 
 
@@ -140,7 +281,7 @@ def run_ai_analysis(task):
 def analyze_task_and_attach_files(jira_client, task, user):
     try:
         analysis = run_ai_analysis(task)
-        attach_files_to_task(jira_client, task, user)
+        analysis["attachments"] = attach_files_to_task(jira_client, task, user)
         return analysis
     except Exception as e:
         logger.warning(f"Task analysis + file attach failed for {task.get('key')}: {e}")
@@ -0,0 +1,48 @@
+# workers/services/clients.py
+"""
+Dış servis istemcileri için tembel (lazy) kayıt.
+İstemci ve ağır SDK importları (openai, jira) ilk kullanımda, thread-safe
+şekilde bir kez yapılır; böylece manage.py komutları, migration'lar ve
+testler kimlik bilgisi veya ağ olmadan açılır.
+"""
+import threading
+
+_factories = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+def register(name, factory):
+    """name için istemciyi oluşturacak argümansız factory'yi kaydeder."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get(name):
+    """İstemciyi döner; ilk çağrıda factory ile oluşturur. Factory hatası cache'lenmez."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        if name not in _instances:
+            try:
+                factory = _factories[name]
+            except KeyError:
+                raise LookupError(f"Kayıtlı istemci yok: {name}")
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def is_initialized(name):
+    return name in _instances
+
+
+def reset(name=None):
+    """Oluşturulmuş istemciyi (ya da hepsini) atar; sonraki get yeniden oluşturur."""
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
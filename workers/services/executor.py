@@ -0,0 +1,76 @@
+# workers/services/executor.py
+import contextvars
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WORKER_THREAD_PREFIX = "ai-worker"
+
+
+def get_ai_concurrency():
+    return max(1, getattr(settings, "AI_MAX_CONCURRENCY", 8))
+
+
+def get_ai_timeout():
+    return getattr(settings, "AI_CALL_TIMEOUT", 30)
+
+
+def is_worker_thread():
+    """Çağrı run_in_parallel havuzundaki bir thread'de mi çalışıyor?"""
+    return threading.current_thread().name.startswith(WORKER_THREAD_PREFIX)
+
+
+def run_in_parallel(func, items, max_workers=None, timeout=None):
+    """
+    func(item) çağrılarını sınırlı sayıda thread ile paralel çalıştırır.
+    Sonuçları items sırasıyla [(result, error), ...] olarak döner; hata olan
+    çağrıda result None, error exception olur.
+
+    timeout çağrı başına süredir. Havuz dolu olduğunda sırada bekleyen
+    çağrılar da hesaba katılarak toplam bekleme süresi sınırlanır; süresi
+    dolan çağrılar TimeoutError ile döner. timeout=0 süre sınırı koymaz
+    (yarıda bırakılamayacak işler için, ör. Jira'ya dosya yükleme).
+
+    NOT: func içinde DB yazma yapılmamalı; sonuçlar çağıran thread'de
+    uygulanmalı.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    max_workers = min(max_workers or get_ai_concurrency(), len(items))
+    timeout = timeout if timeout is not None else get_ai_timeout()
+
+    # Tek eleman için thread açmaya gerek yok
+    if len(items) == 1:
+        try:
+            return [(func(items[0]), None)]
+        except Exception as e:
+            return [(None, e)]
+
+    rounds = math.ceil(len(items) / max_workers)
+    overall_timeout = timeout * rounds if timeout else None
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=WORKER_THREAD_PREFIX)
+    try:
+        # contextvars (ör. llm_call_context) thread'lere taşınsın; her çağrıya ayrı kopya
+        futures = [pool.submit(contextvars.copy_context().run, func, item) for item in items]
+        wait(futures, timeout=overall_timeout)
+
+        results = []
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                results.append((None, TimeoutError(f"{timeout}s içinde tamamlanmadı")))
+                continue
+            error = future.exception()
+            results.append((None, error) if error else (future.result(), None))
+        return results
+    finally:
+        # Süresi dolan çağrıları bekleme; thread'ler arka planda biter
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,218 @@
+# workers/services/file_catalog.py
+"""
+Paylaşımlı klasör (FILE_CATALOG_BASE_DIR) için kalıcı dosya kataloğu.
+Klasör bir kez taranır, sonrasında sadece mtime/size değişen dosyalar
+yeniden indekslenir; eşleştirme dosya sistemi yerine token indeksinden yapılır.
+"""
+import logging
+import math
+import os
+
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from workers.models import CatalogFile, CatalogToken
+from workers.services.profiling import span
+from workers.services.text_utils import fold_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+# tokenize değiştiğinde artırılmalı; eski sürümle indekslenen dosyalar
+# bir sonraki refresh_catalog'da yeniden indekslenir
+TOKENIZER_VERSION = 1
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _expertise_of(base_dir, dir_path):
+    rel = os.path.relpath(dir_path, base_dir)
+    if rel in (".", ""):
+        return ""
+    return rel.replace("\\", "/").split("/", 1)[0]
+
+
+def _scan(base_dir):
+    """base_dir altındaki dosyaları (path, name, expertise, size, mtime) olarak döner."""
+    stack = [base_dir]
+    while stack:
+        current = stack.pop()
+        rows = []
+        # Klasör okunduktan sonra yield edilir; tüketicinin DB yazmaları span'e girmez
+        with span("files"):
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                rows.append((
+                                    os.path.join(current, entry.name),
+                                    entry.name,
+                                    _expertise_of(base_dir, current),
+                                    st.st_size,
+                                    st.st_mtime,
+                                ))
+                        except OSError as e:
+                            logger.warning(f"Dosya okunamadı: {entry.path} | Hata: {e}")
+            except OSError as e:
+                logger.warning(f"Klasör okunamadı: {current} | Hata: {e}")
+        yield from rows
+
+
+def _write_tokens(files):
+    CatalogToken.objects.filter(file__in=files).delete()
+    CatalogToken.objects.bulk_create(
+        [CatalogToken(token=token, file=f) for f in files for token in tokenize(f.name)],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def refresh_catalog(base_dir, rebuild=False):
+    """
+    Kataloğu günceller: yeni dosyaları ekler, mtime/size değişenleri yeniden
+    indeksler, artık olmayanları siler. rebuild=True tüm kataloğu baştan kurar.
+    Dönüş: {"added": n, "updated": n, "removed": n, "unchanged": n}
+    """
+    if rebuild:
+        CatalogFile.objects.filter(root=base_dir).delete()
+
+    known = {
+        path: (pk, size, mtime, version)
+        for pk, path, size, mtime, version in CatalogFile.objects.filter(root=base_dir).values_list(
+            "pk", "path", "size", "mtime", "token_version"
+        )
+    }
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    to_create, to_update = [], []
+
+    def flush():
+        with transaction.atomic():
+            if to_create:
+                created = CatalogFile.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+                _write_tokens(created)
+            if to_update:
+                CatalogFile.objects.bulk_update(
+                    to_update,
+                    ["name", "expertise", "size", "mtime", "token_count", "token_version"],
+                    batch_size=BATCH_SIZE,
+                )
+                _write_tokens(to_update)
+        to_create.clear()
+        to_update.clear()
+
+    for path, name, expertise, size, mtime in _scan(base_dir):
+        entry = known.pop(path, None)
+        if entry is None:
+            to_create.append(CatalogFile(
+                root=base_dir, path=path, name=name, expertise=expertise, size=size, mtime=mtime,
+                token_count=len(tokenize(name)), token_version=TOKENIZER_VERSION,
+            ))
+            stats["added"] += 1
+        elif entry[1] != size or entry[2] != mtime or entry[3] != TOKENIZER_VERSION:
+            to_update.append(CatalogFile(
+                pk=entry[0], root=base_dir, path=path, name=name, expertise=expertise, size=size, mtime=mtime,
+                token_count=len(tokenize(name)), token_version=TOKENIZER_VERSION,
+            ))
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+
+        if len(to_create) + len(to_update) >= BATCH_SIZE:
+            flush()
+    flush()
+
+    # Taramada görülmeyen dosyalar silinmiş demektir
+    removed_ids = [entry[0] for entry in known.values()]
+    for i in range(0, len(removed_ids), BATCH_SIZE):
+        CatalogFile.objects.filter(pk__in=removed_ids[i:i + BATCH_SIZE]).delete()
+    stats["removed"] = len(removed_ids)
+
+    logger.info(f"Dosya kataloğu güncellendi ({base_dir}): {stats}")
+    return stats
+
+
+def ensure_catalog(base_dir):
+    """Katalog hiç kurulmamışsa bir kez kurar (sonraki çağrılarda tarama yapılmaz)."""
+    if not CatalogFile.objects.filter(root=base_dir).exists():
+        logger.warning(
+            f"{base_dir} için dosya kataloğu yok, şimdi kuruluyor. "
+            "Düzenli güncelleme için: python manage.py refresh_file_catalog"
+        )
+        refresh_catalog(base_dir)
+
+
+def rank_files(base_dir, query_weights, expertise=None, expertise_boost=1.5, top_k=5, min_score=0.3):
+    """
+    Dosya adlarını BM25 ile sıralar.
+    query_weights: {token: ağırlık} (örn. summary token'ları 1.0, description 0.5)
+    Skor yaklaşık 0-1 aralığına normalize edilir; expertise klasöründeki
+    dosyalar expertise_boost ile çarpılır.
+    Aynı ad + boyuttaki kopyalardan sadece en yüksek skorlu olan döner.
+    Dönüş: [(CatalogFile, skor), ...] (en fazla top_k, skor >= min_score)
+    """
+    if not query_weights:
+        return []
+
+    files = CatalogFile.objects.filter(root=base_dir)
+    corpus = files.aggregate(n=Count("pk"), avgdl=Avg("token_count"))
+    n_docs, avgdl = corpus["n"], corpus["avgdl"] or 1.0
+    if not n_docs:
+        return []
+
+    df = dict(
+        CatalogToken.objects.filter(token__in=list(query_weights), file__root=base_dir)
+        .values_list("token")
+        .annotate(df=Count("file_id"))
+    )
+    idf = {
+        token: math.log(1 + (n_docs - df.get(token, 0) + 0.5) / (df.get(token, 0) + 0.5))
+        for token in query_weights
+    }
+    # Normalizasyon: ortalama uzunluktaki bir dosya adının en bilgilendirici
+    # sorgu token'larının hepsini içermesi durumunda alacağı skor (~1.0).
+    # Uzun açıklamalar skoru seyreltmesin diye tüm sorgu token'ları toplanmaz.
+    weighted_idf = sorted((query_weights[t] * idf[t] for t in df), reverse=True)
+    max_score = sum(weighted_idf[:max(1, round(avgdl))])
+    if not df or max_score <= 0:
+        return []
+
+    matched_tokens = {}
+    for file_id, token in CatalogToken.objects.filter(
+        token__in=list(df), file__root=base_dir
+    ).values_list("file_id", "token"):
+        matched_tokens.setdefault(file_id, []).append(token)
+
+    # Dosya adında her token bir kez sayılır (tf = 1)
+    scored = []
+    candidates = files.filter(pk__in=list(matched_tokens)).only(
+        "path", "name", "expertise", "size", "token_count"
+    )
+    for f in candidates:
+        norm = 1 - BM25_B + BM25_B * (f.token_count or 1) / avgdl
+        score = sum(
+            query_weights[t] * idf[t] * (BM25_K1 + 1) / (1 + BM25_K1 * norm)
+            for t in matched_tokens[f.pk]
+        ) / max_score
+        if expertise and f.expertise == expertise:
+            score *= expertise_boost
+        if score >= min_score:
+            scored.append((f, round(score, 4)))
+
+    scored.sort(key=lambda pair: (-pair[1], pair[0].path))
+
+    results, seen = [], set()
+    for f, score in scored:
+        dup_key = (fold_text(f.name), f.size)
+        if dup_key in seen:
+            continue
+        seen.add(dup_key)
+        results.append((f, score))
+        if len(results) >= top_k:
+            break
+    return results
@@ -1,57 +1,168 @@
+import hashlib
+import logging
 import os
 
-def match_task_to_files(task_summary, task_description, user_expertise, base_dir="P:/Performance"):
+from django.conf import settings
+
+from workers.models import JiraAttachmentRecord
+from workers.services.executor import run_in_parallel
+from workers.services.file_catalog import ensure_catalog, rank_files
+from workers.services.profiling import span
+from workers.services.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def build_query_weights(task_summary, task_description, description_weight=0.5):
+    """Summary token'ları tam, description token'ları daha düşük ağırlıkla sorguya girer."""
+    weights = {}
+    for token in tokenize(task_description):
+        weights[token] = description_weight
+    for token in tokenize(task_summary):
+        weights[token] = 1.0
+    return weights
+
+
+def match_task_to_files(task_summary, task_description, user_expertise, base_dir=None, top_k=None, min_score=None):
     """
     Task summary/description ile dosya adlarını eşleştirir.
-    Önce kullanıcının expertise klasöründe, sonra diğerlerinde arar.
+    Dosya adları katalog indeksi üzerinden BM25 ile puanlanır; kullanıcının
+    expertise klasöründeki dosyalar öne çıkarılır ve eşik üstündeki en iyi
+    top_k dosya (kopyalar ayıklanmış halde) döner.
     """
-
+    base_dir = base_dir or settings.FILE_CATALOG_BASE_DIR
     matched_files = []
 
     if not task_summary and not task_description:
         return matched_files
 
-    task_summary = (task_summary or "").lower()
-    task_description = (task_description or "").lower()
-
-    # 1️⃣ Öncelikli klasör (kullanıcının uzmanlığı)
-    if user_expertise:
-        expertise_dir = os.path.join(base_dir, user_expertise)
-        if os.path.exists(expertise_dir):
-            for root, dirs, files in os.walk(expertise_dir):
-                for f in files:
-                    if task_summary in f.lower() or task_description in f.lower():
-                        matched_files.append(os.path.join(root, f))
-
-    # 2️⃣ Diğer klasörler
-    for root, dirs, files in os.walk(base_dir):
-        if user_expertise and user_expertise in root:
-            # uzmanlık klasörü zaten bakıldı, tekrar geçme
-            continue
-        for f in files:
-            if task_summary in f.lower() or task_description in f.lower():
-                matched_files.append(os.path.join(root, f))
+    query_weights = build_query_weights(task_summary, task_description)
+    if not query_weights:
+        return matched_files
+
+    ensure_catalog(base_dir)
 
+    ranked = rank_files(
+        base_dir,
+        query_weights,
+        expertise=user_expertise,
+        expertise_boost=getattr(settings, "FILE_MATCH_EXPERTISE_BOOST", 1.5),
+        top_k=top_k or getattr(settings, "FILE_MATCH_TOP_K", 5),
+        min_score=min_score if min_score is not None else getattr(settings, "FILE_MATCH_MIN_SCORE", 0.3),
+    )
+    matched_files = [f.path for f, _ in ranked]
     return matched_files
 
 
-def attach_files_to_task(jira_client, task, user, base_dir="P:/Performance"):
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """Dosyayı parça parça okuyarak sha256 hesaplar (büyük dosyalar belleğe alınmaz)."""
+    digest = hashlib.sha256()
+    with span("files"), open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _task_field(task, name):
+    # task hem Jira Issue nesnesi hem de {"key": ..., "summary": ...} sözlüğü olabilir
+    if isinstance(task, dict):
+        return task.get(name)
+    if name == "key":
+        return task.key
+    return getattr(getattr(task, "fields", task), name, None)
+
+
+def _existing_jira_attachments(task):
+    """Issue üzerinde zaten bulunan ekler (dosya adı, boyut); Jira'dan elle eklenenler için."""
+    existing = set()
+    for a in _task_field(task, "attachment") or []:
+        if isinstance(a, dict):
+            existing.add((a.get("filename"), a.get("size")))
+        else:
+            existing.add((getattr(a, "filename", None), getattr(a, "size", None)))
+    return existing
+
+
+def _upload(jira_client, issue_key, file_path):
+    # Dosya nesnesi verildiğinde jira istemcisi multipart isteği akış halinde gönderir
+    with open(file_path, "rb") as f:
+        jira_client.add_attachment(issue=issue_key, attachment=f, filename=os.path.basename(file_path))
+
+
+def attach_files_to_task(jira_client, task, user, base_dir=None):
     """
     Eşleşen dosyaları bulup Jira task'ine ekler.
+    Aynı içerik (sha256) bu issue'ya daha önce eklendiyse tekrar yüklenmez;
+    kalan dosyalar sınırlı sayıda thread ile paralel yüklenir.
+    Dönüş: {"uploaded": [...], "skipped": [...], "failed": [...],
+            "bytes_uploaded": n, "bytes_skipped": n}
     """
     profile = getattr(user, "userprofile", None)
     expertise = getattr(profile, "expertise", None)
+    issue_key = _task_field(task, "key")
+    summary = {"uploaded": [], "skipped": [], "failed": [], "bytes_uploaded": 0, "bytes_skipped": 0}
 
     matched = match_task_to_files(
-        task_summary=task.summary,
-        task_description=task.description,
+        task_summary=_task_field(task, "summary"),
+        task_description=_task_field(task, "description"),
         user_expertise=expertise,
         base_dir=base_dir,
     )
+    if not matched:
+        return summary
+
+    concurrency = getattr(settings, "ATTACHMENT_UPLOAD_CONCURRENCY", 4)
+    timeout = getattr(settings, "ATTACHMENT_UPLOAD_TIMEOUT", 300)
+
+    # Dosya hash'leri (ağ paylaşımında I/O beklemesi olduğu için paralel)
+    hashed = run_in_parallel(
+        lambda path: (file_sha256(path), os.path.getsize(path)),
+        matched, max_workers=concurrency, timeout=timeout,
+    )
+
+    already_attached = set(
+        JiraAttachmentRecord.objects.filter(
+            issue_key=issue_key, sha256__in=[h[0] for h, err in hashed if not err]
+        ).values_list("sha256", flat=True)
+    )
+    on_issue = _existing_jira_attachments(task)
 
-    for file_path in matched:
-        try:
-            with open(file_path, "rb") as f:
-                jira_client.add_attachment(issue=task.key, attachment=f)
-        except Exception as e:
-            print(f"Dosya eklenemedi: {file_path} | Hata: {e}")
+    to_upload = []
+    for file_path, (result, error) in zip(matched, hashed):
+        if error:
+            logger.warning(f"Dosya okunamadı: {file_path} | Hata: {error}")
+            summary["failed"].append(file_path)
+            continue
+        sha, size = result
+        if sha in already_attached or (os.path.basename(file_path), size) in on_issue:
+            summary["skipped"].append(file_path)
+            summary["bytes_skipped"] += size
+            continue
+        # Aynı içerik farklı klasörlerde birden fazla eşleşmiş olabilir
+        already_attached.add(sha)
+        to_upload.append((file_path, sha, size))
+
+    # Yüklemeye süre sınırı konmaz: süresi dolan yükleme thread'de sürüp Jira'ya
+    # eklenir ama kaydı yazılmaz, sonraki çalıştırmada tekrar yüklenirdi.
+    # Her Jira isteği zaten JIRA_TIMEOUT ve sınırlı retry ile biter.
+    uploads = run_in_parallel(
+        lambda item: _upload(jira_client, issue_key, item[0]),
+        to_upload, max_workers=concurrency, timeout=0,
+    )
+
+    records = []
+    for (file_path, sha, size), (_, error) in zip(to_upload, uploads):
+        if error:
+            logger.warning(f"Dosya eklenemedi: {file_path} | Hata: {error}")
+            summary["failed"].append(file_path)
+            continue
+        summary["uploaded"].append(file_path)
+        summary["bytes_uploaded"] += size
+        records.append(JiraAttachmentRecord(issue_key=issue_key, sha256=sha, file_path=file_path, size=size))
+    JiraAttachmentRecord.objects.bulk_create(records, ignore_conflicts=True)
+
+    logger.info(
+        f"{issue_key}: {len(summary['uploaded'])} dosya yüklendi ({summary['bytes_uploaded']} bayt), "
+        f"{len(summary['skipped'])} dosya atlandı ({summary['bytes_skipped']} bayt)."
+    )
+    return summary
@@ -0,0 +1,226 @@
+# workers/services/jira_client.py
+"""
+Thread'ler arasında paylaşılan Jira istemcisi:
+- HTTP bağlantı havuzu (JIRA_POOL_MAXSIZE)
+- 429 / 5xx / bağlantı hatalarında Retry-After'a uyan üstel geri çekilme
+- art arda hatalarda devre kesici (circuit breaker)
+- get_jira_metrics() ile retry ve devre kesici metrikleri
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+
+from workers.services.profiling import span
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class JiraUnavailable(Exception):
+    """Devre kesici açıkken Jira çağrısı yapılmaz."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self.open_count = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Çağrıya izin var mı? Açık devre reset_timeout sonrası tek bir deneme çağrısına izin verir."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.open_count += 1
+                    logger.error(f"Jira devre kesici açıldı ({self._failures} hata).")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class JiraClientManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self.breaker = CircuitBreaker(
+            failure_threshold=getattr(settings, "JIRA_BREAKER_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "JIRA_BREAKER_RESET", 60),
+        )
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"calls": 0, "retries": 0, "failures": 0, "last_error": ""}
+
+    def _count(self, name, error=None):
+        with self._metrics_lock:
+            self._metrics[name] += 1
+            if error is not None:
+                self._metrics["last_error"] = str(error)[:500]
+
+    def metrics(self):
+        with self._metrics_lock:
+            data = dict(self._metrics)
+        data["breaker_state"] = self.breaker.state
+        data["breaker_open_count"] = self.breaker.open_count
+        data["connected"] = self._client is not None
+        return data
+
+    def _build(self):
+        from jira import JIRA  # ağır import; sadece ilk bağlantıda
+
+        if not (settings.JIRA_URL and settings.JIRA_EMAIL and settings.JIRA_API_TOKEN):
+            raise ImproperlyConfigured("JIRA_URL, JIRA_EMAIL ve JIRA_API_TOKEN ayarlı olmalı.")
+        jira = JIRA(
+            server=settings.JIRA_URL,
+            basic_auth=(settings.JIRA_EMAIL, settings.JIRA_API_TOKEN),
+            max_retries=0,  # retry'ı burada, Retry-After'a uyarak yapıyoruz
+            timeout=getattr(settings, "JIRA_TIMEOUT", 30),
+        )
+        pool_size = getattr(settings, "JIRA_POOL_MAXSIZE", 20)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        jira._session.mount("https://", adapter)
+        jira._session.mount("http://", adapter)
+        return ResilientJira(jira, self)
+
+    def get_client(self):
+        """Paylaşılan istemciyi döner; bağlanılamıyorsa veya devre açıksa None."""
+        if self._client is not None:
+            return self._client
+
+        with self._lock:
+            if self._client is not None:
+                return self._client
+            # Bağlantı kurulamadığında her istekte yeniden denememek için
+            if not self.breaker.allow():
+                return None
+            try:
+                self._client = self._build()
+                self.breaker.record_success()
+            except Exception as e:
+                self.breaker.record_failure()
+                self._count("failures", e)
+                logger.error(f"Jira bağlantısı kurulamadı: {e}")
+                return None
+        return self._client
+
+    def reset(self):
+        with self._lock:
+            self._client = None
+
+    def call(self, func, *args, **kwargs):
+        """func'u retry + devre kesici ile çağırır."""
+        with span("jira"):
+            return self._call(func, *args, **kwargs)
+
+    def _call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            raise JiraUnavailable("Jira devre kesicisi açık, çağrı yapılmadı.")
+
+        max_retries = getattr(settings, "JIRA_MAX_RETRIES", 4)
+        self._count("calls")
+        # add_attachment gibi dosya gövdeli çağrılar tekrar denenirken baştan okunmalı
+        streams = [(a, a.tell()) for a in (*args, *kwargs.values()) if hasattr(a, "seek") and hasattr(a, "tell")]
+        attempt = 0
+        while True:
+            for stream, position in streams:
+                stream.seek(position)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                retryable = status in RETRYABLE_STATUS or isinstance(
+                    e, (requests.ConnectionError, requests.Timeout)
+                )
+                if not retryable:
+                    # 4xx gibi hatalar Jira'nın sağlığıyla ilgili değil; Jira yanıt verdi,
+                    # yarı açık devrenin deneme çağrısı da başarılı sayılır
+                    self.breaker.record_success()
+                    raise
+                if attempt >= max_retries:
+                    self.breaker.record_failure()
+                    self._count("failures", e)
+                    raise
+                delay = _retry_delay(e, attempt)
+                attempt += 1
+                self._count("retries", e)
+                logger.warning(f"Jira çağrısı başarısız ({status or e}), {delay:.1f}s sonra tekrar denenecek.")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+
+def _retry_delay(error, attempt):
+    """Retry-After varsa ona uyar, yoksa jitter'lı üstel geri çekilme."""
+    response = getattr(error, "response", None)
+    retry_after = None
+    if response is not None:
+        retry_after = (getattr(response, "headers", None) or {}).get("Retry-After")
+    backoff_max = getattr(settings, "JIRA_BACKOFF_MAX", 30)
+    if retry_after:
+        try:
+            return min(float(retry_after), backoff_max)
+        except ValueError:
+            pass
+    base = getattr(settings, "JIRA_BACKOFF_BASE", 0.5)
+    return min(base * (2 ** attempt), backoff_max) * random.uniform(0.8, 1.2)
+
+
+class ResilientJira:
+    """JIRA nesnesini sarar; metot çağrıları JiraClientManager.call üzerinden geçer."""
+
+    def __init__(self, jira, manager):
+        self._jira = jira
+        self._manager = manager
+
+    def __getattr__(self, name):
+        attr = getattr(self._jira, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            return self._manager.call(attr, *args, **kwargs)
+
+        return wrapper
+
+
+jira_manager = JiraClientManager()
+
+
+def get_jira_metrics():
+    return jira_manager.metrics()
+
@@ -1,11 +1,14 @@
 # workers/services/jira_service.py
 import logging
-from jira import JIRA
+import threading
+import time
+
 from django.conf import settings
 
-logger = logging.getLogger(__name__)
+from workers.models import JiraIssue
+from workers.services.jira_client import jira_manager
 
-_jira_client = None
+logger = logging.getLogger(__name__)
 
 # AI action → Jira transition mapping
 ACTION_TO_TRANSITION = {
@@ -14,20 +17,59 @@ ACTION_TO_TRANSITION = {
     "to do": ["To Do", "Open"]
 }
 
+# (project, issue type, status) → (transition haritası, alınma zamanı)
+# Aynı workflow durumundaki issue'lar aynı transition'lara sahiptir.
+_transition_cache = {}
+_transition_lock = threading.Lock()
+
 
 def get_jira_client():
-    """Singleton Jira client oluşturur."""
-    global _jira_client
-    if _jira_client is None:
-        try:
-            _jira_client = JIRA(
-                server=settings.JIRA_URL,
-                basic_auth=(settings.JIRA_EMAIL, settings.JIRA_API_TOKEN)
-            )
-        except Exception as e:
-            logger.error(f"Jira bağlantısı kurulamadı: {e}")
-            return None
-    return _jira_client
+    """
+    Thread'ler arasında paylaşılan Jira client'ı döner (bkz. jira_client.py).
+    Bağlantı kurulamıyorsa veya devre kesici açıksa None.
+    """
+    return jira_manager.get_client()
+
+
+def iter_search_issues(jql, fields="summary,status", page_size=100, max_issues=None, jira=None):
+    """
+    JQL sonucunu sayfa sayfa çekip issue'ları tek tek yield eder.
+    - Jira Cloud'da nextPageToken (search/jql), Server/DC'de startAt ile sayfalar.
+    - Sadece istenen fields çekilir; bellekte en fazla bir sayfa tutulur.
+    - max_issues verilirse ya da çağıran döngüden çıkarsa erken durur.
+    """
+    jira = jira or get_jira_client()
+    if jira is None:
+        return
+
+    use_token = getattr(jira, "_is_cloud", False) and hasattr(jira, "enhanced_search_issues")
+    next_token = None
+    start_at = 0
+    yielded = 0
+
+    while True:
+        limit = page_size if max_issues is None else min(page_size, max_issues - yielded)
+        if limit <= 0:
+            return
+
+        if use_token:
+            page = jira.enhanced_search_issues(jql, nextPageToken=next_token, maxResults=limit, fields=fields)
+        else:
+            page = jira.search_issues(jql, startAt=start_at, maxResults=limit, fields=fields)
+
+        for issue in page:
+            yield issue
+        yielded += len(page)
+        start_at += len(page)
+
+        if use_token:
+            next_token = getattr(page, "nextPageToken", None)
+            if not next_token or not page:
+                return
+        else:
+            total = getattr(page, "total", None)
+            if not page or len(page) < limit or (total is not None and start_at >= total):
+                return
 
 
 def get_jira_tasks_for_user(user):
@@ -46,65 +88,152 @@ def get_jira_tasks_for_user(user):
 
     jql = f'(assignee = "{user.email}" OR reporter = "{user.email}") AND project in ({",".join(projects)}) ORDER BY created DESC'
     try:
-        issues = jira.search_issues(
-            jql,
-            maxResults=200,
-            fields="summary,description,status,assignee,project"
-        )
+        return [
+            {
+                "key": issue.key,
+                "summary": issue.fields.summary,
+                "description": getattr(issue.fields, "description", "") or "",
+                "status": issue.fields.status.name,
+            }
+            for issue in iter_search_issues(jql, fields="summary,description,status", jira=jira)
+        ]
     except Exception as e:
         logger.error(f"Jira taskları alınamadı: {e}")
         return []
 
-    return [
-        {
-            "key": issue.key,
-            "summary": issue.fields.summary,
-            "description": getattr(issue.fields, "description", "") or "",
-            "status": issue.fields.status.name,
-        }
-        for issue in issues
-    ]
 
+def _workflow_states(issue_keys):
+    """Yerel kopyadan {issue_key: (project, issue type, status)}; kopyada olmayanlar dönmez."""
+    rows = JiraIssue.objects.filter(key__in=issue_keys, is_deleted=False).values_list(
+        "key", "project_key", "issue_type", "status"
+    )
+    return {
+        key: (project, issue_type, status.lower())
+        for key, project, issue_type, status in rows
+        if status
+    }
 
-def get_transition_id_by_name(issue_key, action_key):
-    """Bir issue için verilen action_key'e uygun transition ID’yi döner."""
-    jira = get_jira_client()
+
+def get_transition_map(issue_key, state=None, jira=None):
+    """
+    Issue'nun transition'larını {ad (küçük harf): (id, hedef status)} olarak döner.
+    state verilirse sonuç JIRA_TRANSITION_CACHE_TTL boyunca o durum için cache'lenir.
+    """
+    if state is not None:
+        ttl = getattr(settings, "JIRA_TRANSITION_CACHE_TTL", 3600)
+        with _transition_lock:
+            cached = _transition_cache.get(state)
+        if cached and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+
+    jira = jira or get_jira_client()
     if jira is None:
         return None
 
-    transitions = jira.transitions(issue_key)
-    logger.info(f"{issue_key} için mevcut transitionlar: {[t['name'] for t in transitions]}")
+    transitions = {
+        t["name"].lower(): (t["id"], (t.get("to") or {}).get("name", ""))
+        for t in jira.transitions(issue_key)
+    }
+    logger.debug(f"{issue_key} için mevcut transitionlar: {list(transitions)}")
+
+    if state is not None:
+        with _transition_lock:
+            _transition_cache[state] = (transitions, time.monotonic())
+    return transitions
+
+
+def invalidate_transition_cache(state=None):
+    """Verilen durumun (ya da hepsinin) transition haritasını cache'ten atar."""
+    with _transition_lock:
+        if state is None:
+            _transition_cache.clear()
+        else:
+            _transition_cache.pop(state, None)
+
 
+def _match_transition(transitions, action_key):
     possible_names = ACTION_TO_TRANSITION.get(action_key.lower(), [])
     if isinstance(possible_names, str):
         possible_names = [possible_names]
+    wanted = {p.lower() for p in possible_names}
 
-    for t in transitions:
-        t_name = t["name"].lower()
-        if any(p.lower() == t_name for p in possible_names):
-            return t["id"]
-
+    for name, transition in transitions.items():
+        if name in wanted:
+            return transition
     return None
 
 
-def move_task(task_key, action):
-    """Jira task’ını verilen AI aksiyonuna göre taşır."""
+def get_transition_id_by_name(issue_key, action_key):
+    """Bir issue için verilen action_key'e uygun transition ID’yi döner."""
+    state = _workflow_states([issue_key]).get(issue_key)
+    transitions = get_transition_map(issue_key, state)
+    if not transitions:
+        return None
+
+    transition = _match_transition(transitions, action_key)
+    return transition[0] if transition else None
+
+
+def move_tasks(task_keys, action):
+    """
+    Birden çok Jira task'ını verilen AI aksiyonuna göre taşır; {task_key: bool} döner.
+    Task'lar yerel kopyadaki workflow durumuna göre gruplanır; transition listesi
+    grup başına en fazla bir kez alınır, sonrasında task başına tek çağrı yapılır.
+    """
+    task_keys = list(dict.fromkeys(task_keys))
+    results = {key: False for key in task_keys}
+    if not task_keys:
+        return results
+
     jira = get_jira_client()
     if jira is None:
-        return False
+        return results
 
-    transition_id = get_transition_id_by_name(task_key, action)
-    if not transition_id:
-        logger.warning(f"{task_key} için '{action}' transition bulunamadı.")
-        return False
+    states = _workflow_states(task_keys)
+    groups = {}
+    for key in task_keys:
+        groups.setdefault(states.get(key), []).append(key)
 
-    try:
-        jira.transition_issue(task_key, transition_id)
+    planned = []  # (task_key, state, transition_id, hedef status)
+    for state, keys in groups.items():
+        # Kopyada olmayan issue'ların durumu bilinmiyor, her biri ayrı sorulur
+        lookups = [(keys[0], keys)] if state is not None else [(key, [key]) for key in keys]
+        for issue_key, members in lookups:
+            try:
+                transitions = get_transition_map(issue_key, state, jira=jira)
+            except Exception as e:
+                logger.error(f"Transitionlar alınamadı ({issue_key}): {e}")
+                continue
+            transition = _match_transition(transitions or {}, action)
+            if not transition:
+                logger.warning(f"{', '.join(members)} için '{action}' transition bulunamadı.")
+                continue
+            planned.extend((key, state, transition[0], transition[1]) for key in members)
+
+    moved = {}  # hedef status → taşınan key'ler
+    for task_key, state, transition_id, to_status in planned:
+        try:
+            jira.transition_issue(task_key, transition_id)
+        except Exception as e:
+            logger.error(f"Task taşınamadı ({task_key}): {e}")
+            # Workflow değişmiş olabilir; bir sonraki denemede tekrar sorulsun
+            if state is not None:
+                invalidate_transition_cache(state)
+            continue
         logger.info(f"{task_key} → {action} taşındı.")
-        return True
-    except Exception as e:
-        logger.error(f"Task taşınamadı ({task_key}): {e}")
-        return False
+        results[task_key] = True
+        if to_status:
+            moved.setdefault(to_status, []).append(task_key)
+
+    # Kopyadaki status'u güncelle ki sonraki çağrılar doğru cache anahtarını kullansın
+    for to_status, keys in moved.items():
+        JiraIssue.objects.filter(key__in=keys).update(status=to_status)
+    return results
+
+
+def move_task(task_key, action):
+    """Jira task’ını verilen AI aksiyonuna göre taşır."""
+    return move_tasks([task_key], action)[task_key]
 
 
 def add_comment(task_key, comment):
@@ -128,17 +257,15 @@ def get_worker_tasks(jira_username):
         return []
 
     jql = f'assignee = "{jira_username}" AND status != Done ORDER BY created DESC'
+    tasks = []
     try:
-        issues = jira.search_issues(jql, maxResults=50, fields="summary,description,status")
+        for issue in iter_search_issues(jql, fields="summary,description", max_issues=50, jira=jira):
+            tasks.append({
+                "key": issue.key,
+                "title": issue.fields.summary,
+                "description": getattr(issue.fields, "description", "") or ""
+            })
     except Exception as e:
         logger.error(f"Worker taskları alınamadı: {e}")
         return []
-
-    tasks = []
-    for issue in issues:
-        tasks.append({
-            "key": issue.key,
-            "title": issue.fields.summary,
-            "description": getattr(issue.fields, "description", "") or ""
-        })
     return tasks
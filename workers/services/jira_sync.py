@@ -0,0 +1,350 @@
+# workers/services/jira_sync.py
+"""
+Jira issue'larını yerel JiraIssue tablosuna artımlı olarak senkronlar.
+View'lar Jira yerine bu tablodan okur; tablo eskiyse senkron arka planda
+başlatılır, sayfa Jira'yı beklemez.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from workers.models import JiraIssue, JiraSyncState, WorkerProfile
+from workers.services.jira_service import get_jira_client, iter_search_issues
+from workers.services.progress_cache import invalidate_all_progress, invalidate_progress_for_emails
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_NAME = "issues"
+SYNC_FIELDS = "summary,description,status,assignee,reporter,project,issuetype,created,updated"
+PAGE_SIZE = 100
+
+_sync_lock = threading.Lock()
+_jira_tz = None
+
+
+def _get_jira_timezone(jira):
+    """JQL tarihleri Jira kullanıcısının saat diliminde yorumlanır."""
+    global _jira_tz
+    if _jira_tz is None:
+        try:
+            _jira_tz = ZoneInfo(jira.myself().get("timeZone") or "UTC")
+        except Exception as e:
+            logger.warning(f"Jira saat dilimi alınamadı, UTC kullanılacak: {e}")
+            _jira_tz = ZoneInfo("UTC")
+    return _jira_tz
+
+
+def _parse_jira_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        return None
+
+
+def _issue_to_fields(issue):
+    f = issue.fields
+    assignee = getattr(f, "assignee", None)
+    reporter = getattr(f, "reporter", None)
+    project = getattr(f, "project", None)
+    issue_type = getattr(f, "issuetype", None)
+    return {
+        "key": issue.key,
+        "project_key": getattr(project, "key", "") or issue.key.split("-")[0],
+        "project_name": getattr(project, "name", "") or "",
+        "issue_type": getattr(issue_type, "name", "") or "",
+        "summary": (getattr(f, "summary", "") or "")[:500],
+        "description": getattr(f, "description", "") or "",
+        "status": getattr(getattr(f, "status", None), "name", "") or "",
+        "assignee_email": (getattr(assignee, "emailAddress", "") or "").lower(),
+        "assignee_account_id": getattr(assignee, "accountId", "") or "",
+        "assignee_name": getattr(assignee, "displayName", "") or "",
+        "reporter_email": (getattr(reporter, "emailAddress", "") or "").lower(),
+        "reporter_account_id": getattr(reporter, "accountId", "") or "",
+        "jira_created": _parse_jira_datetime(getattr(f, "created", None)),
+        "jira_updated": _parse_jira_datetime(getattr(f, "updated", None)),
+        "is_deleted": False,
+    }
+
+
+def _search_pages(jira, jql, fields):
+    """iter_search_issues sonucunu PAGE_SIZE'lık gruplar halinde döner (toplu upsert için)."""
+    issues = iter_search_issues(jql, fields=fields, page_size=PAGE_SIZE, jira=jira)
+    while True:
+        page = list(islice(issues, PAGE_SIZE))
+        if not page:
+            return
+        yield page
+
+
+def _upsert_page(issues):
+    """Bir sayfa issue'yu jira_id üzerinden ekler/günceller; en büyük updated değerini döner."""
+    rows = {str(issue.id): _issue_to_fields(issue) for issue in issues}
+    if not rows:
+        return None
+
+    changed_emails = set()
+    with transaction.atomic():
+        existing = JiraIssue.objects.in_bulk(list(rows.keys()), field_name="jira_id")
+        # Taşınan issue'nun yeni key'i başka bir satırda duruyorsa çakışmayı önle
+        moved_keys = [
+            data["key"] for jira_id, data in rows.items()
+            if jira_id in existing and existing[jira_id].key != data["key"]
+        ]
+        if moved_keys:
+            JiraIssue.objects.filter(key__in=moved_keys).exclude(jira_id__in=rows.keys()).delete()
+
+        to_create, to_update = [], []
+        for jira_id, data in rows.items():
+            obj = existing.get(jira_id)
+            if obj is None:
+                to_create.append(JiraIssue(jira_id=jira_id, **data))
+                changed_emails.update((data["assignee_email"], data["reporter_email"]))
+                continue
+            if any(getattr(obj, name) != value for name, value in data.items()):
+                # Eski ve yeni sahiplerin ekranı değişir; overlap ile tekrar gelenler atlanır
+                changed_emails.update((obj.assignee_email, obj.reporter_email, data["assignee_email"], data["reporter_email"]))
+            for name, value in data.items():
+                setattr(obj, name, value)
+            obj.synced_at = timezone.now()  # bulk_update auto_now alanını güncellemez
+            to_update.append(obj)
+
+        # Yeni issue'nun key'i silinmiş eski bir satırda kalmış olabilir
+        if to_create:
+            JiraIssue.objects.filter(key__in=[o.key for o in to_create]).delete()
+            JiraIssue.objects.bulk_create(to_create)
+        if to_update:
+            JiraIssue.objects.bulk_update(to_update, list(_issue_fields_to_update()))
+
+    invalidate_progress_for_emails(changed_emails)
+    updated = [r["jira_updated"] for r in rows.values() if r["jira_updated"]]
+    return max(updated) if updated else None
+
+
+def _issue_fields_to_update():
+    return (
+        "key", "project_key", "project_name", "issue_type", "summary", "description", "status",
+        "assignee_email", "assignee_account_id", "assignee_name", "reporter_email", "reporter_account_id",
+        "jira_created", "jira_updated", "is_deleted", "synced_at",
+    )
+
+
+def sync_issues(full=False):
+    """
+    MY_JIRA_PROJECTS içindeki issue'ları senkronlar.
+    - İlk çalıştırmada (veya full=True) tüm issue'lar çekilir.
+    - Sonrasında sadece updated >= watermark olanlar çekilir.
+    - JIRA_FULL_SYNC_INTERVAL dolduğunda (veya full=True) sadece id'ler
+      taranır; Jira'da artık görünmeyen satırlar is_deleted ile işaretlenir.
+    Dönüş: {"fetched": n, "tombstoned": m}
+    """
+    jira = get_jira_client()
+    if jira is None:
+        raise RuntimeError("Jira’ya bağlanılamadı.")
+
+    projects = getattr(settings, "MY_JIRA_PROJECTS", [])
+    if not projects:
+        logger.warning("MY_JIRA_PROJECTS ayarlarda tanımlı değil.")
+        return {"fetched": 0, "tombstoned": 0}
+
+    state, _ = JiraSyncState.objects.get_or_create(name=SYNC_STATE_NAME)
+    started_at = timezone.now()
+    project_jql = f"project in ({','.join(projects)})"
+
+    jql = project_jql
+    if state.watermark and not full:
+        # Jira dakika hassasiyetinde; sınırdaki güncellemeler kaçmasın diye geriye pay bırak
+        overlap = getattr(settings, "JIRA_SYNC_OVERLAP", 120)
+        since = (state.watermark - timedelta(seconds=overlap)).astimezone(_get_jira_timezone(jira))
+        jql += f' AND updated >= "{since:%Y/%m/%d %H:%M}"'
+    jql += " ORDER BY updated ASC"
+
+    fetched = 0
+    watermark = state.watermark
+    for page in _search_pages(jira, jql, SYNC_FIELDS):
+        fetched += len(page)
+        page_max = _upsert_page(page)
+        if page_max and (watermark is None or page_max > watermark):
+            watermark = page_max
+
+    tombstoned = 0
+    full_interval = getattr(settings, "JIRA_FULL_SYNC_INTERVAL", 6 * 3600)
+    if full or state.last_full_sync_at is None or state.last_full_sync_at < started_at - timedelta(seconds=full_interval):
+        tombstoned = _tombstone_missing(jira, project_jql, projects)
+        state.last_full_sync_at = started_at
+
+    state.watermark = watermark
+    state.last_sync_at = started_at
+    state.save()
+    logger.info(f"Jira senkronu: {fetched} issue güncellendi, {tombstoned} issue silindi olarak işaretlendi.")
+    return {"fetched": fetched, "tombstoned": tombstoned}
+
+
+def _tombstone_missing(jira, project_jql, projects):
+    """Jira'da artık bulunmayan (silinen ya da proje dışına taşınan) issue'ları işaretler."""
+    seen_ids = set()
+    for page in _search_pages(jira, project_jql, "updated"):
+        seen_ids.update(str(issue.id) for issue in page)
+
+    now = timezone.now()
+    alive = JiraIssue.objects.filter(is_deleted=False)
+    # Büyük projelerde IN (...) parametre sınırına takılmamak için fark Python'da alınır
+    local_ids = alive.filter(project_key__in=projects).values_list("jira_id", flat=True)
+    missing = [jira_id for jira_id in local_ids if jira_id not in seen_ids]
+    tombstoned = 0
+    for i in range(0, len(missing), 500):
+        tombstoned += JiraIssue.objects.filter(jira_id__in=missing[i:i + 500]).update(
+            is_deleted=True, synced_at=now
+        )
+    # Ayarlardan çıkarılan projelerin issue'ları da artık gösterilmez
+    tombstoned += alive.exclude(project_key__in=projects).update(is_deleted=True, synced_at=now)
+    if tombstoned:
+        invalidate_all_progress()
+    return tombstoned
+
+
+def _sync_in_background():
+    try:
+        sync_issues()
+    except Exception as e:
+        logger.error(f"Arka plan Jira senkronu başarısız: {e}")
+    finally:
+        _sync_lock.release()
+        connection.close()
+
+
+def get_max_age(view_name):
+    """JIRA_MIRROR_MAX_AGE içinden view'a özel tazelik süresini (saniye) döner."""
+    max_ages = getattr(settings, "JIRA_MIRROR_MAX_AGE", {})
+    return max_ages.get(view_name, max_ages.get("default", 300))
+
+
+def _is_fresh(state, max_age):
+    return (
+        state is not None and state.last_sync_at is not None
+        and state.last_sync_at >= timezone.now() - timedelta(seconds=max_age)
+    )
+
+
+def ensure_fresh(max_age, blocking=False):
+    """
+    Yerel kopya max_age saniyeden eskiyse senkronu başlatır.
+    blocking=False iken senkron arka plan thread'inde çalışır ve hemen döner;
+    hiç senkron yapılmamışsa ilk senkron her durumda beklenir.
+    """
+    state = JiraSyncState.objects.filter(name=SYNC_STATE_NAME).first()
+    if _is_fresh(state, max_age):
+        return
+    never_synced = state is None or state.last_sync_at is None
+
+    if blocking or never_synced:
+        with _sync_lock:
+            try:
+                sync_issues()
+            except Exception as e:
+                logger.error(f"Jira senkronu başarısız: {e}")
+        return
+
+    # Zaten çalışan bir senkron varsa yenisini başlatma
+    if _sync_lock.acquire(blocking=False):
+        threading.Thread(target=_sync_in_background, name="jira-sync", daemon=True).start()
+
+
+async def aensure_fresh(max_age, blocking=False):
+    """ensure_fresh'in async sürümü; kopya tazeyse (olağan durum) thread'e geçmeden döner."""
+    state = await JiraSyncState.objects.filter(name=SYNC_STATE_NAME).afirst()
+    if not _is_fresh(state, max_age):
+        await sync_to_async(ensure_fresh)(max_age, blocking=blocking)
+
+
+def get_mirrored_tasks_for_user(user, max_age=None, blocking=False):
+    """
+    get_jira_tasks_for_user'ın yerel kopyadan okuyan sürümü
+    (assignee veya reporter olarak kullanıcıya ait task'ler).
+    """
+    ensure_fresh(get_max_age("default") if max_age is None else max_age, blocking=blocking)
+    return [_task_dict(issue) for issue in _user_issues(user)]
+
+
+async def aget_mirrored_tasks_for_user(user, max_age=None):
+    await aensure_fresh(get_max_age("default") if max_age is None else max_age)
+    return [_task_dict(issue) async for issue in _user_issues(user)]
+
+
+def _user_issues(user):
+    """
+    Kullanıcının issue'ları: e-posta ya da WorkerProfile.jira_account_id ile.
+    Jira Cloud e-posta gizliliğinde emailAddress boş geldiği için accountId
+    eşleşmesi de aranır (alt sorgu; ayrı profil sorgusu yapılmaz).
+    """
+    account_ids = (
+        WorkerProfile.objects.filter(user=user).exclude(jira_account_id__isnull=True)
+        .exclude(jira_account_id="").values("jira_account_id")
+    )
+    match = Q(assignee_account_id__in=account_ids) | Q(reporter_account_id__in=account_ids)
+    email = (user.email or "").lower()
+    if email:
+        match |= Q(assignee_email=email) | Q(reporter_email=email)
+    return (
+        JiraIssue.objects.filter(is_deleted=False, project_key__in=getattr(settings, "MY_JIRA_PROJECTS", []))
+        .filter(match)
+        .order_by("-jira_created")
+    )
+
+
+def _task_dict(issue):
+    return {
+        "key": issue.key,
+        "summary": issue.summary,
+        "description": issue.description,
+        "status": issue.status,
+    }
+
+
+def get_mirrored_worker_tasks(jira_username, max_age=None):
+    """get_worker_tasks'ın yerel kopyadan okuyan sürümü (Done olmayan, assign edilmiş task'ler)."""
+    ensure_fresh(get_max_age("default") if max_age is None else max_age)
+
+    issues = (
+        JiraIssue.objects.filter(is_deleted=False)
+        .filter(Q(assignee_email=(jira_username or "").lower()) | Q(assignee_account_id=jira_username))
+        .exclude(status__iexact="done")
+        .order_by("-jira_created")
+    )
+    return [
+        {"key": issue.key, "title": issue.summary, "description": issue.description}
+        for issue in issues
+    ]
+
+
+def get_mirrored_project_issues(projects, max_age=None):
+    """jira_profile için projelere göre gruplanmış issue'ları döner."""
+    ensure_fresh(get_max_age("default") if max_age is None else max_age)
+    return _group_by_project(_project_issues(projects))
+
+
+async def aget_mirrored_project_issues(projects, max_age=None):
+    await aensure_fresh(get_max_age("default") if max_age is None else max_age)
+    return _group_by_project([issue async for issue in _project_issues(projects)])
+
+
+def _project_issues(projects):
+    return JiraIssue.objects.filter(is_deleted=False, project_key__in=projects).order_by("-jira_created")
+
+
+def _group_by_project(issues):
+    project_issues = {}
+    for issue in issues:
+        if issue.project_key not in project_issues:
+            project_issues[issue.project_key] = {"name": issue.project_name, "issues": []}
+        project_issues[issue.project_key]["issues"].append(issue)
+    return project_issues
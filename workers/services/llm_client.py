@@ -0,0 +1,158 @@
+# workers/services/llm_client.py
+"""
+OpenAI / Azure OpenAI çağrıları için ortak istemci.
+- Yanıt JSON şemasıyla (structured outputs) istenir ve aynı şemayla doğrulanır.
+- Bozuk JSON / şemaya uymayan yanıtta bir kez tekrar denenir, sonra LLMResponseError.
+- Çıktı token'ı çağrı tipine göre LLM_MAX_TOKENS ile sınırlanır.
+- Her deneme süre/token/maliyetiyle LLMCallLog'a yazılır (llm_usage).
+"""
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from workers.services import clients
+from workers.services.executor import get_ai_timeout
+from workers.services.llm_usage import elapsed_ms, record_call
+from workers.services.profiling import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 500
+
+
+class LLMResponseError(Exception):
+    """Model geçerli (şemaya uyan) bir JSON döndürmedi."""
+
+
+def _build_openai():
+    from openai import OpenAI  # import ~0.5s sürüyor; sadece ilk çağrıda
+
+    if not settings.OPENAI_API_KEY:
+        raise ImproperlyConfigured("OPENAI_API_KEY ayarlı değil.")
+    return OpenAI(api_key=settings.OPENAI_API_KEY)
+
+
+def _build_azure():
+    from openai import AzureOpenAI
+
+    return AzureOpenAI(
+        api_key=getattr(settings, "AZURE_OPENAI_API_KEY", None),
+        api_version=getattr(settings, "AZURE_OPENAI_API_VERSION", "2024-08-01-preview"),
+        azure_endpoint=getattr(settings, "AZURE_OPENAI_ENDPOINT", None),
+    )
+
+
+clients.register("openai", _build_openai)
+clients.register("azure", _build_azure)
+
+
+def get_llm_client(provider=None):
+    """provider: "openai" | "azure" (varsayılan LLM_PROVIDER). İstemci ilk kullanımda oluşturulur."""
+    provider = provider or getattr(settings, "LLM_PROVIDER", "openai")
+    if provider not in ("openai", "azure"):
+        raise ValueError(f"Bilinmeyen LLM sağlayıcısı: {provider}")
+    return clients.get(provider)
+
+
+def get_max_tokens(call_type):
+    limits = getattr(settings, "LLM_MAX_TOKENS", {})
+    return limits.get(call_type, limits.get("default", DEFAULT_MAX_TOKENS))
+
+
+def complete_json(call_type, messages, schema, model="gpt-4o-mini", max_tokens=None,
+                  timeout=None, provider=None, task_key=""):
+    """
+    messages'ı gönderir ve schema'ya uyan JSON'u dict olarak döner.
+    call_type şema adı ve token sınırı için kullanılır ("subtasks", "status" ...).
+    max_tokens verilirse çağrı tipinin sınırını aşamaz.
+    task_key yalnızca çağrı kaydı içindir.
+    """
+    client = get_llm_client(provider)
+    limit = get_max_tokens(call_type)
+    max_tokens = min(max_tokens, limit) if max_tokens else limit
+
+    last_error = None
+    for attempt in range(2):
+        started = time.perf_counter()
+        try:
+            with span("llm"):
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0,
+                    max_tokens=max_tokens,
+                    timeout=timeout or get_ai_timeout(),
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {"name": call_type, "schema": schema, "strict": True},
+                    },
+                )
+        except Exception as e:
+            record_call(call_type, model, elapsed_ms(started), task_key=task_key, error=type(e).__name__)
+            raise
+        latency_ms = elapsed_ms(started)
+        usage = getattr(response, "usage", None)
+
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            record_call(call_type, model, latency_ms, usage, task_key, error="length")
+            # Aynı sınırla tekrar denemek yine yarım kalır
+            raise LLMResponseError(f"{call_type}: yanıt {max_tokens} token sınırında kesildi")
+        if getattr(choice.message, "refusal", None):
+            record_call(call_type, model, latency_ms, usage, task_key, error="refusal")
+            raise LLMResponseError(f"{call_type}: model yanıtı reddetti: {choice.message.refusal}")
+
+        try:
+            data = json.loads(choice.message.content or "")
+            validate(data, schema)
+        except (json.JSONDecodeError, ValueError) as e:
+            record_call(call_type, model, latency_ms, usage, task_key, error="invalid_json")
+            last_error = e
+            logger.warning(f"LLM {call_type} yanıtı geçersiz (deneme {attempt + 1}): {e}")
+            continue
+        record_call(call_type, model, latency_ms, usage, task_key)
+        return data
+
+    raise LLMResponseError(f"{call_type}: geçerli JSON alınamadı: {last_error}")
+
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "number": (int, float),
+}
+
+
+def validate(data, schema, path="$"):
+    """Structured outputs'un kullandığı JSON Schema alt kümesiyle doğrular; uymazsa ValueError."""
+    kind = schema.get("type")
+    if kind == "integer":
+        valid = isinstance(data, int) and not isinstance(data, bool)
+    elif kind in ("number",):
+        valid = isinstance(data, _TYPES[kind]) and not isinstance(data, bool)
+    else:
+        valid = kind is None or isinstance(data, _TYPES[kind])
+    if not valid:
+        raise ValueError(f"{path}: {kind} bekleniyordu")
+
+    if "enum" in schema and data not in schema["enum"]:
+        raise ValueError(f"{path}: {data!r} izin verilen değerlerden değil")
+
+    if kind == "object":
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in data:
+                raise ValueError(f"{path}.{name}: eksik")
+        for name, value in data.items():
+            if name in properties:
+                validate(value, properties[name], f"{path}.{name}")
+            elif schema.get("additionalProperties") is False:
+                raise ValueError(f"{path}.{name}: beklenmeyen alan")
+    elif kind == "array" and "items" in schema:
+        for i, item in enumerate(data):
+            validate(item, schema["items"], f"{path}[{i}]")
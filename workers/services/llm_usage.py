@@ -0,0 +1,218 @@
+# workers/services/llm_usage.py
+"""
+LLM çağrılarının ölçümü (LLMCallLog).
+complete_json her denemeyi record_call ile bildirir: süre, token, maliyet,
+cache hit ve çağıran bağlam (view/job, kullanıcı, task). llm_call_context
+içindeki kayıtlar bellekte toplanır ve bağlamdan çıkarken çağıran thread'de
+tek bulk_create ile yazılır; run_in_parallel thread'leri DB'ye yazmaz.
+Bağlam dışındaki (ya da bağlam kapandıktan sonra biten) havuz çağrılarının
+kayıtları modül düzeyindeki tampona alınır ve bir sonraki yazmada çağıran
+thread tarafından yazılır.
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from workers.models import LLMCallLog
+from workers.services.executor import is_worker_thread
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("llm_call_context", default=None)
+
+# Bağlamı olmayan kayıtlar; havuz thread'leri yazamadığı için burada bekler
+_pending = []
+_lock = threading.Lock()
+
+
+class _CallContext:
+    def __init__(self, source, user=None, job=None):
+        self.source = source
+        self.user_id = getattr(user, "pk", user)
+        self.job_id = getattr(job, "pk", job)
+        self.records = []
+        self.closed = False
+
+
+@contextmanager
+def llm_call_context(source, user=None, job=None):
+    """
+    İçindeki LLM çağrılarını source (view / job adı), user ve job ile etiketler.
+    Kayıtlar bağlamdan çıkarken toplu yazılır.
+    """
+    context = _CallContext(source, user, job)
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+        with _lock:
+            context.closed = True
+        _flush(context)
+
+
+@contextmanager
+def ensure_llm_call_context(source=""):
+    """
+    Açık bir bağlam yoksa açar; paralel çağrıların kayıtları böylece havuz
+    thread'lerinde değil, bağlamdan çıkarken çağıran thread'de yazılır.
+    """
+    context = _current.get()
+    if context is not None:
+        yield context
+        return
+    with llm_call_context(source) as context:
+        yield context
+
+
+def _flush(context=None):
+    with _lock:
+        records = _pending[:]
+        _pending.clear()
+        if context is not None:
+            records += context.records
+            context.records = []
+    if not records:
+        return
+    try:
+        LLMCallLog.objects.bulk_create(records)
+    except Exception as e:
+        logger.warning(f"LLM çağrı kayıtları yazılamadı ({len(records)} kayıt): {e}")
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """LLM_PRICES'tan (USD / 1M token) maliyet; fiyatı bilinmeyen model için 0."""
+    prices = getattr(settings, "LLM_PRICES", {}).get(model)
+    if not prices:
+        return Decimal(0)
+    prompt_price, completion_price = (Decimal(str(p)) for p in prices)
+    cost = (prompt_price * prompt_tokens + completion_price * completion_tokens) / 1_000_000
+    return cost.quantize(Decimal("0.000001"))
+
+
+def elapsed_ms(started):
+    return int((time.perf_counter() - started) * 1000)
+
+
+def record_call(call_type, model, latency_ms=0, usage=None, task_key="", cache_hit=False, error=""):
+    """
+    Bir çağrıyı kaydeder. usage: OpenAI yanıtının usage alanı (yoksa token 0).
+    Bağlam dışında çağrılırsa kayıt çağıran thread'de hemen yazılır; havuz
+    thread'inde ise tampona alınır (bkz. modül açıklaması).
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    context = _current.get()
+    entry = LLMCallLog(
+        user_id=context.user_id if context else None,
+        job_id=context.job_id if context else None,
+        source=context.source if context else "",
+        task_key=(task_key or "")[:255],
+        call_type=call_type,
+        model=model,
+        latency_ms=latency_ms,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=estimate_cost(model, prompt_tokens, completion_tokens),
+        cache_hit=cache_hit,
+        error=error[:255],
+    )
+    logger.info(
+        f"LLM {call_type} {model}: {latency_ms} ms, {prompt_tokens}+{completion_tokens} token"
+        f"{' (cache)' if cache_hit else ''}{f' hata={error}' if error else ''}",
+        extra={"llm_call": {
+            "source": entry.source,
+            "user_id": entry.user_id,
+            "job_id": entry.job_id,
+            "task_key": entry.task_key,
+            "call_type": call_type,
+            "model": model,
+            "latency_ms": latency_ms,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": float(entry.cost_usd),
+            "cache_hit": cache_hit,
+            "error": error,
+        }},
+    )
+
+    with _lock:
+        if context is not None and not context.closed:
+            context.records.append(entry)
+            return
+        _pending.append(entry)
+    if not is_worker_thread():
+        _flush()
+
+
+def record_cache_hits(call_type, model, task_keys):
+    for task_key in task_keys:
+        record_call(call_type, model, task_key=task_key, cache_hit=True)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank yüzdelik."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def usage_by_user_day(days=7):
+    """
+    Son `days` günün kullanıcı × gün özetini döner (yeni gün önce):
+    çağrı/cache hit/hata sayısı, token toplamları, maliyet, p50/p95 gecikme.
+    Gecikme yüzdelikleri cache hit'ler hariç gerçek çağrılardan hesaplanır.
+    """
+    rows = (
+        LLMCallLog.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+        .annotate(day=TruncDate("created_at"))
+        .values_list(
+            "user__username", "day", "latency_ms", "prompt_tokens",
+            "completion_tokens", "cost_usd", "cache_hit", "error",
+        )
+        .order_by()
+    )
+
+    groups = defaultdict(lambda: {
+        "calls": 0, "cache_hits": 0, "errors": 0,
+        "prompt_tokens": 0, "completion_tokens": 0,
+        "cost_usd": Decimal(0), "latencies": [],
+    })
+    for username, day, latency_ms, prompt_tokens, completion_tokens, cost, cache_hit, error in rows.iterator():
+        group = groups[(username or "", day)]
+        if cache_hit:
+            group["cache_hits"] += 1
+            continue
+        group["calls"] += 1
+        group["errors"] += bool(error)
+        group["prompt_tokens"] += prompt_tokens
+        group["completion_tokens"] += completion_tokens
+        group["cost_usd"] += cost
+        group["latencies"].append(latency_ms)
+
+    summary = []
+    for (username, day), group in groups.items():
+        latencies = sorted(group.pop("latencies"))
+        summary.append({
+            "user": username,
+            "day": day.isoformat(),
+            **group,
+            "total_tokens": group["prompt_tokens"] + group["completion_tokens"],
+            "cost_usd": float(group["cost_usd"]),
+            "latency_p50_ms": _percentile(latencies, 50),
+            "latency_p95_ms": _percentile(latencies, 95),
+        })
+    summary.sort(key=lambda row: row["user"])
+    summary.sort(key=lambda row: row["day"], reverse=True)
+    return summary
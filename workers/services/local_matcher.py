@@ -0,0 +1,176 @@
+# workers/services/local_matcher.py
+"""
+Rapor cümlelerini alt-görevlerle yerelde (ağsız) eşleştirir.
+"Login sayfası tamamlandı" gibi açık durum güncellemeleri için LLM'e gitmeye
+gerek yoktur; sadece belirsiz kalan task'lar update_subtasks_status_batch'e
+gönderilir.
+
+- Rapor cümlelere/yan cümlelere bölünür; alt-görevler ve cümleler karakter
+  3-gram'larıyla hash'lenmiş ikili vektörlere çevrilir (Türkçe ekler için
+  kelime yerine n-gram).
+- Benzerlik, alt-görevin n-gram'larının cümlede geçen oranıdır; tüm matris
+  tek bir matris çarpımıyla hesaplanır.
+- Cümledeki tamamlanma / devam ifadeleri (Türkçe + İngilizce) kararı verir.
+
+NumPy opsiyoneldir; kurulu değilse eşleştirici kapalıdır ve her şey LLM'e gider.
+"""
+import logging
+import re
+import zlib
+
+from django.conf import settings
+
+from workers.services.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 2 ** 14
+NGRAM = 3
+
+_CLAUSE_RE = re.compile(r"[.!?;,\n]+|\s(?:ama|fakat|ancak|but|however)\s", re.IGNORECASE)
+
+# fold_text sonrası kelime başları (ekli halleri de yakalamak için) ve tam kelimeler
+# Sadece geçmiş zaman kökleri: "hazırlıyorum", "teslim edilecek" tamamlanma değildir
+DONE_PREFIXES = (
+    "tamamland", "tamamlad", "bitti", "bitird", "bitiril", "hazirland", "hazirlad", "yapild",
+    "yaptim", "kapatild", "kapattim", "cozuld", "cozdum", "duzeltild", "duzelttim",
+    "edild", "ettim", "eklend", "ekledim", "finish", "complete", "fixed", "resolved",
+    "implemented", "merged", "shipped", "deployed",
+)
+DONE_WORDS = {"done", "tamam", "hazir"}
+NOT_DONE_PREFIXES = (
+    "devam", "basladim", "baslandi", "basliyor", "henuz", "bitmed", "tamamlanmad",
+    "yarin", "calisiyor", "bekliyor", "progress", "started", "starting", "working",
+    "pending", "tomorrow",
+)
+NOT_DONE_WORDS = {"wip", "yet", "todo", "not", "will"}
+# Şimdiki / gelecek zaman ekleri (-yor, -ecek/-acak): "hazırlıyorum", "edilecek"
+PENDING_SUFFIX_RE = re.compile(r"(?:yor(?:um|sun|uz|lar)?|[ae]c[ae](?:k|gim|giz|ksin|klar))$")
+
+DONE, NOT_DONE, UNKNOWN = 1, -1, 0
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def is_available():
+    return getattr(settings, "LOCAL_MATCHER_ENABLED", True) and _numpy() is not None
+
+
+def split_clauses(text):
+    return [c.strip() for c in _CLAUSE_RE.split(text or "") if c and c.strip()]
+
+
+def _token_cue(token):
+    # Olumsuzlar önce: "tamamlanmadı" gibi
+    if token in NOT_DONE_WORDS or token.startswith(NOT_DONE_PREFIXES):
+        return NOT_DONE
+    if len(token) > 5 and PENDING_SUFFIX_RE.search(token):
+        return NOT_DONE
+    if token in DONE_WORDS or token.startswith(DONE_PREFIXES):
+        return DONE
+    return None
+
+
+def detect_cue(clause):
+    """Yan cümlenin tamamlanma durumu: DONE, NOT_DONE ya da UNKNOWN (ikisi birden de UNKNOWN)."""
+    cues = {_token_cue(t) for t in tokenize(clause, drop_stopwords=False)} - {None}
+    return cues.pop() if len(cues) == 1 else UNKNOWN
+
+
+def _features(text):
+    """Metnin hash'lenmiş karakter n-gram indeksleri (durum ifadeleri hariç)."""
+    features = set()
+    for word in tokenize(text):
+        if _token_cue(word) is not None:
+            continue
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM + 1):
+            features.add(zlib.crc32(padded[i:i + NGRAM].encode("utf-8")) % DIMENSIONS)
+    return features
+
+
+def _matrix(np, texts):
+    """texts için ikili (n × DIMENSIONS) matris ve satır başına özellik sayısı."""
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        features = _features(text)
+        rows.extend([row] * len(features))
+        cols.extend(features)
+    matrix = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    return matrix, matrix.sum(axis=1)
+
+
+def similarity(subitems, clauses):
+    """
+    (len(subitems) × len(clauses)) matris: alt-görev n-gram'larının cümlede
+    geçen oranı (0-1). Tek matris çarpımı.
+    """
+    np = _numpy()
+    sub_matrix, sub_counts = _matrix(np, subitems)
+    clause_matrix, _ = _matrix(np, clauses)
+    overlap = sub_matrix @ clause_matrix.T
+    return overlap / np.maximum(sub_counts, 1)[:, None]
+
+
+def decide(scores, cues, high=None, low=None):
+    """
+    Tek alt-görev için karar: True / False ya da None (belirsiz, LLM'e sorulmalı).
+    scores: alt-görevin her cümleyle benzerliği, cues: cümlelerin durum ifadesi.
+    """
+    high = high if high is not None else getattr(settings, "LOCAL_MATCH_HIGH", 0.6)
+    low = low if low is not None else getattr(settings, "LOCAL_MATCH_LOW", 0.3)
+
+    if not len(scores) or max(scores) < low:
+        return False  # raporda geçmiyor: LLM de "açıkça bitti denmedikçe" done saymaz
+    strong = {cue for score, cue in zip(scores, cues) if score >= high}
+    if strong == {DONE}:
+        return True
+    if strong == {NOT_DONE}:
+        return False
+    return None
+
+
+def match_statuses(report_text, tasks, high=None, low=None):
+    """
+    update_subtasks_status_batch ile aynı girdiyi alır.
+    Dönüş: (statuses, pending)
+      statuses: tüm alt-görevlerine yerelde karar verilen task'lar
+                ({task_key: {"task_key": ..., "subtasks": [...]}})
+      pending:  en az bir alt-görevi belirsiz olan, LLM'e gidecek task'lar
+    """
+    with_subtasks = [t for t in tasks if t["subtasks"]]
+    statuses = {
+        t["task_key"]: {"task_key": t["task_key"], "subtasks": []} for t in tasks if not t["subtasks"]
+    }
+    clauses = split_clauses(report_text)
+    if not with_subtasks or not is_available() or not clauses:
+        return statuses, with_subtasks
+
+    contents = [s["content"] for t in with_subtasks for s in t["subtasks"]]
+    scores = similarity(contents, clauses).tolist()
+    cues = [detect_cue(c) for c in clauses]
+
+    pending = []
+    offset = 0
+    for task in with_subtasks:
+        count = len(task["subtasks"])
+        decisions = [decide(row, cues, high, low) for row in scores[offset:offset + count]]
+        offset += count
+        if any(d is None for d in decisions):
+            pending.append(task)
+            continue
+        statuses[task["task_key"]] = {
+            "task_key": task["task_key"],
+            "subtasks": [
+                {"content": s["content"], "is_done": d} for s, d in zip(task["subtasks"], decisions)
+            ],
+        }
+    logger.info(f"Yerel eşleştirme: {len(with_subtasks) - len(pending)}/{len(with_subtasks)} task LLM'siz karara bağlandı")
+    return statuses, pending
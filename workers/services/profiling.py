@@ -0,0 +1,139 @@
+# workers/services/profiling.py
+"""
+İstek bazlı süre dağılımı (workers.middleware.ProfilingMiddleware ile).
+Servis kodu Jira / LLM / dosya işlemlerini span("jira") gibi işaretler; aktif
+profil yoksa (middleware kapalıyken) span ölçüm yapmaz. run_in_parallel
+thread'lerindeki span'ler de aynı profile eklenir, bu yüzden alt sistem
+toplamları isteğin duvar saatini aşabilir.
+En yavaş istekler süreç içi bir halka tamponda tutulur (süreç başına).
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+SUBSYSTEMS = ("db", "jira", "llm", "files")
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+_slow_lock = threading.Lock()
+_slow_requests = None
+
+
+class RequestProfile:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.started_at = timezone.now()
+        self.status = None
+        self.total = 0.0
+        self.spans = {name: [0, 0.0] for name in SUBSYSTEMS}  # ad -> [adet, saniye]
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            span = self.spans.setdefault(name, [0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+
+    def finish(self, status):
+        self.status = status
+        self.total = time.perf_counter() - self._started
+
+    def server_timing(self):
+        """Server-Timing header değeri: db;dur=12.3;desc="5x", ..., total;dur=40.1"""
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+            for name, (count, seconds) in self.spans.items()
+            if count
+        ]
+        parts.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_dict(self):
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "total_ms": round(self.total * 1000, 1),
+            "spans": {
+                name: {"count": count, "ms": round(seconds * 1000, 1)}
+                for name, (count, seconds) in self.spans.items()
+            },
+        }
+
+
+def activate(profile):
+    return _current.set(profile)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Blok süresini aktif isteğin name alt sistemine ekler."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """Sorgu sayısı ve süresini aktif isteğin profiline yazar; profil yoksa doğrudan çalıştırır."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add("db", time.perf_counter() - started)
+
+
+def install_db_wrapper(connection):
+    """
+    connection_created ile her thread'in bağlantısına bir kez eklenir.
+    Async view'ların sorguları sync_to_async thread'inin bağlantısında çalışır;
+    profil contextvar ile oraya taşındığı için sorgular yine sayılır.
+    """
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_wrapper)
+
+
+def _buffer():
+    global _slow_requests
+    if _slow_requests is None:
+        _slow_requests = deque(maxlen=getattr(settings, "PROFILING_BUFFER_SIZE", 50))
+    return _slow_requests
+
+
+def record_request(profile):
+    """PROFILING_SLOW_MS'den yavaş istekleri halka tampona ekler (en eskisi düşer)."""
+    if profile.total * 1000 < getattr(settings, "PROFILING_SLOW_MS", 500):
+        return
+    with _slow_lock:
+        _buffer().append(profile.as_dict())
+
+
+def slowest_requests():
+    with _slow_lock:
+        requests = list(_buffer())
+    return sorted(requests, key=lambda r: r["total_ms"], reverse=True)
+
+
+def reset():
+    with _slow_lock:
+        _buffer().clear()
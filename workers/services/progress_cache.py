@@ -0,0 +1,74 @@
+# workers/services/progress_cache.py
+"""
+view_progress'in hesapladığı task_details için kullanıcı başına cache.
+Yeni rapor, alt-görev değişikliği veya Jira kopyasındaki güncelleme ilgili
+kullanıcının kaydını siler; süre (PROGRESS_CACHE_TTL) sadece üst sınırdır.
+"""
+import logging
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.functions import Lower
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "progress"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+
+
+def _generation():
+    # invalidate_all_progress eski kayıtları silmek yerine nesli artırır
+    return cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+
+
+def _key(user_id, generation=None):
+    return f"{KEY_PREFIX}:{generation or _generation()}:{user_id}"
+
+
+def get_cached_progress(user_id):
+    return cache.get(_key(user_id))
+
+
+def set_cached_progress(user_id, task_details, timeout):
+    cache.set(_key(user_id), task_details, timeout=timeout)
+
+
+async def _agen_key(user_id):
+    generation = await cache.aget_or_set(GENERATION_KEY, 1, timeout=None)
+    return _key(user_id, generation)
+
+
+async def aget_cached_progress(user_id):
+    return await cache.aget(await _agen_key(user_id))
+
+
+async def aset_cached_progress(user_id, task_details, timeout):
+    await cache.aset(await _agen_key(user_id), task_details, timeout=timeout)
+
+
+def invalidate_progress(user_ids):
+    user_ids = {uid for uid in user_ids if uid is not None}
+    if not user_ids:
+        return
+    generation = _generation()
+    cache.delete_many([_key(uid, generation) for uid in user_ids])
+
+
+def invalidate_progress_for_emails(emails):
+    """Jira kopyasında değişen issue'ların assignee/reporter e-postalarına göre siler."""
+    emails = {e.lower() for e in emails if e}
+    if not emails:
+        return
+    user_ids = (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=emails)
+        .values_list("pk", flat=True)
+    )
+    invalidate_progress(user_ids)
+
+
+def invalidate_all_progress():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
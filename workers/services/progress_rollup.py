@@ -0,0 +1,246 @@
+# workers/services/progress_rollup.py
+"""
+Takım ilerleme özetleri (view_team ve yönetici paneli).
+Panel her açılışta Jira/LLM'e gitmez ya da tüm alt-görevleri taramaz; önceden
+hesaplanmış iki tablodan okur:
+- TaskProgressSnapshot: kullanıcı × proje güncel task / alt-görev sayıları;
+- TeamDailyRollup: kullanıcı × gün rapor sayısı ve günün son sayıları.
+
+Alt-görevler değişince (task_store, sinyaller) transaction commit olduktan
+sonra sadece etkilenen kullanıcıların sayıları yeniden toplanır; sinyal
+göndermeyen bulk işlemler de böylece kaçmaz ve sayılar kaymaz. Rapor sayısı
+TodayReport kaydedilince artırılır.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from workers.models import TaskProgressSnapshot, TeamDailyRollup, TodayReport, WorkerTask
+
+logger = logging.getLogger(__name__)
+
+COUNT_FIELDS = ("tasks_total", "tasks_done", "subtasks_total", "subtasks_done")
+
+
+def project_key(jira_key):
+    return jira_key.rsplit("-", 1)[0].upper() if "-" in jira_key else ""
+
+
+def percent(done, total):
+    return round(done / total * 100, 1) if total else 0
+
+
+def _count_progress(user_ids):
+    """{(user_id, project_key): Counter(COUNT_FIELDS)} — tek sorgu."""
+    rows = (
+        WorkerTask.objects.filter(assignee_id__in=user_ids)
+        .values("assignee_id", "jira_key")
+        .annotate(total=Count("subitems"), done=Count("subitems", filter=Q(subitems__is_done=True)))
+    )
+    counts = defaultdict(Counter)
+    for row in rows:
+        counts[(row["assignee_id"], project_key(row["jira_key"]))].update(
+            tasks_total=1,
+            tasks_done=int(row["total"] > 0 and row["done"] == row["total"]),
+            subtasks_total=row["total"],
+            subtasks_done=row["done"],
+        )
+    return counts
+
+
+def refresh_progress_rollups(user_ids, day=None):
+    """user_ids'in proje anlık görüntülerini ve bugünkü günlük satırını yeniden yazar."""
+    user_ids = set(User.objects.filter(pk__in={uid for uid in user_ids if uid is not None})
+                   .values_list("pk", flat=True))
+    if not user_ids:
+        return
+    day = day or timezone.localdate()
+    counts = _count_progress(user_ids)
+
+    daily = {uid: Counter() for uid in user_ids}
+    for (uid, _), counter in counts.items():
+        daily[uid].update(counter)
+
+    with transaction.atomic():
+        TaskProgressSnapshot.objects.filter(user_id__in=user_ids).delete()
+        TaskProgressSnapshot.objects.bulk_create([
+            TaskProgressSnapshot(user_id=uid, project_key=project, **{f: counter[f] for f in COUNT_FIELDS})
+            for (uid, project), counter in counts.items()
+        ])
+        # report_count korunur
+        TeamDailyRollup.objects.bulk_create(
+            [
+                TeamDailyRollup(user_id=uid, day=day, **{f: counter[f] for f in COUNT_FIELDS})
+                for uid, counter in daily.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "day"],
+            update_fields=list(COUNT_FIELDS),
+        )
+
+
+def schedule_rollup_refresh(user_ids):
+    """
+    Commit sonrası refresh_progress_rollups; rollback olursa yapılmaz.
+    Aynı transaction'daki çağrılar (ör. döngüde kaydedilen alt-görevler) tek
+    kümede toplanır ve commit'te tek yeniden sayımla yazılır.
+    """
+    user_ids = {uid for uid in user_ids if uid is not None}
+    if not user_ids:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        refresh_progress_rollups(user_ids)
+        return
+
+    pending = getattr(connection, "_rollup_pending", None)
+    # Callback rollback ile atıldıysa (savepoint dahil) yeni bir küme açılır
+    if pending is None or not any(func == pending.flush for _, func, _ in connection.run_on_commit):
+        pending = _PendingRefresh(connection)
+        transaction.on_commit(pending.flush)
+    pending.user_ids.update(user_ids)
+
+
+class _PendingRefresh:
+    def __init__(self, connection):
+        self.user_ids = set()
+        self.connection = connection
+        connection._rollup_pending = self
+
+    def flush(self):
+        if getattr(self.connection, "_rollup_pending", None) is self:
+            self.connection._rollup_pending = None
+        refresh_progress_rollups(self.user_ids)
+
+
+def record_report(user_id, created_at, delta=1):
+    """Raporun gününe ait rapor sayısını delta kadar değiştirir (silinen rapor için -1)."""
+    day = timezone.localdate(created_at)
+    rollups = TeamDailyRollup.objects.filter(user_id=user_id, day=day)
+    if delta < 0:
+        rollups.filter(report_count__gte=-delta).update(report_count=F("report_count") + delta)
+        return
+    if rollups.update(report_count=F("report_count") + delta):
+        return
+
+    # Günün ilk kaydı: sayılar o anki anlık görüntüden başlar
+    current = TaskProgressSnapshot.objects.filter(user_id=user_id).aggregate(
+        **{f: Sum(f) for f in COUNT_FIELDS}
+    )
+    try:
+        with transaction.atomic():
+            TeamDailyRollup.objects.create(
+                user_id=user_id, day=day, report_count=delta, **{f: current[f] or 0 for f in COUNT_FIELDS}
+            )
+    except IntegrityError:
+        # Eşzamanlı rapor satırı az önce oluşturdu
+        rollups.update(report_count=F("report_count") + delta)
+
+
+def team_progress(users, day=None):
+    """
+    users (User queryset) için panel verisi; takım büyüklüğünden bağımsız 3 sorgu:
+    üyeler, proje anlık görüntüleri ve günün satırları.
+    """
+    day = day or timezone.localdate()
+    members = {
+        user.pk: {
+            "user": user,
+            "projects": [],
+            "reports_today": 0,
+            **dict.fromkeys(COUNT_FIELDS, 0),
+        }
+        for user in users.order_by("username")
+    }
+    projects = defaultdict(Counter)
+
+    snapshots = TaskProgressSnapshot.objects.filter(user_id__in=list(members)).order_by("project_key")
+    for snapshot in snapshots:
+        member = members[snapshot.user_id]
+        counts = {f: getattr(snapshot, f) for f in COUNT_FIELDS}
+        member["projects"].append({
+            "project_key": snapshot.project_key,
+            "progress": percent(snapshot.subtasks_done, snapshot.subtasks_total),
+            **counts,
+        })
+        for field, value in counts.items():
+            member[field] += value
+        projects[snapshot.project_key].update(counts)
+        projects[snapshot.project_key]["members"] += 1
+
+    for rollup in TeamDailyRollup.objects.filter(day=day, user_id__in=list(members)):
+        members[rollup.user_id]["reports_today"] = rollup.report_count
+
+    for member in members.values():
+        member["progress"] = percent(member["subtasks_done"], member["subtasks_total"])
+    totals = Counter(dict.fromkeys(COUNT_FIELDS, 0))
+    for counter in projects.values():
+        totals.update({f: counter[f] for f in COUNT_FIELDS})
+
+    return {
+        "day": day,
+        "members": list(members.values()),
+        "projects": [
+            {"project_key": key, "progress": percent(c["subtasks_done"], c["subtasks_total"]), **c}
+            for key, c in sorted(projects.items())
+        ],
+        "totals": {**totals, "progress": percent(totals["subtasks_done"], totals["subtasks_total"])},
+        "reports_today": sum(m["reports_today"] for m in members.values()),
+    }
+
+
+def daily_rollups(users, days=14):
+    """Son days gün için kullanıcı × gün satırları (tek sorgu); satırı olmayan gün None."""
+    end = timezone.localdate()
+    dates = [end - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    by_user = defaultdict(dict)
+    rollups = TeamDailyRollup.objects.filter(
+        day__gte=dates[0], day__lte=end, user__in=users
+    ).select_related("user")
+    for rollup in rollups:
+        by_user[rollup.user][rollup.day] = rollup
+
+    rows = []
+    for user, by_day in sorted(by_user.items(), key=lambda item: item[0].username):
+        rows.append({
+            "user": user,
+            "reports": sum(r.report_count for r in by_day.values()),
+            "days": [
+                {
+                    "report_count": by_day[d].report_count,
+                    "progress": percent(by_day[d].subtasks_done, by_day[d].subtasks_total),
+                } if d in by_day else None
+                for d in dates
+            ],
+        })
+    return {"dates": dates, "rows": rows}
+
+
+def rebuild_progress_rollups():
+    """
+    Tüm kullanıcıların anlık görüntülerini ve geçmiş günlerin rapor sayılarını
+    yeniden hesaplar (ilk kurulum / bakım). Geçmiş günlerin task sayıları
+    bilinmediği için sadece rapor sayısı doldurulur.
+    """
+    user_ids = list(User.objects.values_list("pk", flat=True))
+    refresh_progress_rollups(user_ids)
+
+    report_counts = (
+        TodayReport.objects.annotate(day=TruncDate("created_at"))
+        .values("user_id", "day")
+        .annotate(report_count=Count("pk"))
+    )
+    TeamDailyRollup.objects.bulk_create(
+        [TeamDailyRollup(user_id=r["user_id"], day=r["day"], report_count=r["report_count"]) for r in report_counts],
+        update_conflicts=True,
+        unique_fields=["user", "day"],
+        update_fields=["report_count"],
+    )
+    logger.info(f"İlerleme özetleri yeniden oluşturuldu: {len(user_ids)} kullanıcı")
+    return len(user_ids)
@@ -0,0 +1,62 @@
+# workers/services/report_events.py
+"""
+Rapor job'ının task sonuçlarını Server-Sent Events olarak akıtır.
+run_report_worker her task'ın sonucunu hazır olur olmaz ReportJobTaskResult
+olarak yazar; akış bu tabloyu kısa aralıklarla okur ve yeni satırları "task"
+olayı olarak gönderir. Job bitince "done" olayı ile kapanır.
+Olay id'si sonuç satırının pk'sidir; tarayıcı yeniden bağlanırken
+Last-Event-ID ile kaldığı yerden devam eder.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+
+from workers.models import ReportJob, ReportJobTaskResult
+from workers.services.report_pipeline import serialize_job, serialize_task_result
+
+FINISHED = (ReportJob.STATUS_DONE, ReportJob.STATUS_FAILED)
+KEEPALIVE_INTERVAL = 15  # saniye
+
+
+def format_event(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def _new_results(job_id, last_id):
+    results = ReportJobTaskResult.objects.filter(job_id=job_id, pk__gt=last_id).order_by("pk")
+    return [result async for result in results]
+
+
+async def stream_job_events(job_id, last_id=0, poll_interval=None, timeout=None):
+    """
+    job_id'nin last_id'den sonraki sonuçlarını SSE metni olarak üretir.
+    Job timeout saniye içinde bitmezse "timeout" olayıyla kapanır (istemci yeniden bağlanır).
+    """
+    poll_interval = poll_interval or getattr(settings, "REPORT_STREAM_POLL_INTERVAL", 0.5)
+    timeout = timeout or getattr(settings, "REPORT_STREAM_TIMEOUT", 300)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    last_sent = loop.time()
+
+    while True:
+        job = await ReportJob.objects.aget(pk=job_id)
+        # Durum sonuçlardan önce okunur: bitmiş job'ın son sonuçları da bu turda gelir
+        for result in await _new_results(job_id, last_id):
+            last_id = result.pk
+            last_sent = loop.time()
+            yield format_event("task", serialize_task_result(result), event_id=result.pk)
+
+        if job.status in FINISHED:
+            yield format_event("done", serialize_job(job, with_tasks=False))
+            return
+        if loop.time() >= deadline:
+            yield format_event("timeout", {"job_id": job_id, "status": job.status})
+            return
+        if loop.time() - last_sent >= KEEPALIVE_INTERVAL:
+            # Proxy'lerin boşta bağlantıyı kapatmaması için yorum satırı
+            last_sent = loop.time()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,330 @@
+# workers/services/report_pipeline.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from workers.models import ReportJob, ReportJobTaskResult, WorkerTask
+from workers.services.ai_service import update_subtasks_status_batch
+from workers.services.file_service import attach_files_to_task
+from workers.services.llm_usage import llm_call_context
+from workers.services.local_matcher import match_statuses
+from workers.services.subtask_cache import extract_subtasks_cached
+from workers.services.task_selection import select_relevant_tasks
+from workers.services.task_store import (
+    add_subitems,
+    apply_subitem_statuses,
+    load_worker_tasks,
+    save_subitem_statuses,
+)
+from workers.services.jira_sync import get_max_age, get_mirrored_tasks_for_user
+from workers.services.jira_service import (
+    get_jira_client,
+    move_tasks,
+    add_comment,
+)
+
+logger = logging.getLogger(__name__)
+
+# Plan tiplerini simüle ediyoruz
+PLANS = {
+    "basic": ["ai", "jira"],              # AI + Jira
+    "pro": ["ai", "jira", "file_check"]   # AI + Jira + Dosya Kontrolü
+}
+
+
+def get_plan_features(user):
+    """Kullanıcının planına göre açık olan özellik listesini döner."""
+    profile = getattr(user, "workerprofile", None)
+    user_plan = getattr(profile, "plan", "basic") if profile else "basic"
+    return PLANS.get(user_plan, PLANS["basic"])
+
+
+def enqueue_report_job(report):
+    """Rapor için işlenmeyi bekleyen bir job oluşturur."""
+    return ReportJob.objects.create(report=report, user=report.user)
+
+
+async def aenqueue_report_job(report):
+    return await ReportJob.objects.acreate(report=report, user=report.user)
+
+
+def claim_next_job():
+    """
+    Sıradaki pending job'ı RUNNING olarak işaretleyip döner.
+    Koşullu UPDATE kullanıldığı için birden fazla worker aynı job'ı alamaz.
+    Uzun süredir RUNNING kalan (çöken worker'dan kalma) job'lar tekrar kuyruğa
+    alınır; deneme hakkı bitenler FAILED olur (durum sorgusu ve SSE akışı bitsin).
+    """
+    stale_after = getattr(settings, "REPORT_JOB_STALE_AFTER", 1800)
+    max_attempts = getattr(settings, "REPORT_JOB_MAX_ATTEMPTS", 3)
+    now = timezone.now()
+
+    stale = ReportJob.objects.filter(
+        status=ReportJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=stale_after),
+    )
+    stale.filter(attempts__lt=max_attempts).update(status=ReportJob.STATUS_PENDING)
+    stale.filter(attempts__gte=max_attempts).update(
+        status=ReportJob.STATUS_FAILED,
+        error=f"Worker {max_attempts} denemede de job'ı bitiremedi (zaman aşımı).",
+        finished_at=now,
+    )
+
+    candidates = (
+        ReportJob.objects.filter(status=ReportJob.STATUS_PENDING)
+        .order_by("created_at")
+        .values_list("pk", flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_PENDING).update(
+            status=ReportJob.STATUS_RUNNING,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return ReportJob.objects.select_related("report", "user").get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """Job'ı çalıştırır ve sonucunu (done/failed) kaydeder."""
+    # Yeniden denenen job'ın önceki yarım sonuçlarını temizle
+    job.task_results.all().delete()
+    try:
+        with llm_call_context("report_job", user=job.user, job=job):
+            process_report(job.report, job=job)
+    except Exception as e:
+        logger.exception(f"Report job #{job.pk} başarısız: {e}")
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        job.status = ReportJob.STATUS_DONE
+        job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+    return job
+
+
+def process_report(report, job=None):
+    """
+    Raporu kullanıcının Jira task'larına uygular:
+    alt-görev çıkarımı, rapora göre durum güncellemesi, Jira taşıma ve dosya kontrolü.
+    job verilirse her task'ın sonucu hazır olur olmaz ReportJobTaskResult olarak
+    kaydedilir (report_events bunları SSE ile akıtır).
+
+    Alt-görev çıkarımı task'lar arasında paralel, durum değerlendirmesi ise
+    toplu (update_subtasks_status_batch) yapılır; DB yazmaları ve Jira
+    aksiyonları çağıran thread'de sırayla uygulanır.
+    """
+    user = report.user
+    features = get_plan_features(user)
+    updated_tasks = []
+    jira_tasks = []
+
+    # AI planı aktifse
+    if "ai" in features:
+        try:
+            # Arka planda çalıştığı için yerel kopyanın tazelenmesini bekleyebilir
+            jira_tasks = get_mirrored_tasks_for_user(
+                user, max_age=get_max_age("report_pipeline"), blocking=True
+            )
+        except Exception as e:
+            logger.error(f"Jira taskları alınamadı: {e}")
+            jira_tasks = []
+
+        on_result = (lambda result: _record_task_result(job, result)) if job is not None else None
+        for result in _process_tasks(jira_tasks, report, on_result=on_result):
+            if not result.get("error"):
+                updated_tasks.append(result)
+
+    # Dosya kontrolü (Pro): bu raporla değerlendirilen task'lara eşleşen dosyalar eklenir
+    if "file_check" in features:
+        evaluated = {r["task_key"] for r in updated_tasks if r.get("decided_by")}
+        _attach_files(user, [jt for jt in jira_tasks if jt["key"] in evaluated])
+
+    return updated_tasks
+
+
+def _attach_files(user, jira_tasks):
+    if not jira_tasks:
+        return
+    jira = get_jira_client()
+    if jira is None:
+        logger.warning("Jira'ya bağlanılamadı; dosya kontrolü atlandı.")
+        return
+    for jt in jira_tasks:
+        try:
+            attach_files_to_task(jira, jt, user)
+        except Exception as e:
+            logger.warning(f"{jt['key']} için dosya kontrolü sırasında hata: {e}")
+
+
+def _process_tasks(jira_tasks, report, on_result=None):
+    """
+    Raporu task'lara uygular (reconciler); sonuç listesini döner ve verilirse
+    her sonuç hazır olduğunda on_result(result) çağrılır. İdempotenttir:
+    - WorkerTask.last_report bu rapor olan task'lar tekrar değerlendirilmez
+      (job tekrar denendiğinde AI/Jira çağrıları tekrarlanmaz);
+    - Jira'da taşıma ve yorum, task tamamlanmamış (completed_at boş) ise yapılır.
+    Sadece raporla ilgili task'lar (task_selection) AI'a gönderilir; diğerleri
+    bu rapor için işlenmiş sayılmaz.
+    """
+    # WorkerTask'ları alt-görevleriyle birlikte toplu al/oluştur
+    all_tasks = load_worker_tasks(report.user, jira_tasks)
+    processed = {t.pk: t for t in all_tasks if t.last_report_id == report.pk}
+    pending = list({t.pk: (jt, t) for jt, t in zip(jira_tasks, all_tasks) if t.pk not in processed}.values())
+
+    relevant = set(select_relevant_tasks(report, [jt for jt, _ in pending]))
+    skipped = [t for _, t in pending if t.jira_key not in relevant]
+    pending = [(jt, t) for jt, t in pending if t.jira_key in relevant]
+    logger.info(f"Rapor #{report.pk}: {len(pending)}/{len(pending) + len(skipped)} task AI ile değerlendirilecek")
+    jira_tasks = [jt for jt, _ in pending]
+    worker_tasks = [t for _, t in pending]
+
+    results = []
+
+    def emit(result):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    # Daha önce işlenmiş ve raporla ilgisiz task'lar sadece DB'deki durumla raporlanır
+    for t in [*processed.values(), *skipped]:
+        emit(_summarize_status(t.jira_key, list(t.subitems.all()), {}))
+    if not pending:
+        return results
+
+    # 1. Description’dan alt-görev çıkar (cache'li, paralel) ve DB’ye ekle
+    extracted = extract_subtasks_cached(
+        [(jt.get("key"), jt.get("description", "")) for jt in jira_tasks], max_subtasks=5
+    )
+    new_subitems = []
+    for worker_task, (ai_result, error) in zip(worker_tasks, extracted):
+        if error:
+            logger.warning(f"{worker_task.jira_key} için AI alt-görev çıkarılamadı: {error}")
+            continue
+        new_subitems.append((worker_task, [st["content"] for st in ai_result.get("subtasks", [])]))
+    add_subitems(new_subitems)
+
+    # 2. Kullanıcı raporuna göre alt-görevleri güncelle: açık durumlar yerelde,
+    # belirsiz kalan task'lar tek/az sayıda toplu AI çağrısıyla
+    subitems_by_task = [list(t.subitems.all()) for t in worker_tasks]
+    statuses, ambiguous = match_statuses(report.report_text, [
+        {"task_key": t.jira_key, "subtasks": [{"content": s.content} for s in subs]}
+        for t, subs in zip(worker_tasks, subitems_by_task)
+    ])
+
+    changed = []
+    reconciled = []
+
+    def reconcile(worker_task, db_subitems, status, decided_by):
+        task_key = worker_task.jira_key
+        try:
+            if status is None:
+                raise ValueError("AI durum sonucu yok")
+            if status.get("error") or any("is_done" not in s for s in status.get("subtasks", [])):
+                # Karar verilmemiş alt-görevler "yapılmadı" sayılmamalı
+                raise ValueError(status.get("error") or "AI durum sonucu eksik")
+            changed.extend(apply_subitem_statuses(db_subitems, status.get("subtasks", [])))
+            result = _summarize_status(task_key, db_subitems, status)
+            result["decided_by"] = decided_by
+            reconciled.append((worker_task, result["action"]))
+        except Exception as e:
+            # last_report işaretlenmez; sonraki job tekrar dener
+            logger.warning(f"{task_key} alt-görevleri güncellenemedi: {e}")
+            result = {"task_key": task_key, "progress": 0, "action": "", "subtasks": [], "error": str(e)}
+        emit(result)
+
+    # Yerelde karar verilenler LLM'i beklemeden bildirilir
+    remaining = []
+    for worker_task, db_subitems in zip(worker_tasks, subitems_by_task):
+        if worker_task.jira_key in statuses:
+            reconcile(worker_task, db_subitems, statuses[worker_task.jira_key], "local")
+        else:
+            remaining.append((worker_task, db_subitems))
+
+    llm_statuses = {}
+    if ambiguous:
+        try:
+            llm_statuses = update_subtasks_status_batch(report.report_text, ambiguous)
+        except Exception as e:
+            logger.warning(f"Toplu alt-görev durumu alınamadı: {e}")
+    for worker_task, db_subitems in remaining:
+        reconcile(worker_task, db_subitems, llm_statuses.get(worker_task.jira_key), "llm")
+    save_subitem_statuses(changed)
+
+    # Yeni tamamlanan task'lar tek seferde taşınır (workflow durumu başına bir transition sorgusu)
+    newly_done = [t for t, action in reconciled if action == "done" and t.completed_at is None]
+    moved = move_tasks([t.jira_key for t in newly_done], "Done")
+    now = timezone.now()
+    for task in newly_done:
+        if moved.get(task.jira_key):
+            add_comment(task.jira_key, f"Tüm alt-görevler tamamlandı: {report.report_text}")
+            task.completed_at = now
+
+    for task, action in reconciled:
+        if action != "done":
+            task.completed_at = None  # yeniden açılan task tekrar tamamlandığında taşınsın
+        task.last_report = report
+    WorkerTask.objects.bulk_update([t for t, _ in reconciled], ["last_report", "completed_at"])
+    return results
+
+
+def _summarize_status(task_key, db_subitems, ai_progress):
+    # AI progress/action dönmezse alt-görevlerden hesapla
+    done_count = sum(1 for s in db_subitems if s.is_done)
+    total_count = len(db_subitems)
+    progress = ai_progress.get(
+        "progress", round((done_count / total_count) * 100, 1) if total_count else 0
+    )
+    action = ai_progress.get("action") or ("done" if progress == 100 else "in_progress")
+
+    return {
+        "task_key": task_key,
+        "progress": progress,
+        "action": action,
+        "subtasks": [
+            {"content": s.content, "is_done": s.is_done} for s in db_subitems
+        ]
+    }
+
+
+def _record_task_result(job, result):
+    ReportJobTaskResult.objects.create(
+        job=job,
+        task_key=result["task_key"],
+        progress=result.get("progress") or 0,
+        action=result.get("action") or "",
+        subtasks=result.get("subtasks", []),
+        error=result.get("error", ""),
+        decided_by=result.get("decided_by", ""),
+    )
+
+
+def serialize_job(job, with_tasks=True):
+    """Status endpoint'i için job'ı JSON'a çevirir."""
+    data = {
+        "job_id": job.pk,
+        "report_id": job.report_id,
+        "status": job.status,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if with_tasks:
+        data["updated_tasks"] = [serialize_task_result(r) for r in job.task_results.order_by("id")]
+    return data
+
+
+def serialize_task_result(result):
+    return {
+        "task_key": result.task_key,
+        "progress": result.progress,
+        "action": result.action,
+        "subtasks": result.subtasks,
+        "error": result.error,
+    }
@@ -0,0 +1,150 @@
+# workers/services/subtask_cache.py
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from workers.models import LLMCallLog, SubtaskExtractionCache
+from workers.services.ai_service import (
+    SUBTASK_PROMPT_VERSION,
+    update_subtasks_with_report,
+)
+from workers.services.executor import run_in_parallel
+from workers.services.llm_usage import ensure_llm_call_context, record_cache_hits
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+def make_cache_key(task_key, description, model=DEFAULT_MODEL, max_subtasks=5):
+    """Alt-görev çıkarımını etkileyen tüm girdilerden sabit bir anahtar üretir."""
+    raw = json.dumps(
+        [task_key, description or "", model, max_subtasks, SUBTASK_PROMPT_VERSION],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cache_stats(days=7):
+    """
+    Son days gündeki hit/miss oranı LLMCallLog'dan okunur (çıkarım worker
+    sürecinde çalıştığı için süreç içi sayaç web sürecinde hep 0 olurdu).
+    Miss: cache'ten gelmeyen başarılı "subtasks" çağrısı (retry denemeleri hariç).
+    """
+    calls = LLMCallLog.objects.filter(
+        call_type="subtasks", created_at__gte=timezone.now() - timedelta(days=days)
+    ).aggregate(
+        hits=Count("pk", filter=Q(cache_hit=True)),
+        misses=Count("pk", filter=Q(cache_hit=False, error="")),
+    )
+    entries = SubtaskExtractionCache.objects.aggregate(entries=Count("pk"), entry_hits=Sum("hit_count"))
+    hits, misses = calls["hits"], calls["misses"]
+    total = hits + misses
+    return {
+        "days": days,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0,
+        "entries": entries["entries"],
+        "entry_hits": entries["entry_hits"] or 0,  # mevcut kayıtların toplam hit'i (tüm zamanlar)
+    }
+
+
+def get_many(cache_keys):
+    """Süresi dolmamış kayıtları {cache_key: subtasks} olarak döner ve LRU zamanını günceller."""
+    if not cache_keys:
+        return {}
+
+    ttl = getattr(settings, "SUBTASK_CACHE_TTL", 30 * 24 * 3600)
+    now = timezone.now()
+    rows = SubtaskExtractionCache.objects.filter(
+        cache_key__in=set(cache_keys),
+        created_at__gte=now - timedelta(seconds=ttl),
+    ).values_list("cache_key", "subtasks")
+    found = dict(rows)
+
+    if found:
+        SubtaskExtractionCache.objects.filter(cache_key__in=found.keys()).update(
+            last_used_at=now, hit_count=F("hit_count") + 1
+        )
+    return found
+
+
+def store(cache_key, task_key, model, subtasks):
+    now = timezone.now()
+    SubtaskExtractionCache.objects.update_or_create(
+        cache_key=cache_key,
+        defaults={
+            "task_key": task_key,
+            "model": model,
+            "subtasks": subtasks,
+            "created_at": now,
+            "last_used_at": now,
+        },
+    )
+
+
+def prune():
+    """Süresi dolan kayıtları ve SUBTASK_CACHE_MAX_ENTRIES üstündeki en eski kullanılanları siler."""
+    ttl = getattr(settings, "SUBTASK_CACHE_TTL", 30 * 24 * 3600)
+    max_entries = getattr(settings, "SUBTASK_CACHE_MAX_ENTRIES", 10000)
+
+    SubtaskExtractionCache.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=ttl)
+    ).delete()
+
+    overflow = SubtaskExtractionCache.objects.count() - max_entries
+    if overflow > 0:
+        oldest = SubtaskExtractionCache.objects.order_by("last_used_at").values_list("pk", flat=True)[:overflow]
+        SubtaskExtractionCache.objects.filter(pk__in=list(oldest)).delete()
+
+
+def extract_subtasks_cached(tasks, max_subtasks=5, model=DEFAULT_MODEL):
+    """
+    tasks: [(task_key, description), ...]
+    update_subtasks_with_report'un cache'li ve paralel sürümü; sonuçları
+    run_in_parallel gibi [(result, error), ...] olarak aynı sırada döner.
+    Sadece cache'te olmayan açıklamalar için OpenAI çağrılır.
+    """
+    keys = [make_cache_key(k, d, model, max_subtasks) for k, d in tasks]
+    cached = get_many(keys)
+
+    results = [None] * len(tasks)
+    misses = []
+    for idx, ((task_key, description), cache_key) in enumerate(zip(tasks, keys)):
+        if cache_key in cached:
+            results[idx] = ({"task_key": task_key, "subtasks": cached[cache_key]}, None)
+        else:
+            misses.append(idx)
+    missed = set(misses)
+    record_cache_hits("subtasks", model, [k for idx, (k, _) in enumerate(tasks) if idx not in missed])
+
+    # Bağlam dışında çağrılırsa kayıtlar burada, havuz thread'leri dışında yazılır
+    with ensure_llm_call_context():
+        fresh = run_in_parallel(
+            lambda idx: update_subtasks_with_report(
+                tasks[idx][0], tasks[idx][1], max_subtasks=max_subtasks, model=model
+            ),
+            misses,
+        )
+
+    stored = False
+    for idx, (ai_result, error) in zip(misses, fresh):
+        results[idx] = (ai_result, error)
+        # Geçersiz yanıtlar hata olarak döner; boş liste gerçek bir sonuçtur
+        if error is None:
+            store(keys[idx], tasks[idx][0], model, ai_result["subtasks"])
+            stored = True
+
+    if stored:
+        try:
+            prune()
+        except Exception as e:
+            logger.warning(f"Alt-görev cache temizlenemedi: {e}")
+
+    return results
@@ -0,0 +1,98 @@
+# workers/services/task_selection.py
+"""
+Raporla ilgili task'ların seçimi (LLM'e gitmeden önceki ön filtre).
+Çoğu rapor kullanıcının task'larından iki üçünü anar; geri kalanlar için
+alt-görev çıkarımı ve durum değerlendirmesi yapmak gereksiz LLM çağrısıdır.
+
+Seçim sırası:
+1. TodayReport.jira_task_key ve rapor metninde geçen issue key'leri (her zaman);
+2. özet/açıklama kelimeleriyle yerel sözcüksel puan (IDF ağırlıklı), eşik
+   üstündeki en iyi REPORT_TASK_MAX_CANDIDATES task.
+"""
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+
+from workers.services.text_utils import tokenize
+
+ISSUE_KEY_RE = re.compile(r"\b([A-Z][A-Z0-9]+-\d+)\b", re.IGNORECASE)
+
+DESCRIPTION_WEIGHT = 0.5
+# Türkçe ekler için: rapordaki "hesabını", özetteki "hesabi" ile eşleşir
+MIN_PREFIX_LEN = 4
+
+
+def mentioned_keys(report):
+    """Raporun açıkça andığı issue key'leri (büyük harfle)."""
+    keys = {key.upper() for key in ISSUE_KEY_RE.findall(report.report_text or "")}
+    if report.jira_task_key:
+        keys.add(report.jira_task_key.strip().upper())
+    return keys
+
+
+def _matches(report_tokens, token):
+    if token in report_tokens:
+        return True
+    if len(token) < MIN_PREFIX_LEN:
+        return False
+    return any(r.startswith(token) for r in report_tokens)
+
+
+def score_tasks(report_text, jira_tasks):
+    """
+    Her task için rapora sözcüksel yakınlık puanı ({key: puan}).
+    Eşleşen özet token'ı idf, sadece açıklamada geçen token DESCRIPTION_WEIGHT × idf
+    katkı verir; idf = ln((N + 1) / df) + 1, yani her eşleşme en az 1 (özet) puandır.
+    """
+    report_tokens = set(tokenize(report_text))
+    if not report_tokens:
+        return {}
+
+    task_tokens = []
+    for jt in jira_tasks:
+        summary = set(tokenize(jt.get("summary", "")))
+        description = set(tokenize(jt.get("description") or "")) - summary
+        task_tokens.append((jt["key"], summary, description))
+
+    df = Counter(token for _, summary, description in task_tokens for token in summary | description)
+    n = len(task_tokens)
+
+    scores = {}
+    for key, summary, description in task_tokens:
+        score = 0.0
+        for token in summary | description:
+            if _matches(report_tokens, token):
+                weight = 1.0 if token in summary else DESCRIPTION_WEIGHT
+                score += weight * (math.log((n + 1) / df[token]) + 1)
+        if score:
+            scores[key] = score
+    return scores
+
+
+def select_relevant_tasks(report, jira_tasks, max_candidates=None, min_score=None):
+    """
+    report'un LLM ile değerlendirilecek task key'lerini jira_tasks sırasıyla döner.
+    Açıkça anılan task'lar her zaman seçilir; diğerlerinden puanı min_score'u
+    geçen en iyi max_candidates tanesi eklenir. Hiçbir task'la eşleşmeyen rapor
+    için boş liste döner.
+    """
+    max_candidates = max_candidates if max_candidates is not None else getattr(
+        settings, "REPORT_TASK_MAX_CANDIDATES", 3
+    )
+    min_score = min_score if min_score is not None else getattr(settings, "REPORT_TASK_MIN_SCORE", 1.0)
+
+    explicit = mentioned_keys(report)
+    selected = {jt["key"] for jt in jira_tasks if jt["key"].upper() in explicit}
+
+    others = [jt for jt in jira_tasks if jt["key"] not in selected]
+    scores = score_tasks(report.report_text, others)
+    ranked = sorted(
+        (key for key, score in scores.items() if score >= min_score),
+        key=lambda key: scores[key],
+        reverse=True,
+    )
+    selected.update(ranked[:max_candidates])
+
+    return [jt["key"] for jt in jira_tasks if jt["key"] in selected]
@@ -0,0 +1,107 @@
+# workers/services/task_store.py
+"""
+WorkerTask / TaskSubItem okuma-yazmaları.
+View ve rapor pipeline'ı task başına sorgu atmasın diye hepsi toplu yapılır:
+task'lar ve alt-görevleri 2 sorguda okunur, yeni kayıtlar bulk_create,
+durum değişiklikleri tek transaction'da bulk_update ile yazılır.
+"""
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+
+from workers.models import TaskSubItem, WorkerTask
+from workers.services.progress_cache import invalidate_progress
+from workers.services.progress_rollup import schedule_rollup_refresh
+
+
+def _subitems_prefetch():
+    # AI sonuçları alt-görevlere sırayla eşlendiği için sıra sabit olmalı
+    return Prefetch("subitems", queryset=TaskSubItem.objects.order_by("pk"))
+
+
+def _worker_tasks(user, keys):
+    return WorkerTask.objects.filter(assignee=user, jira_key__in=keys).prefetch_related(_subitems_prefetch())
+
+
+def fetch_worker_tasks(user, keys):
+    """Var olan WorkerTask'ları alt-görevleri prefetch edilmiş olarak {jira_key: task} döner."""
+    return {task.jira_key: task for task in _worker_tasks(user, keys)}
+
+
+async def afetch_worker_tasks(user, keys):
+    return {task.jira_key: task async for task in _worker_tasks(user, keys)}
+
+
+def load_worker_tasks(user, jira_tasks):
+    """
+    jira_tasks'a karşılık gelen WorkerTask'ları jira_tasks sırasıyla döner,
+    olmayanları oluşturur. Alt-görevler prefetch edilir; task.subitems.all()
+    ek sorgu yapmaz.
+    """
+    keys = [jt["key"] for jt in jira_tasks]
+    by_key = fetch_worker_tasks(user, keys)
+
+    new_tasks = {}
+    for jt in jira_tasks:
+        if jt["key"] not in by_key and jt["key"] not in new_tasks:
+            new_tasks[jt["key"]] = WorkerTask(
+                jira_key=jt["key"],
+                assignee=user,
+                title=jt.get("summary", ""),
+                description=jt.get("description") or "",
+            )
+    if new_tasks:
+        # Eşzamanlı istek aynı task'ı oluşturmuş olabilir; tekrar okunan kayıt kullanılır
+        WorkerTask.objects.bulk_create(new_tasks.values(), ignore_conflicts=True)
+        by_key.update(fetch_worker_tasks(user, list(new_tasks)))
+
+    return [by_key[key] for key in keys]
+
+
+def add_subitems(contents_by_task):
+    """
+    contents_by_task: [(task, [content, ...]), ...]
+    Eksik alt-görevleri tek bulk_create ile ekler (var olan (task, content)
+    çiftleri atlanır) ve bu task'ların alt-görev prefetch'ini tazeler.
+    """
+    new_items = [
+        TaskSubItem(task=task, content=content, is_done=False)
+        for task, contents in contents_by_task
+        for content in contents
+    ]
+    if not new_items:
+        return
+
+    TaskSubItem.objects.bulk_create(new_items, ignore_conflicts=True)
+    # bulk işlemler sinyal göndermez
+    user_ids = {task.assignee_id for task, _ in contents_by_task}
+    invalidate_progress(user_ids)
+    schedule_rollup_refresh(user_ids)
+
+    tasks = list({task.pk: task for task, _ in contents_by_task}.values())
+    for task in tasks:
+        getattr(task, "_prefetched_objects_cache", {}).pop("subitems", None)
+    prefetch_related_objects(tasks, _subitems_prefetch())
+
+
+def apply_subitem_statuses(db_subitems, ai_subtasks):
+    """AI sonucunu sırayla alt-görevlere uygular; is_done'ı değişenleri döner (kaydetmez)."""
+    changed = []
+    for sub, st in zip(db_subitems, ai_subtasks):
+        is_done = st.get("is_done", False)
+        if sub.is_done != is_done:
+            sub.is_done = is_done
+            changed.append(sub)
+    return changed
+
+
+def save_subitem_statuses(subitems):
+    """Değişen alt-görevleri tek transaction'da bulk_update ile yazar."""
+    if not subitems:
+        return
+    with transaction.atomic():
+        TaskSubItem.objects.bulk_update(subitems, ["is_done"])
+    user_ids = set(WorkerTask.objects.filter(
+        pk__in={s.task_id for s in subitems}
+    ).values_list("assignee_id", flat=True).distinct())
+    invalidate_progress(user_ids)
+    schedule_rollup_refresh(user_ids)
@@ -0,0 +1,39 @@
+# workers/services/text_utils.py
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Türkçe'de I/İ/ı büyük-küçük harf dönüşümü İngilizce'den farklıdır
+# ("İ".lower() Python'da "i̇" olur); hepsi "i"ye indirgenir.
+_TURKISH_I = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+
+STOPWORDS = {
+    # Türkçe
+    "ve", "ile", "için", "icin", "bir", "bu", "da", "de", "ki", "mi", "ya", "veya", "gibi", "olan",
+    # İngilizce
+    "the", "and", "for", "of", "to", "in", "on", "a", "an", "is", "with", "by", "or", "at",
+}
+
+
+def fold_text(text):
+    """
+    Türkçe uyumlu küçük harfe çevirme + aksan temizleme:
+    "YAKIT Hesabı", "yakıt hesabi" ve "Yakit HESABI" aynı sonucu verir.
+    """
+    text = (text or "").translate(_TURKISH_I).lower()
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text, drop_stopwords=True):
+    """Metni 2+ karakterli, katlanmış token'lara ayırır (sıra korunur, tekrarlar atılır)."""
+    seen = []
+    for token in _TOKEN_RE.findall(fold_text(text)):
+        token = token[:100]
+        if len(token) < 2 or token in seen:
+            continue
+        if drop_stopwords and token in STOPWORDS:
+            continue
+        seen.append(token)
+    return seen
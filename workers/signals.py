@@ -0,0 +1,48 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import TaskSubItem, TodayReport, WorkerTask
+from .services.progress_cache import invalidate_progress
+from .services.profiling import install_db_wrapper
+from .services.progress_rollup import record_report, schedule_rollup_refresh
+
+
+@receiver(connection_created)
+def profile_db_queries(sender, connection, **kwargs):
+    install_db_wrapper(connection)
+
+
+@receiver(post_save, sender=TodayReport)
+@receiver(post_delete, sender=TodayReport)
+def invalidate_progress_on_report(sender, instance, **kwargs):
+    invalidate_progress([instance.user_id])
+
+
+@receiver(post_save, sender=TodayReport)
+def count_report(sender, instance, created, **kwargs):
+    if created:
+        record_report(instance.user_id, instance.created_at)
+
+
+@receiver(post_delete, sender=TodayReport)
+def uncount_report(sender, instance, **kwargs):
+    record_report(instance.user_id, instance.created_at, delta=-1)
+
+
+@receiver(post_save, sender=TaskSubItem)
+@receiver(post_delete, sender=TaskSubItem)
+def invalidate_progress_on_subitem(sender, instance, **kwargs):
+    # Task zaten yüklüyse (admin, task.subitems üzerinden düzenleme) ek sorgu yapılmaz
+    if TaskSubItem.task.is_cached(instance):
+        assignee_id = instance.task.assignee_id
+    else:
+        assignee_id = WorkerTask.objects.filter(pk=instance.task_id).values_list("assignee_id", flat=True).first()
+    invalidate_progress([assignee_id])
+    schedule_rollup_refresh([assignee_id])
+
+
+@receiver(post_delete, sender=WorkerTask)
+def invalidate_progress_on_task(sender, instance, **kwargs):
+    invalidate_progress([instance.assignee_id])
+    schedule_rollup_refresh([instance.assignee_id])
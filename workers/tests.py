@@ -1,3 +1,1105 @@
-from django.test import TestCase
+import asyncio
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from workers.models import (
+    CatalogFile, CatalogToken, JiraAttachmentRecord, JiraIssue, JiraSyncState, LLMCallLog, ReportJob,
+    ReportJobTaskResult, SubtaskExtractionCache, TaskProgressSnapshot, TaskSubItem, TeamDailyRollup, TodayReport,
+    WorkerProfile, WorkerTask,
+)
+from workers.services import clients, local_matcher, profiling
+from workers.services.ai_service import (
+    SUBTASKS_SCHEMA, _chunk_tasks_by_budget, estimate_tokens, update_subtasks_status_batch,
+)
+from workers.services.executor import run_in_parallel
+from workers.services.file_catalog import refresh_catalog
+from workers.services.file_service import attach_files_to_task, match_task_to_files
+from workers.services.jira_client import CircuitBreaker, JiraClientManager, JiraUnavailable
+from workers.services.jira_service import (
+    get_transition_id_by_name, invalidate_transition_cache, iter_search_issues, move_tasks,
+)
+from workers.services.jira_sync import get_mirrored_tasks_for_user, sync_issues
+from workers.services.llm_client import LLMResponseError, complete_json
+from workers.services.llm_usage import _current, llm_call_context, record_call, usage_by_user_day
+from workers.services.progress_rollup import schedule_rollup_refresh
+from workers.services.report_pipeline import (
+    _process_tasks, claim_next_job, enqueue_report_job, process_report, run_job,
+)
+from workers.services.subtask_cache import extract_subtasks_cached
+from workers.services.task_selection import select_relevant_tasks
+from workers.services.task_store import add_subitems, load_worker_tasks, save_subitem_statuses
+
+
+def _jira_tasks(count):
+    return [
+        {"key": f"P-{i}", "summary": f"Task {i}", "description": f"Açıklama {i}", "status": "In Progress"}
+        for i in range(count)
+    ]
+
+
+def _extracted(items, max_subtasks=5):
+    return [({"subtasks": [{"content": f"{key} adım {n}"} for n in range(3)]}, None) for key, _ in items]
+
+
+def _statuses(report_text, tasks):
+    return {
+        t["task_key"]: {"task_key": t["task_key"], "subtasks": [{"is_done": True} for _ in t["subtasks"]]}
+        for t in tasks
+    }
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class WorkerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("worker", email="worker@example.com", password="x")
+
+    def _patch(self, target, **kwargs):
+        patcher = mock.patch(target, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _create_tasks(self, jira_tasks):
+        tasks = load_worker_tasks(self.user, jira_tasks)
+        add_subitems([(t, [f"{t.jira_key} adım {n}" for n in range(3)]) for t in tasks])
+
+
+class ViewProgressTests(WorkerTestCase):
+    """view_progress sadece okur; sorgu sayısı task sayısından bağımsız olmalı."""
+
+    def setUp(self):
+        super().setUp()
+        self._patch("workers.views.aensure_fresh")
+        self.client.force_login(self.user)
+
+    def _get(self, jira_tasks, queries):
+        with mock.patch("workers.views.aget_mirrored_tasks_for_user", return_value=jira_tasks):
+            with self.assertNumQueries(queries):
+                response = self.client.get(reverse("workers:view_progress"))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        # session, user, task'lar, alt-görevler
+        self._create_tasks(_jira_tasks(20))
+        self._get(_jira_tasks(20), 4)
+        cache.clear()
+        self._create_tasks(_jira_tasks(40))
+        self._get(_jira_tasks(40), 4)
+
+    def test_unprocessed_tasks_are_shown_without_writes(self):
+        response = self._get(_jira_tasks(3), 3)
+        self.assertContains(response, "P-2")
+        self.assertFalse(WorkerTask.objects.exists())
+
+    def test_repeat_view_is_served_from_cache(self):
+        self._create_tasks(_jira_tasks(5))
+        self._get(_jira_tasks(5), 4)
+        # Sadece session ve user
+        self._get(_jira_tasks(5), 2)
+
+    def test_new_report_invalidates_cache(self):
+        self._create_tasks(_jira_tasks(5))
+        self._get(_jira_tasks(5), 4)
+        TodayReport.objects.create(user=self.user, report_text="Yeni rapor")
+        self._get(_jira_tasks(5), 4)
+
+    def test_subitem_change_invalidates_cache(self):
+        self._create_tasks(_jira_tasks(5))
+        self._get(_jira_tasks(5), 4)
+        sub = TaskSubItem.objects.filter(task__assignee=self.user).first()
+        sub.is_done = True
+        sub.save()
+        response = self._get(_jira_tasks(5), 4)
+        self.assertContains(response, "33.3")
+
+
+@override_settings(LOCAL_MATCHER_ENABLED=False)
+class ReconcilerTests(WorkerTestCase):
+    """report_pipeline aynı raporu iki kez işlerse AI/Jira çağrıları tekrarlanmamalı."""
+
+    def setUp(self):
+        super().setUp()
+        self.extract = self._patch("workers.services.report_pipeline.extract_subtasks_cached", side_effect=_extracted)
+        self.statuses = self._patch("workers.services.report_pipeline.update_subtasks_status_batch", side_effect=_statuses)
+        self.move = self._patch(
+            "workers.services.report_pipeline.move_tasks",
+            side_effect=lambda keys, action: {key: True for key in keys},
+        )
+        self.comment = self._patch("workers.services.report_pipeline.add_comment")
+        # Seçim TaskSelectionTests'te; burada tüm task'lar değerlendirilir
+        self._patch(
+            "workers.services.report_pipeline.select_relevant_tasks",
+            side_effect=lambda report, tasks: [t["key"] for t in tasks],
+        )
+        self.report = TodayReport.objects.create(user=self.user, report_text="Hepsi bitti")
+
+    def test_reprocessing_same_report_is_a_no_op(self):
+        results = _process_tasks(_jira_tasks(3), self.report)
+        self.assertEqual([r["action"] for r in results], ["done"] * 3)
+        self.assertEqual(self.comment.call_count, 3)
+
+        results = _process_tasks(_jira_tasks(3), self.report)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.statuses.call_count, 1)
+        self.assertEqual(self.comment.call_count, 3)
+
+    def test_completed_task_is_not_moved_again(self):
+        _process_tasks(_jira_tasks(3), self.report)
+        next_report = TodayReport.objects.create(user=self.user, report_text="Yine bitti")
+        _process_tasks(_jira_tasks(3), next_report)
+        self.assertEqual(self.statuses.call_count, 2)
+        self.assertEqual(self.move.call_args.args[0], [])
+        self.assertEqual(self.comment.call_count, 3)
+
+    def test_task_missing_from_batch_result_is_retried(self):
+        self.statuses.side_effect = lambda text, tasks: _statuses(text, tasks[:-1])
+        results = _process_tasks(_jira_tasks(3), self.report)
+        self.assertEqual([bool(r.get("error")) for r in results], [False, False, True])
+        self.assertFalse(WorkerTask.objects.filter(jira_key="P-2", last_report=self.report).exists())
+        self.assertFalse(TaskSubItem.objects.filter(task__jira_key="P-2", is_done=True).exists())
+
+        self.statuses.side_effect = _statuses
+        _process_tasks(_jira_tasks(3), self.report)
+        self.assertEqual([t["task_key"] for t in self.statuses.call_args.args[1]], ["P-2"])
+        self.assertTrue(WorkerTask.objects.filter(jira_key="P-2", last_report=self.report).exists())
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        with self.assertNumQueries(11):
+            _process_tasks(_jira_tasks(10), self.report)
+        report = TodayReport.objects.create(user=self.user, report_text="Yeni")
+        # Var olan task'ların alt-görevleri için bir okuma fazlası
+        with self.assertNumQueries(12):
+            _process_tasks(_jira_tasks(10) + [{"key": f"Q-{i}", "description": ""} for i in range(20)], report)
+
+    def test_local_results_are_emitted_before_llm_call(self):
+        local = {"task_key": "P-0", "subtasks": [{"content": "P-0 adım 0", "is_done": True}]}
+        self._patch(
+            "workers.services.report_pipeline.match_statuses",
+            side_effect=lambda text, tasks: ({"P-0": local}, tasks[1:]),
+        )
+        emitted = []
+        self.statuses.side_effect = lambda text, tasks: (emitted.append("llm"), _statuses(text, tasks))[1]
+        _process_tasks(_jira_tasks(2), self.report, on_result=lambda r: emitted.append(r["task_key"]))
+        self.assertEqual(emitted, ["P-0", "llm", "P-1"])
+
+
+class JobQueueTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.report = TodayReport.objects.create(user=self.user, report_text="Bitti")
+
+    def test_job_is_claimed_once(self):
+        first = enqueue_report_job(self.report)
+        second = enqueue_report_job(self.report)
+        self.assertEqual(claim_next_job().pk, first.pk)
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (ReportJob.STATUS_RUNNING, 1))
+
+    @override_settings(REPORT_JOB_STALE_AFTER=60, REPORT_JOB_MAX_ATTEMPTS=2)
+    def test_stale_running_job_is_requeued_until_max_attempts(self):
+        job = enqueue_report_job(self.report)
+        stale = timezone.now() - timedelta(minutes=5)
+        ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.STATUS_RUNNING, started_at=stale, attempts=1)
+        self.assertEqual(claim_next_job().pk, job.pk)
+
+        ReportJob.objects.filter(pk=job.pk).update(started_at=stale)
+        self.assertIsNone(claim_next_job())
+        # Deneme hakkı biten job RUNNING'de kalmaz; durum sorgusu / SSE akışı biter
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ReportJob.STATUS_FAILED, 2))
+        self.assertTrue(job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_clears_previous_results(self):
+        job = enqueue_report_job(self.report)
+        ReportJobTaskResult.objects.create(job=job, task_key="P-0", action="done")
+        process = self._patch("workers.services.report_pipeline.process_report", side_effect=RuntimeError("Jira kapalı"))
+
+        with self.assertLogs("workers.services.report_pipeline", "ERROR"):
+            job = run_job(claim_next_job())
+        self.assertEqual((job.status, job.error), (ReportJob.STATUS_FAILED, "Jira kapalı"))
+        self.assertFalse(job.task_results.exists())
+
+        process.side_effect = None
+        ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.STATUS_PENDING)
+        job = run_job(claim_next_job())
+        self.assertEqual((job.status, job.error, job.attempts), (ReportJob.STATUS_DONE, "", 2))
+
+
+class FileCatalogTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = tmp.name
+
+    def _write(self, name, content=b"x"):
+        path = os.path.join(self.base_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_refresh_indexes_only_changes(self):
+        self._write("statik/Yakıt Hesabı.xlsx")
+        plan = self._write("mimari/plan.pdf")
+        old = self._write("mimari/eski.dwg")
+        self.assertEqual(refresh_catalog(self.base_dir), {"added": 3, "updated": 0, "removed": 0, "unchanged": 0})
+        self.assertEqual(CatalogFile.objects.get(name="plan.pdf").expertise, "mimari")
+        self.assertEqual(
+            set(CatalogToken.objects.filter(file__name="Yakıt Hesabı.xlsx").values_list("token", flat=True)),
+            {"yakit", "hesabi", "xlsx"},
+        )
+
+        self._write("mimari/plan.pdf", b"yeni plan")
+        os.utime(plan, (time.time() + 10, time.time() + 10))
+        os.remove(old)
+        self._write("kesit.pdf")
+        self.assertEqual(refresh_catalog(self.base_dir), {"added": 1, "updated": 1, "removed": 1, "unchanged": 1})
+        self.assertEqual(CatalogFile.objects.get(name="plan.pdf").size, len(b"yeni plan"))
+        self.assertFalse(CatalogFile.objects.filter(name="eski.dwg").exists())
+
+    def test_ranking_folds_turkish_and_drops_copies(self):
+        hesap = self._write("statik/YAKIT_HESABI.xlsx")
+        self._write("yedek/yakit_hesabi.xlsx")  # aynı ad ve boyut: kopya
+        plan = self._write("mimari/yakit_plan.pdf")
+        self._write("mimari/toplanti_notu.docx")
+        refresh_catalog(self.base_dir)
+
+        matches = match_task_to_files("Yakıt hesabı", "Depo planı", "statik", base_dir=self.base_dir)
+        self.assertEqual(matches, [hesap, plan])
+
+        # Expertise klasöründeki dosya öne çıkar
+        matches = match_task_to_files("Yakıt", "", "mimari", base_dir=self.base_dir, min_score=0)
+        self.assertEqual(matches[0], plan)
+
+
+class AttachmentTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = []
+        for name, content in (("plan.pdf", b"plan"), ("kopya/plan.pdf", b"plan"), ("rapor.xlsx", b"rapor")):
+            path = os.path.join(tmp.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+            self.paths.append(path)
+        self._patch("workers.services.file_service.match_task_to_files", return_value=self.paths)
+        self.task = {"key": "P-1", "summary": "Plan", "description": ""}
+
+    def test_same_content_is_uploaded_once(self):
+        jira = mock.Mock()
+        summary = attach_files_to_task(jira, self.task, self.user)
+        self.assertEqual(len(summary["uploaded"]), 2)  # kopya/plan.pdf aynı içerik
+        self.assertEqual(jira.add_attachment.call_count, 2)
+
+        summary = attach_files_to_task(jira, self.task, self.user)
+        self.assertEqual((summary["uploaded"], len(summary["skipped"])), ([], 3))
+        self.assertEqual(jira.add_attachment.call_count, 2)
+
+    @override_settings(ATTACHMENT_UPLOAD_TIMEOUT=0.05)
+    def test_slow_upload_is_recorded_not_failed(self):
+        jira = mock.Mock()
+        jira.add_attachment.side_effect = lambda **kwargs: time.sleep(0.2)
+        summary = attach_files_to_task(jira, self.task, self.user)
+        self.assertEqual((len(summary["uploaded"]), summary["failed"]), (2, []))
+        self.assertEqual(JiraAttachmentRecord.objects.filter(issue_key="P-1").count(), 2)
+
+
+class FileCheckTests(WorkerTestCase):
+    def test_pro_plan_attaches_files_to_evaluated_tasks(self):
+        WorkerProfile.objects.create(user=self.user, plan="pro")
+        report = TodayReport.objects.create(user=self.user, report_text="P-1 bitti")
+        self._patch("workers.services.report_pipeline.get_mirrored_tasks_for_user", return_value=_jira_tasks(3))
+        self._patch("workers.services.report_pipeline._process_tasks", return_value=[
+            {"task_key": "P-0", "action": "in_progress"},  # raporla ilgisiz, DB'deki durum
+            {"task_key": "P-1", "action": "done", "decided_by": "llm"},
+        ])
+        jira = self._patch("workers.services.report_pipeline.get_jira_client")
+        attach = self._patch("workers.services.report_pipeline.attach_files_to_task")
+
+        process_report(report)
+        attach.assert_called_once_with(jira.return_value, _jira_tasks(3)[1], report.user)
+
+        WorkerProfile.objects.filter(user=self.user).update(plan="basic")
+        process_report(TodayReport.objects.select_related("user").get(pk=report.pk))
+        self.assertEqual(attach.call_count, 1)
+
+
+def _issue(n, email="worker@example.com", status="In Progress", updated="2026-10-01T10:00:00.000+0000",
+           account_id=None):
+    person = SimpleNamespace(accountId=f"acc-{n}" if account_id is None else account_id, displayName="Worker")
+    if email is not None:  # Jira Cloud e-posta gizliliğinde alan hiç gelmez
+        person.emailAddress = email
+    return SimpleNamespace(id=1000 + n, key=f"P-{n}", fields=SimpleNamespace(
+        summary=f"Task {n}", description=f"Açıklama {n}", status=SimpleNamespace(name=status),
+        assignee=person, reporter=person, project=SimpleNamespace(key="P", name="Proje"),
+        issuetype=SimpleNamespace(name="Task"), created=updated, updated=updated,
+    ))
+
+
+class SearchPage(list):
+    def __init__(self, issues, total=None, next_token=None):
+        super().__init__(issues)
+        self.total = total
+        self.nextPageToken = next_token
+
+
+class FakeJira:
+    """search_issues'u startAt/maxResults ile sayfalayan Server/DC benzeri istemci."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        self.changed = None  # "updated >=" içeren JQL'de dönecek issue'lar
+        self.queries = []
+
+    def myself(self):
+        return {"timeZone": "UTC"}
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None):
+        self.queries.append((jql, startAt, maxResults))
+        issues = self.changed if "updated >=" in jql and self.changed is not None else self.issues
+        return SearchPage(issues[startAt:startAt + maxResults], total=len(issues))
+
+
+class IterSearchIssuesTests(SimpleTestCase):
+    def test_server_pages_past_first_page(self):
+        jira = FakeJira([_issue(n) for n in range(250)])
+        keys = [issue.key for issue in iter_search_issues("project = P", page_size=100, jira=jira)]
+        self.assertEqual(len(keys), 250)
+        self.assertEqual(len(set(keys)), 250)
+        self.assertEqual([start for _, start, _ in jira.queries], [0, 100, 200])
+
+    def test_max_issues_stops_early(self):
+        jira = FakeJira([_issue(n) for n in range(250)])
+        issues = list(iter_search_issues("project = P", page_size=100, max_issues=120, jira=jira))
+        self.assertEqual(len(issues), 120)
+        self.assertEqual([size for _, _, size in jira.queries], [100, 20])
+
+    def test_cloud_follows_next_page_token(self):
+        jira = mock.Mock(_is_cloud=True)
+        jira.enhanced_search_issues.side_effect = [
+            SearchPage([_issue(0), _issue(1)], next_token="t1"),
+            SearchPage([_issue(2)]),
+        ]
+        keys = [issue.key for issue in iter_search_issues("project = P", page_size=2, jira=jira)]
+        self.assertEqual(keys, ["P-0", "P-1", "P-2"])
+        tokens = [c.kwargs["nextPageToken"] for c in jira.enhanced_search_issues.call_args_list]
+        self.assertEqual(tokens, [None, "t1"])
+
+
+@override_settings(MY_JIRA_PROJECTS=["P"])
+class JiraSyncTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jira = FakeJira([_issue(n) for n in range(3)])
+        self._patch("workers.services.jira_sync.get_jira_client", return_value=self.jira)
+
+    def test_incremental_sync_fetches_only_changed_issues(self):
+        self.assertEqual(sync_issues(), {"fetched": 3, "tombstoned": 0})
+        watermark = JiraSyncState.objects.get().watermark
+        self.assertEqual(watermark.isoformat(), "2026-10-01T10:00:00+00:00")
+
+        self.jira.issues[1] = _issue(1, status="Done", updated="2026-10-02T09:00:00.000+0000")
+        self.jira.changed = [self.jira.issues[1]]
+        self.assertEqual(sync_issues(), {"fetched": 1, "tombstoned": 0})
+        # Watermark'tan JIRA_SYNC_OVERLAP kadar geriden başlanır
+        self.assertIn('updated >= "2026/10/01 09:58"', self.jira.queries[-1][0])
+        self.assertEqual(JiraIssue.objects.get(key="P-1").status, "Done")
+        self.assertEqual(JiraSyncState.objects.get().watermark.isoformat(), "2026-10-02T09:00:00+00:00")
+
+    def test_full_sync_tombstones_missing_issues(self):
+        sync_issues()
+        del self.jira.issues[0]
+        self.assertEqual(sync_issues(full=True), {"fetched": 2, "tombstoned": 1})
+        self.assertTrue(JiraIssue.objects.get(key="P-0").is_deleted)
+        tasks = get_mirrored_tasks_for_user(self.user)
+        self.assertEqual(sorted(t["key"] for t in tasks), ["P-1", "P-2"])
+
+    def test_tasks_match_account_id_when_email_is_hidden(self):
+        self.jira.issues = [_issue(0, email=None), _issue(1, email=None), _issue(2, email=None, account_id="")]
+        self.jira.issues[1].fields.reporter = SimpleNamespace(accountId="acc-0")
+        sync_issues()
+        self.assertEqual(get_mirrored_tasks_for_user(self.user), [])
+
+        WorkerProfile.objects.create(user=self.user, jira_account_id="acc-0")
+        self.assertEqual(sorted(t["key"] for t in get_mirrored_tasks_for_user(self.user)), ["P-0", "P-1"])
+        # Hesabı bilinmeyen kullanıcı boş accountId'li issue'larla eşleşmez
+        other = User.objects.create_user("other")
+        WorkerProfile.objects.create(user=other, jira_account_id="")
+        self.assertEqual(get_mirrored_tasks_for_user(other), [])
+
+    def test_mirror_is_read_without_sync_while_fresh(self):
+        get_mirrored_tasks_for_user(self.user)
+        self.jira.queries.clear()
+        self.assertEqual(len(get_mirrored_tasks_for_user(self.user, max_age=300)), 3)
+        self.assertEqual(self.jira.queries, [])
+
+
+class MoveTasksTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_transition_cache()
+        self.addCleanup(invalidate_transition_cache)
+        for n in range(4):
+            JiraIssue.objects.create(key=f"P-{n}", jira_id=str(n), project_key="P", issue_type="Task", status="In Progress")
+        self.jira = mock.Mock()
+        self.jira.transitions.return_value = [
+            {"id": "21", "name": "Start Progress", "to": {"name": "In Progress"}},
+            {"id": "31", "name": "Done", "to": {"name": "Done"}},
+        ]
+        self._patch("workers.services.jira_service.get_jira_client", return_value=self.jira)
+
+    def test_transitions_are_fetched_once_per_workflow_state(self):
+        results = move_tasks(["P-0", "P-1", "X-9"], "done")
+        self.assertEqual(results, {"P-0": True, "P-1": True, "X-9": True})
+        # P grubu için bir, kopyada olmayan X-9 için bir
+        self.assertEqual(self.jira.transitions.call_count, 2)
+        self.assertEqual(self.jira.transition_issue.call_args_list, [
+            mock.call("P-0", "31"), mock.call("P-1", "31"), mock.call("X-9", "31"),
+        ])
+        self.assertEqual(JiraIssue.objects.get(key="P-0").status, "Done")
+
+        self.assertEqual(get_transition_id_by_name("P-2", "done"), "31")
+        self.assertEqual(self.jira.transitions.call_count, 2)
+
+    def test_failed_transition_drops_cached_map(self):
+        self.jira.transition_issue.side_effect = [RuntimeError("workflow değişti"), None]
+        with self.assertLogs("workers.services.jira_service", "ERROR"):
+            self.assertEqual(move_tasks(["P-0"], "done"), {"P-0": False})
+        self.assertEqual(move_tasks(["P-1"], "done"), {"P-1": True})
+        self.assertEqual(self.jira.transitions.call_count, 2)
+
+
+class MergeDuplicateTasksMigrationTests(TransactionTestCase):
+    before = [("workers", "0010_jiraattachmentrecord")]
+    after = [("workers", "0011_merge_duplicate_workertasks")]
+
+    def setUp(self):
+        if self.before[0] not in MigrationExecutor(connection).loader.graph.nodes:
+            self.skipTest("migrasyonlar kapalı")
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_merged_before_unique_constraint(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        user = apps.get_model("auth", "User").objects.create(username="ayse")
+        Task = apps.get_model("workers", "WorkerTask")
+        SubItem = apps.get_model("workers", "TaskSubItem")
+        first, second = [Task.objects.create(jira_key="P-1", assignee=user, description="") for _ in range(2)]
+        SubItem.objects.create(task=first, content="Tasarım", is_done=False)
+        SubItem.objects.create(task=second, content="Tasarım", is_done=True)
+        SubItem.objects.create(task=second, content="Test", is_done=False)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+        Task = apps.get_model("workers", "WorkerTask")
+        self.assertEqual(list(Task.objects.values_list("pk", flat=True)), [first.pk])
+        self.assertEqual(
+            sorted(apps.get_model("workers", "TaskSubItem").objects.values_list("content", "is_done")),
+            [("Tasarım", True), ("Test", False)],
+        )
+        with self.assertRaises(IntegrityError):
+            Task.objects.create(jira_key="P-1", assignee_id=user.pk, description="")
+
+
+def _completion(content, finish_reason="stop", usage=None):
+    message = SimpleNamespace(content=content, refusal=None)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message, finish_reason=finish_reason)],
+        usage=usage,
+    )
+
+
+class CompleteJsonTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("workers.services.llm_client.record_call")
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def _complete(self, *responses):
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = list(responses)
+        with mock.patch("workers.services.llm_client.get_llm_client", return_value=client):
+            data = complete_json("subtasks", [], SUBTASKS_SCHEMA, max_tokens=10_000)
+        return data, client.chat.completions.create
+
+    def test_retries_once_on_invalid_json(self):
+        data, create = self._complete(
+            _completion('{"subtasks": [{"content": "a",}]}'),
+            _completion('{"subtasks": [{"content": "a"}]}'),
+        )
+        self.assertEqual(data, {"subtasks": [{"content": "a"}]})
+        self.assertEqual(create.call_count, 2)
+        # Çağrı tipinin sınırı aşılamaz
+        self.assertEqual(create.call_args.kwargs["max_tokens"], 300)
+
+    def test_raises_when_schema_does_not_match_twice(self):
+        with self.assertRaises(LLMResponseError):
+            self._complete(_completion('{"subtasks": "a"}'), _completion('{"items": []}'))
+
+    def test_truncated_response_is_not_retried(self):
+        client = mock.Mock()
+        client.chat.completions.create.return_value = _completion('{"subtasks": [', finish_reason="length")
+        with mock.patch("workers.services.llm_client.get_llm_client", return_value=client):
+            with self.assertRaises(LLMResponseError):
+                complete_json("subtasks", [], SUBTASKS_SCHEMA)
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+
+class RunInParallelTests(SimpleTestCase):
+    def test_results_keep_item_order_and_errors(self):
+        def func(n):
+            if n == 2:
+                raise ValueError("bozuk")
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        results = run_in_parallel(func, range(5), max_workers=3, timeout=5)
+        self.assertEqual([r for r, _ in results], [0, 10, None, 30, 40])
+        self.assertIsInstance(results[2][1], ValueError)
+
+    def test_slow_call_times_out(self):
+        results = run_in_parallel(lambda n: time.sleep(n) or n, [0, 0.5], max_workers=2, timeout=0.1)
+        self.assertEqual(results[0], (0, None))
+        self.assertIsInstance(results[1][1], TimeoutError)
+
+    def test_zero_timeout_waits_for_all_calls(self):
+        results = run_in_parallel(lambda n: time.sleep(n) or n, [0, 0.2], max_workers=2, timeout=0)
+        self.assertEqual(results, [(0, None), (0.2, None)])
+
+
+class BatchStatusTests(SimpleTestCase):
+    """Değerlendirilemeyen task'lar sonuçta olmamalı; aksi halde alt-görevler 'yapılmadı'ya döner."""
+
+    def _tasks(self, *keys):
+        return [{"task_key": key, "subtasks": [{"content": f"{key} adım {n}"} for n in range(2)]} for key in keys]
+
+    def test_failed_chunk_is_left_out(self):
+        def evaluate(report_text, chunk, model, timeout):
+            if chunk[0]["task_key"] == "PROJ-2":
+                raise LLMResponseError("geçersiz JSON")
+            return {t["task_key"]: {0} for t in chunk}
+
+        with mock.patch("workers.services.ai_service._evaluate_status_chunk", side_effect=evaluate):
+            # Çok küçük bütçe: her task ayrı parça
+            results = update_subtasks_status_batch("rapor", self._tasks("PROJ-1", "PROJ-2"), token_budget=1)
+        self.assertEqual(list(results), ["PROJ-1"])
+        self.assertEqual([s["is_done"] for s in results["PROJ-1"]["subtasks"]], [True, False])
+
+    def test_task_missing_from_reply_is_left_out(self):
+        with mock.patch("workers.services.ai_service._evaluate_status_chunk", return_value={"PROJ-1": set()}):
+            results = update_subtasks_status_batch("rapor", self._tasks("PROJ-1", "PROJ-2") + [
+                {"task_key": "PROJ-3", "subtasks": []},
+            ])
+        self.assertEqual(sorted(results), ["PROJ-1", "PROJ-3"])
+
+    def test_tasks_are_split_by_token_budget(self):
+        tasks = self._tasks(*[f"PROJ-{i}" for i in range(6)])
+        cost = estimate_tokens(json.dumps(tasks[0], ensure_ascii=False))
+        chunks = _chunk_tasks_by_budget(tasks, 10, 10 + 2 * cost)
+        self.assertEqual([len(c) for c in chunks], [2, 2, 2])
+        self.assertEqual(sum(chunks, []), tasks)
+        # Tek task bütçeyi aşsa da kendi parçasında gönderilir
+        self.assertEqual(len(_chunk_tasks_by_budget(tasks, 10, 1)), 6)
+
+        evaluate = mock.Mock(side_effect=lambda text, chunk, model, timeout: {t["task_key"]: {1} for t in chunk})
+        with mock.patch("workers.services.ai_service._evaluate_status_chunk", evaluate):
+            results = update_subtasks_status_batch("rapor", tasks, token_budget=100_000)
+        self.assertEqual(evaluate.call_count, 1)
+        self.assertEqual(len(results), 6)
+
+
+class JiraHTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@override_settings(JIRA_MAX_RETRIES=0)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.manager = JiraClientManager()
+        self.manager.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    def _open_and_expire(self):
+        with self.assertRaises(JiraHTTPError):
+            self.manager.call(mock.Mock(side_effect=JiraHTTPError(503)))
+        self.assertEqual(self.manager.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(JiraUnavailable):
+            self.manager.call(mock.Mock())
+        self.manager.breaker._opened_at -= 61
+        self.assertEqual(self.manager.breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_client_error_on_trial_call_closes_breaker(self):
+        self._open_and_expire()
+        with self.assertRaises(JiraHTTPError):
+            self.manager.call(mock.Mock(side_effect=JiraHTTPError(404)))
+        self.assertEqual(self.manager.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.manager.call(mock.Mock(return_value="ok")), "ok")
+
+    def test_server_error_on_trial_call_reopens_breaker(self):
+        self._open_and_expire()
+        with self.assertRaises(JiraHTTPError):
+            self.manager.call(mock.Mock(side_effect=JiraHTTPError(502)))
+        self.assertEqual(self.manager.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.manager.breaker.open_count, 2)
+
+    @override_settings(JIRA_MAX_RETRIES=2, JIRA_BACKOFF_BASE=0)
+    def test_retryable_error_is_retried(self):
+        func = mock.Mock(side_effect=[JiraHTTPError(429), "ok"])
+        self.assertEqual(self.manager.call(func), "ok")
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(self.manager.metrics()["retries"], 1)
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    """DB_ENGINE ve DB_* ortam değişkenlerinden DATABASES'in kurulması."""
+
+    def _database(self, **env):
+        path = os.path.join(settings.BASE_DIR, "base_project", "settings.py")
+        spec = importlib.util.spec_from_file_location("settings_under_test", path)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, env):
+            spec.loader.exec_module(module)
+        return module.DATABASES["default"]
+
+    def test_postgresql_uses_pool_by_default(self):
+        db = self._database(DB_ENGINE="postgresql", DB_NAME="rapor", DB_POOL_MAX_SIZE="8")
+        self.assertEqual((db["ENGINE"], db["NAME"], db["CONN_MAX_AGE"]), ("django.db.backends.postgresql", "rapor", 0))
+        self.assertEqual(db["OPTIONS"]["pool"]["max_size"], 8)
+        self.assertTrue(db["CONN_HEALTH_CHECKS"])
+
+    def test_postgresql_without_pool_keeps_connections(self):
+        db = self._database(DB_ENGINE="postgresql", DB_POOL="False", DB_CONN_MAX_AGE="120")
+        self.assertEqual((db["CONN_MAX_AGE"], db["OPTIONS"]), (120, {}))
+
+    def test_sqlite_waits_for_write_lock(self):
+        db = self._database(DB_ENGINE="sqlite", SQLITE_BUSY_TIMEOUT="5")
+        self.assertEqual(db["OPTIONS"]["timeout"], 5)
+        self.assertEqual(db["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertIn("journal_mode=WAL", db["OPTIONS"]["init_command"])
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self._database(DB_ENGINE="mysql")
+
+
+class ClientRegistryTests(SimpleTestCase):
+    def tearDown(self):
+        clients._factories.pop("test", None)
+        clients.reset("test")
+
+    def test_client_is_built_once_on_first_use(self):
+        factory = mock.Mock(return_value=object())
+        clients.register("test", factory)
+        self.assertFalse(clients.is_initialized("test"))
+        self.assertIs(clients.get("test"), clients.get("test"))
+        self.assertEqual(factory.call_count, 1)
+
+    def test_factory_error_is_not_cached(self):
+        factory = mock.Mock(side_effect=[RuntimeError("bağlantı yok"), "client"])
+        clients.register("test", factory)
+        with self.assertRaises(RuntimeError):
+            clients.get("test")
+        self.assertEqual(clients.get("test"), "client")
+
+    def test_llm_client_is_not_built_on_import(self):
+        self.assertFalse(clients.is_initialized("openai"))
+
+    @override_settings(OPENAI_API_KEY="")
+    def test_missing_credentials_fail_on_first_call(self):
+        clients.reset("openai")
+        with self.assertRaises(ImproperlyConfigured):
+            clients.get("openai")
+        self.assertFalse(clients.is_initialized("openai"))
+
+
+class LLMUsageTests(WorkerTestCase):
+    def test_calls_are_logged_with_tokens_and_cost(self):
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=200)
+        client = mock.Mock()
+        client.chat.completions.create.side_effect = [
+            _completion("{", usage=usage),
+            _completion('{"subtasks": []}', usage=usage),
+        ]
+        self._patch("workers.services.llm_client.get_llm_client", return_value=client)
+
+        with llm_call_context("test", user=self.user):
+            complete_json("subtasks", [], SUBTASKS_SCHEMA, task_key="P-1")
+            # Bağlam içinde yazılmaz, çıkışta toplu yazılır
+            self.assertFalse(LLMCallLog.objects.exists())
+
+        logs = list(LLMCallLog.objects.order_by("pk"))
+        self.assertEqual([log.error for log in logs], ["invalid_json", ""])
+        self.assertEqual({(log.user_id, log.source, log.task_key) for log in logs}, {(self.user.pk, "test", "P-1")})
+        self.assertEqual(float(logs[1].cost_usd), 0.00027)  # gpt-4o-mini: 1000 × 0.15 + 200 × 0.60 / 1M
+
+    def test_worker_threads_do_not_write_logs(self):
+        writers = []
+        bulk_create = LLMCallLog.objects.bulk_create
+
+        def track(records):
+            writers.append(threading.current_thread().name)
+            return bulk_create(records)
+
+        with mock.patch.object(LLMCallLog.objects, "bulk_create", side_effect=track):
+            # Bağlam yok: havuz thread'lerindeki kayıtlar tamponda bekler
+            run_in_parallel(lambda n: record_call("subtasks", "gpt-4o-mini", task_key=f"P-{n}"), range(3))
+            self.assertFalse(LLMCallLog.objects.exists())
+            record_call("status", "gpt-4o-mini")
+
+            # Bağlam kapandıktan sonra biten çağrı da tampona düşer
+            with llm_call_context("test") as context:
+                pass
+            _current.set(context)
+            self.addCleanup(_current.set, None)
+            run_in_parallel(lambda n: record_call("subtasks", "gpt-4o-mini", task_key="geç"), range(2))
+            _current.set(None)
+            record_call("status", "gpt-4o-mini")
+
+        self.assertEqual(LLMCallLog.objects.count(), 7)
+        self.assertEqual(set(writers), {threading.current_thread().name})
+
+    def test_usage_summary_per_user_and_day(self):
+        LLMCallLog.objects.bulk_create(
+            [LLMCallLog(user=self.user, call_type="status", model="gpt-4o-mini", latency_ms=ms,
+                        prompt_tokens=10, completion_tokens=1) for ms in range(1, 21)]
+            + [LLMCallLog(user=self.user, call_type="subtasks", model="gpt-4o-mini", cache_hit=True)]
+        )
+
+        [row] = usage_by_user_day()
+        self.assertEqual(row["user"], "worker")
+        self.assertEqual((row["calls"], row["cache_hits"], row["total_tokens"]), (20, 1, 220))
+        self.assertEqual((row["latency_p50_ms"], row["latency_p95_ms"]), (10, 19))
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("manager-llm-usage"), {"days": 1})
+        self.assertEqual(response.json()["rows"], [row])
+
+
+class SubtaskCacheTests(WorkerTestCase):
+    def setUp(self):
+        super().setUp()
+
+        def extract(task_key, description, max_subtasks=5, model=None):
+            record_call("subtasks", model, task_key=task_key)  # complete_json'un yazdığı kayıt
+            return {"task_key": task_key, "subtasks": [{"content": f"{description} adım"}]}
+
+        self.extract = self._patch("workers.services.subtask_cache.update_subtasks_with_report", side_effect=extract)
+
+    def test_repeat_extraction_is_served_from_cache(self):
+        tasks = [("P-1", "Login"), ("P-2", "Rapor")]
+        # run_job gibi: thread'lerdeki kayıtlar bağlamda toplanır
+        with llm_call_context("report_job", user=self.user):
+            extract_subtasks_cached(tasks)
+            results = extract_subtasks_cached(tasks + [("P-3", "Export")])
+        self.assertEqual(self.extract.call_count, 3)
+        self.assertEqual(results[1], ({"task_key": "P-2", "subtasks": [{"content": "Rapor adım"}]}, None))
+
+        # İstatistik süreç içi sayaçtan değil kayıtlardan: web süreci de görür
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        stats = self.client.get(reverse("workers:ai-cache-stats")).json()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"], stats["entry_hits"]), (2, 3, 3, 2))
+
+    @override_settings(SUBTASK_CACHE_TTL=60, SUBTASK_CACHE_MAX_ENTRIES=2)
+    def test_expired_and_overflow_entries_are_pruned(self):
+        extract_subtasks_cached([("P-1", "Login")])
+        SubtaskExtractionCache.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        extract_subtasks_cached([("P-1", "Login")])
+        self.assertEqual(self.extract.call_count, 2)  # süresi dolan kayıt kullanılmaz
+        self.assertEqual(SubtaskExtractionCache.objects.count(), 1)
+
+        extract_subtasks_cached([("P-2", "Rapor"), ("P-3", "Export")])
+        self.assertEqual(SubtaskExtractionCache.objects.count(), 2)
+        self.assertFalse(SubtaskExtractionCache.objects.filter(task_key="P-1").exists())
+
+
+@override_settings(PROFILING_SLOW_MS=0)
+class ProfilingMiddlewareTests(WorkerTestCase):
+    def test_server_timing_and_slow_request_buffer(self):
+        profiling.reset()
+        self._patch("workers.views.aensure_fresh")
+        self._patch("workers.views.aget_mirrored_tasks_for_user", return_value=_jira_tasks(2))
+        self.client.force_login(self.user)
+
+        with self.modify_settings(MIDDLEWARE={"prepend": "workers.middleware.ProfilingMiddleware"}):
+            response = self.client.get(reverse("workers:view_progress"))
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+x", total;dur=[\d.]+$')
+        [profile] = profiling.slowest_requests()
+        self.assertEqual(profile["path"], reverse("workers:view_progress"))
+        self.assertGreater(profile["spans"]["db"]["count"], 0)
+        self.assertEqual(profile["spans"]["llm"]["count"], 0)
+
+    async def test_async_view_queries_are_counted(self):
+        profiling.reset()
+        self._patch("workers.views.aensure_fresh")
+        self._patch("workers.views.aget_mirrored_tasks_for_user", return_value=_jira_tasks(2))
+        await self.async_client.aforce_login(self.user)
+
+        with self.modify_settings(MIDDLEWARE={"prepend": "workers.middleware.ProfilingMiddleware"}):
+            response = await self.async_client.get(reverse("workers:view_progress"))
+
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="[1-9]\d*x", total;dur=[\d.]+$')
+        [profile] = profiling.slowest_requests()
+        self.assertGreater(profile["spans"]["db"]["count"], 0)
+
+    def test_span_is_noop_without_active_profile(self):
+        with profiling.span("jira"):
+            pass
+        self.assertEqual(profiling._current.get(), None)
+
+
+class TaskSelectionTests(WorkerTestCase):
+    def _tasks(self):
+        tasks = _jira_tasks(20)
+        for t in tasks:
+            t["key"] = t["key"].replace("P-", "NS-")
+        tasks[7]["summary"] = "Yakıt hesabı ekranı"
+        tasks[12]["description"] = "Fatura PDF çıktısı"
+        return tasks
+
+    def test_explicit_keys_and_keywords_are_selected(self):
+        report = TodayReport(user=self.user, jira_task_key="ns-15", report_text="NS-3 bitti, yakıt hesabını düzelttim.")
+        self.assertEqual(select_relevant_tasks(report, self._tasks()), ["NS-3", "NS-7", "NS-15"])
+
+    def test_description_keywords_and_common_words(self):
+        report = TodayReport(user=self.user, report_text="Faturanın PDF çıktısı hazır")
+        self.assertEqual(select_relevant_tasks(report, self._tasks()), ["NS-12"])
+        # Her task'ın açıklamasında geçen kelime tek başına seçtirmez
+        report.report_text = "Açıklamaları okudum"
+        self.assertEqual(select_relevant_tasks(report, self._tasks()), [])
+
+    @override_settings(LOCAL_MATCHER_ENABLED=False)
+    def test_only_relevant_tasks_reach_the_llm(self):
+        extract = self._patch("workers.services.report_pipeline.extract_subtasks_cached", side_effect=_extracted)
+        statuses = self._patch("workers.services.report_pipeline.update_subtasks_status_batch", side_effect=_statuses)
+        self._patch("workers.services.report_pipeline.move_tasks", return_value={})
+        report = TodayReport.objects.create(user=self.user, report_text="Yakıt hesabı ekranında çalıştım")
+
+        results = _process_tasks(self._tasks(), report)
+        self.assertEqual([key for key, _ in extract.call_args.args[0]], ["NS-7"])
+        self.assertEqual([t["task_key"] for t in statuses.call_args.args[1]], ["NS-7"])
+        self.assertEqual(len(results), 20)
+        # Seçilmeyen task'lar bu rapor için işlenmiş sayılmaz
+        self.assertEqual(
+            list(WorkerTask.objects.filter(last_report=report).values_list("jira_key", flat=True)), ["NS-7"]
+        )
+
+
+@skipUnless(local_matcher._numpy(), "NumPy kurulu değil")
+class LocalMatcherTests(WorkerTestCase):
+    REPORT = (
+        "Login sayfasının tasarımını tamamladım. Şifre sıfırlama e-postası üzerinde çalışıyorum, "
+        "testlere yarın başlayacağım."
+    )
+
+    def _task(self, key, *contents):
+        return {"task_key": key, "subtasks": [{"content": c} for c in contents]}
+
+    def test_clear_updates_are_decided_locally(self):
+        statuses, pending = local_matcher.match_statuses(self.REPORT, [
+            self._task("NS-1", "Login sayfası tasarımı", "Şifre sıfırlama e-postası"),
+            self._task("NS-2", "Birim testleri yazılacak", "Notification servisini bağla"),
+        ])
+        self.assertEqual([s["is_done"] for s in statuses["NS-1"]["subtasks"]], [True, False])
+        # "testlere" kısmen benziyor: karar LLM'e kalır
+        self.assertEqual([t["task_key"] for t in pending], ["NS-2"])
+
+    def test_negated_completion_is_not_done(self):
+        self.assertEqual(local_matcher.detect_cue("Rapor ekranı henüz tamamlanmadı"), local_matcher.NOT_DONE)
+        self.assertEqual(local_matcher.detect_cue("Finished the export"), local_matcher.DONE)
+        self.assertEqual(local_matcher.detect_cue("Notification ayarları"), local_matcher.UNKNOWN)
+
+    def test_progressive_and_future_forms_are_not_done(self):
+        for clause in (
+            "Raporu hazırlıyorum", "Ekran hazırlanıyor", "Modül teslim edilecek",
+            "Yarın teslim edeceğim", "Testler tamamlanacak", "Export bitiyor",
+        ):
+            self.assertEqual(local_matcher.detect_cue(clause), local_matcher.NOT_DONE, clause)
+        for clause in (
+            "Rapor hazırlandı", "Raporu hazırladım", "Ekran hazır", "Modül teslim edildi",
+            "Modülü teslim ettim",
+        ):
+            self.assertEqual(local_matcher.detect_cue(clause), local_matcher.DONE, clause)
+
+    def test_in_progress_subtask_is_not_marked_done(self):
+        statuses, _ = local_matcher.match_statuses("Login sayfası tasarımını hazırlıyorum.", [
+            self._task("NS-1", "Login sayfası tasarımı"),
+        ])
+        self.assertEqual(statuses["NS-1"]["subtasks"][0]["is_done"], False)
+
+    def test_benchmark_against_recorded_llm_decisions(self):
+        report = TodayReport.objects.create(user=self.user, report_text=self.REPORT)
+        job = ReportJob.objects.create(report=report, user=self.user)
+        ReportJobTaskResult.objects.create(job=job, task_key="NS-1", decided_by="llm", subtasks=[
+            {"content": "Login sayfası tasarımı", "is_done": True},
+            {"content": "Şifre sıfırlama e-postası", "is_done": False},
+        ])
+        out = StringIO()
+        call_command("bench_local_matcher", stdout=out)
+        self.assertIn("Yerelde karar verilen task: 1 (100.0%)", out.getvalue())
+        self.assertIn("2/2 (100.0%)", out.getvalue())
+
+
+class AsyncViewTests(WorkerTestCase):
+    async def test_concurrent_report_submissions(self):
+        await self.async_client.aforce_login(self.user)
+        responses = await asyncio.gather(*(
+            self.async_client.post(reverse("workers:submit-report"), {"report_text": f"Rapor {i}"})
+            for i in range(10)
+        ))
+        self.assertEqual({r.status_code for r in responses}, {202})
+        self.assertEqual(await ReportJob.objects.filter(user=self.user).acount(), 10)
+
+    async def test_view_progress_uses_async_mirror(self):
+        await self.async_client.aforce_login(self.user)
+        with mock.patch("workers.views.aensure_fresh"), mock.patch(
+            "workers.views.aget_mirrored_tasks_for_user", return_value=_jira_tasks(2)
+        ) as mirrored:
+            response = await self.async_client.get(reverse("workers:view_progress"))
+        self.assertEqual(response.status_code, 200)
+        mirrored.assert_awaited_once()
+
+    async def test_job_events_stream_results_and_done(self):
+        report = await TodayReport.objects.acreate(user=self.user, report_text="Rapor")
+        job = await ReportJob.objects.acreate(report=report, user=self.user, status=ReportJob.STATUS_DONE)
+        first = await ReportJobTaskResult.objects.acreate(job=job, task_key="P-0", progress=100, action="done")
+        await ReportJobTaskResult.objects.acreate(job=job, task_key="P-1", progress=50, action="in_progress")
+        await self.async_client.aforce_login(self.user)
+
+        url = reverse("workers:report-job-events", args=[job.pk])
+        response = await self.async_client.get(url, headers={"Last-Event-ID": str(first.pk)})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertNotIn('"P-0"', body)
+        self.assertIn('event: task\ndata: {"task_key": "P-1"', body)
+        self.assertTrue(body.rstrip().split("\n\n")[-1].startswith("event: done"))
+
+        other = await User.objects.acreate(username="other")
+        await self.async_client.aforce_login(other)
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+
+
+class ProgressRollupTests(WorkerTestCase):
+    """Yönetici paneli önceden hesaplanmış özetlerden okur; sorgu sayısı ekip büyüklüğünden bağımsız."""
+
+    def _member(self, username, department="Backend"):
+        user = User.objects.create_user(username, password="x")
+        WorkerProfile.objects.create(user=user, department=department)
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks = load_worker_tasks(user, _jira_tasks(2) + [{"key": "WEB-1", "summary": "Web"}])
+            add_subitems([(t, [f"{t.jira_key} adım {n}" for n in range(2)]) for t in tasks])
+        return user
+
+    def test_subitem_changes_update_snapshots(self):
+        user = self._member("ayse")
+        self.assertEqual(
+            sorted(TaskProgressSnapshot.objects.filter(user=user).values_list("project_key", "subtasks_total")),
+            [("P", 4), ("WEB", 2)],
+        )
+        subitems = list(TaskSubItem.objects.filter(task__assignee=user, task__jira_key="WEB-1"))
+        for sub in subitems:
+            sub.is_done = True
+        with self.captureOnCommitCallbacks(execute=True):
+            save_subitem_statuses(subitems)
+
+        web = TaskProgressSnapshot.objects.get(user=user, project_key="WEB")
+        self.assertEqual((web.tasks_done, web.subtasks_done), (1, 2))
+        today = TeamDailyRollup.objects.get(user=user)
+        self.assertEqual((today.subtasks_done, today.subtasks_total), (2, 6))
+
+    def test_refreshes_are_batched_per_transaction(self):
+        ayse, mehmet = self._member("ayse"), self._member("mehmet")
+        subitems = list(TaskSubItem.objects.select_related("task").filter(task__assignee__in=[ayse, mehmet]))
+        refresh = self._patch("workers.services.progress_rollup.refresh_progress_rollups")
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for sub in subitems:
+                    sub.is_done = True
+                    sub.save()
+        # Satır başına yeniden sayım ve assignee sorgusu yok
+        refresh.assert_called_once_with({ayse.pk, mehmet.pk})
+        self.assertFalse([q for q in queries if q["sql"].startswith("SELECT")])
+
+        refresh.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                schedule_rollup_refresh([ayse.pk])
+                raise RuntimeError
+            schedule_rollup_refresh([mehmet.pk])
+        refresh.assert_called_once_with({mehmet.pk})
+
+    def test_reports_are_counted_per_day(self):
+        user = self._member("ayse")
+        TodayReport.objects.create(user=user, report_text="Bir")
+        report = TodayReport.objects.create(user=user, report_text="İki")
+        self.assertEqual(TeamDailyRollup.objects.get(user=user).report_count, 2)
+        report.delete()
+        rollup = TeamDailyRollup.objects.get(user=user)
+        self.assertEqual((rollup.report_count, rollup.subtasks_total), (1, 6))
+
+        TeamDailyRollup.objects.all().delete()
+        call_command("rebuild_progress_rollups", stdout=StringIO())
+        rollup = TeamDailyRollup.objects.get(user=user)
+        self.assertEqual((rollup.report_count, rollup.subtasks_total), (1, 6))
+
+    def test_dashboard_query_count_does_not_grow_with_team(self):
+        self.client.force_login(User.objects.create_user("yonetici", password="x", is_staff=True))
+        # session, user, üyeler, anlık görüntüler, günün satırları
+        for name in ("a", "b"):
+            self._member(name)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("manager-dashboard"), {"department": "Backend"})
+        self.assertEqual([m["subtasks_total"] for m in response.context["members"]], [6, 6])
+
+        for name in ("c", "d", "e", "f"):
+            self._member(name)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("manager-dashboard"), {"department": "Backend"})
+        self.assertEqual(response.context["totals"]["subtasks_total"], 36)
+
+    def test_view_team_shows_department_only(self):
+        self._member("ayse")
+        self._member("mehmet", department="Mobil")
+        WorkerProfile.objects.create(user=self.user, department="Backend")
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("workers:view_team"))
+        self.assertEqual(sorted(m["user"].username for m in response.context["members"]), ["ayse", "worker"])
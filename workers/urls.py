@@ -9,8 +9,12 @@ urlpatterns = [
     path("home/", views.home, name="home"),
     path('today-report/', views.today_report, name='today_report'),
     path('submit-report/', views.submit_report, name='submit-report'),
+    path('report-jobs/<int:job_id>/', views.report_job_status, name='report-job-status'),
+    path('report-jobs/<int:job_id>/events/', views.report_job_events, name='report-job-events'),
     path("jira/", views.jira_profile, name="jira_profile"),
     path('progress/', views.view_progress, name='view_progress'),
     path('team/', views.view_team, name='view_team'),
-    path("progress/", views.view_progress, name="view-progress"),
+    path('ai-cache-stats/', views.ai_cache_stats, name='ai-cache-stats'),
+    path('jira-client-stats/', views.jira_client_stats, name='jira-client-stats'),
+    path('request-profiles/', views.request_profiles, name='request-profiles'),
 ]
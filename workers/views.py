@@ -1,38 +1,37 @@
 
 # views.py — gerekli importları kontrol et / güncelle
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.conf import settings
+from django.contrib.auth.models import User
+from asgiref.sync import sync_to_async
 import logging
 
-from .models import WorkerProfile, TodayReport, WorkerTask, TaskSubItem
+from .models import WorkerProfile, WorkerTask, ReportJob
 from .forms import DailyReportForm
-from .task_mapping import TASK_MAPPING
 from workers.forms import WorkerProfileForm
 
-
-from .services.ai_service import (
-    update_subtasks_with_report,
-    update_subtasks_status,
-)
-
-from .services.jira_service import (
-    get_jira_client,
-    get_jira_tasks_for_user,
-    move_task,
-    add_comment
+from .services.jira_service import get_jira_client
+from workers.services.jira_client import get_jira_metrics
+from workers.services.report_pipeline import aenqueue_report_job, enqueue_report_job, serialize_job
+from workers.services.subtask_cache import get_cache_stats
+from workers.services.task_store import afetch_worker_tasks
+from workers.services.jira_sync import (
+    aensure_fresh,
+    aget_mirrored_project_issues,
+    aget_mirrored_tasks_for_user,
+    get_max_age,
 )
-from workers.services.ai_service import analyze_task_and_attach_files
-from workers.services.jira_service import get_worker_tasks
+from workers.services.progress_cache import aget_cached_progress, aset_cached_progress
+from workers.services.progress_rollup import team_progress
+from workers.services.report_events import stream_job_events
+from workers.services.profiling import slowest_requests
 
 
 logger = logging.getLogger(__name__)
-# Plan tiplerini simüle ediyoruz
-PLANS = {
-    "basic": ["ai", "jira"],              # AI + Jira
-    "pro": ["ai", "jira", "file_check"]   # AI + Jira + Dosya Kontrolü
-}
 
 
 
@@ -77,6 +76,7 @@ def today_report(request):
             report = form.save(commit=False)
             report.user = request.user
             report.save()
+            enqueue_report_job(report)
             return redirect("workers:home")
     else:
         form = DailyReportForm()
@@ -90,8 +90,13 @@ def home(request):
 
 
 
+async def _arender(request, template_name, context):
+    # Context processor'lar request.user'ı senkron yükleyebilir; şablon thread'de işlenir
+    return await sync_to_async(render)(request, template_name, context)
+
+
 @login_required
-def submit_report(request):
+async def submit_report(request):
     if request.method != "POST":
         return JsonResponse({"status": "error", "message": "Invalid request"}, status=405)
 
@@ -100,133 +105,65 @@ def submit_report(request):
         return JsonResponse({"status": "error", "errors": form.errors}, status=400)
 
     report = form.save(commit=False)
-    report.user = request.user
-    report.save()
+    report.user = await request.auser()
+    await report.asave()
 
-    # Kullanıcı planı kontrolü (AI ve opsiyonel dosya kontrolü için)
-    profile = getattr(request.user, "workerprofile", None)
-    user_plan = getattr(profile, "plan", "basic") if profile else "basic"
+    # Jira/AI işlemleri uzun sürdüğü için arka plandaki worker'a bırakılır
+    # (python manage.py run_report_worker)
+    job = await aenqueue_report_job(report)
 
-    response_data = {
+    return JsonResponse({
         "status": "success",
         "report_id": report.id,
-        "updated_tasks": []
-    }
+        "job_id": job.id,
+        "status_url": reverse("workers:report-job-status", args=[job.id]),
+        "events_url": reverse("workers:report-job-events", args=[job.id]),
+    }, status=202)
 
-    # AI planı aktifse
-    if "ai" in getattr(profile, "plan_features", []):
-        try:
-            jira_tasks = get_jira_tasks_for_user(request.user)
-        except Exception as e:
-            logger.error(f"Jira taskları alınamadı: {e}")
-            jira_tasks = []
-
-        for jt in jira_tasks:
-            task_key = jt.get("key")
-            description = jt.get("description", "")
-
-            # WorkerTask oluştur veya al
-            worker_task, _ = WorkerTask.objects.get_or_create(
-                jira_key=task_key,
-                assignee=request.user,
-                defaults={
-                    "title": jt.get("summary", ""),
-                    "description": description
-                }
-            )
-
-            # 1. Description’dan alt-görev çıkar ve DB’ye ekle
-            try:
-                ai_result = update_subtasks_with_report(task_key, description, max_subtasks=5)
-                subtasks_ai = ai_result.get("subtasks", [])
-                for st in subtasks_ai:
-                    TaskSubItem.objects.get_or_create(
-                        task=worker_task,
-                        content=st["content"]
-                    )
-            except Exception as e:
-                logger.warning(f"{task_key} için AI alt-görev çıkarılamadı: {e}")
-
-            # 2. Kullanıcı raporuna göre alt-görevleri güncelle
-            try:
-                db_subitems = list(worker_task.subitems.all())
-                subtasks_dict = [{"content": s.content} for s in db_subitems]
-
-                ai_progress = update_subtasks_status(task_key, subtasks_dict, report.report_text)
-
-                for idx, st in enumerate(ai_progress.get("subtasks", [])):
-                    if idx < len(db_subitems):
-                        sub = db_subitems[idx]
-                        sub.is_done = st.get("is_done", False)
-                        sub.save()
-
-                progress = ai_progress.get("progress", 0)
-                action = ai_progress.get("action", "in_progress")
-
-                if action == "done":
-                    move_task(task_key, "Done")
-                    add_comment(task_key, f"Tüm alt-görevler tamamlandı: {report.report_text}")
-
-                response_data["updated_tasks"].append({
-                    "task_key": task_key,
-                    "progress": progress,
-                    "action": action,
-                    "subtasks": [
-                        {"content": s.content, "is_done": s.is_done} for s in worker_task.subitems.all()
-                    ]
-                })
-            except Exception as e:
-                logger.warning(f"{task_key} alt-görevleri güncellenemedi: {e}")
-
-    # Dosya kontrolü opsiyonel
-    if "file_check" in getattr(profile, "plan_features", []):
-        try:
-            from .services.file_service import check_files
-            check_files(request.user)
-        except Exception as e:
-            logger.warning(f"Dosya kontrolü sırasında hata: {e}")
 
-    return JsonResponse(response_data)
+@login_required
+def report_job_status(request, job_id):
+    job = get_object_or_404(ReportJob, pk=job_id, user=request.user)
+    return JsonResponse(serialize_job(job))
+
+
+@login_required
+async def report_job_events(request, job_id):
+    """Job'ın task sonuçlarını hazır oldukça text/event-stream olarak gönderir."""
+    user = await request.auser()
+    if not await ReportJob.objects.filter(pk=job_id, user=user).aexists():
+        raise Http404
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or 0)
+    except ValueError:
+        last_id = 0
+
+    response = StreamingHttpResponse(stream_job_events(job_id, last_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx tamponlamasın
+    return response
 
 
 
 @login_required
-def jira_profile(request):
+async def jira_profile(request):
     projects = getattr(settings, "MY_JIRA_PROJECTS", [])
     if not projects:
-        return render(request, "workers_module/jira_dashboard.html", {
+        return await _arender(request, "workers_module/jira_dashboard.html", {
             "project_issues": {},
             "error": "Dahil olduğun projeler settings.py içinde tanımlı değil."
         })
 
-    jira = get_jira_client()
-    if jira is None:
-        return render(request, "workers_module/jira_dashboard.html", {
-            "project_issues": {},
-            "error": "Jira’ya bağlanılamadı."
-        })
-
-    jql = f"project in ({','.join(projects)}) ORDER BY created DESC"
+    # Jira yerine yerel kopyadan okunur; kopya eskiyse arka planda senkronlanır
     try:
-        issues = jira.search_issues(
-            jql,
-            maxResults=200,
-            fields="summary,status,assignee,project"
-        )
+        project_issues = await aget_mirrored_project_issues(projects, max_age=get_max_age("jira_profile"))
     except Exception as e:
-        return render(request, "workers_module/jira_dashboard.html", {
+        return await _arender(request, "workers_module/jira_dashboard.html", {
             "project_issues": {},
             "error": f"Jira sorgu hatası: {e}"
         })
 
-    project_issues = {}
-    for issue in issues:
-        proj = issue.fields.project
-        if proj.key not in project_issues:
-            project_issues[proj.key] = {"name": proj.name, "issues": []}
-        project_issues[proj.key]["issues"].append(issue)
-
-    return render(request, "workers_module/jira_dashboard.html", {
+    return await _arender(request, "workers_module/jira_dashboard.html", {
         "project_issues": project_issues,
         "limited_to": projects
     })
@@ -236,69 +173,78 @@ def jira_profile(request):
 
 
 @login_required
-def view_progress(request):
-    user = request.user
-    jira_tasks = get_jira_tasks_for_user(user)
+async def view_progress(request):
+    user = await request.auser()
+    task_details = await aget_cached_progress(user.pk)
+    if task_details is None:
+        task_details = await _build_task_details(user)
+        await aset_cached_progress(user.pk, task_details, timeout=getattr(settings, "PROGRESS_CACHE_TTL", 600))
+    else:
+        # Kopya eskiyse arka planda tazelenir; değişiklik olursa cache silinir
+        await aensure_fresh(get_max_age("view_progress"))
+
+    return await _arender(request, "workers_module/view_progress.html", {"task_details": task_details})
 
-    task_details = []
 
-    last_report = TodayReport.objects.filter(user=user).order_by('-created_at').first()
-    last_report_text = last_report.report_text if last_report else ""
+async def _build_task_details(user):
+    """
+    Sadece okur: AI değerlendirmesi ve Jira aksiyonları rapor gönderildiğinde
+    report_pipeline (run_report_worker) tarafından bir kez yapılır.
+    """
+    jira_tasks = await aget_mirrored_tasks_for_user(user, max_age=get_max_age("view_progress"))
+    tasks_by_key = await afetch_worker_tasks(user, [jt["key"] for jt in jira_tasks])
 
+    task_details = []
     for jt in jira_tasks:
-        task_key = jt["key"]
-        description = jt.get("description") or ""
-
-        # WorkerTask al/oluştur
-        task, _ = WorkerTask.objects.get_or_create(
-            jira_key=task_key,
-            assignee=user,
-            defaults={"title": jt.get("summary", ""), "description": description}
-        )
-
-        # Sadece DB’de alt-görev yoksa AI çağrısı yap
-        if not task.subitems.exists():
-            try:
-                ai_result = update_subtasks_with_report(task_key, description, max_subtasks=5)
-                for st in ai_result.get("subtasks", []):
-                    TaskSubItem.objects.create(task=task, content=st["content"], is_done=False)
-            except Exception as e:
-                logger.warning(f"{task_key} için AI alt-görev çıkarılamadı: {e}")
-
-        # DB alt-görevleri al
-        db_subitems = list(task.subitems.all())
-        subtasks_dict = [{"content": s.content, "is_done": s.is_done} for s in db_subitems]
-
-        # Son rapora göre is_done güncelle
-        try:
-            ai_progress = update_subtasks_status(task_key, subtasks_dict, last_report_text)
-            for idx, st in enumerate(ai_progress.get("subtasks", [])):
-                if idx < len(db_subitems):
-                    db_subitems[idx].is_done = st.get("is_done", False)
-                    db_subitems[idx].save()
-        except Exception as e:
-            logger.warning(f"{task_key} alt-görev durumu güncellenemedi: {e}")
+        # Henüz hiçbir raporla işlenmemiş task alt-görevsiz gösterilir
+        task = tasks_by_key.get(jt["key"]) or WorkerTask(jira_key=jt["key"], title=jt.get("summary", ""))
+        db_subitems = list(task.subitems.all()) if task.pk else []
 
-        # Progress hesapla
         done_count = sum(1 for s in db_subitems if s.is_done)
         total_count = len(db_subitems)
         progress = round((done_count / total_count) * 100, 1) if total_count else 0
 
-        # Tüm alt-görevler tamamlandıysa Jira’da Done
-        if progress == 100:
-            move_task(task_key, "done")
-            add_comment(task_key, f"Tüm alt-görevler tamamlandı: {last_report_text}")
-
         task_details.append({
             "task": task,
             "subtasks": [{"content": s.content, "is_done": s.is_done} for s in db_subitems],
             "progress": progress
         })
 
-    return render(request, "workers_module/view_progress.html", {"task_details": task_details})
+    return task_details
 
 
 
 @login_required
 def view_team(request):
-    return render(request, 'workers/team_dashboard.html')
+    """Kullanıcının departmanındaki ekip; sayılar önceden hesaplanmış özetlerden (progress_rollup)."""
+    department = WorkerProfile.objects.filter(user=request.user).values_list("department", flat=True).first()
+    users = User.objects.filter(is_active=True)
+    users = users.filter(workerprofile__department=department) if department else users.filter(pk=request.user.pk)
+    return render(request, "workers_module/team_dashboard.html", {
+        "department": department,
+        **team_progress(users),
+    })
+
+
+@staff_member_required
+def ai_cache_stats(request):
+    """Alt-görev çıkarım cache'i: hit/miss (LLMCallLog) ve kayıt sayısı. ?days=7"""
+    try:
+        days = int(request.GET.get("days", 7))
+    except ValueError:
+        days = 7
+    return JsonResponse(get_cache_stats(min(max(days, 1), 90)))
+
+
+@staff_member_required
+def jira_client_stats(request):
+    return JsonResponse(get_jira_metrics())
+
+
+@staff_member_required
+def request_profiles(request):
+    return JsonResponse({
+        "enabled": settings.PROFILING_ENABLED,
+        "slow_ms": settings.PROFILING_SLOW_MS,
+        "requests": slowest_requests(),
+    })